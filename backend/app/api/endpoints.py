@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
 from app.models import (
     JDAnalysisRequest, JDAnalysisResponse,
     QuestionGenerationRequest, QuestionGenerationResponse,
@@ -7,11 +7,16 @@ from app.models import (
 )
 from app.services.deepseek_service import DeepSeekService
 from app.services.jd_service import JDService
+from app.services.prompts import PROMPTS
+from app.services.timing_service import timed
+from app.services.tracing_service import traced
+from app.services.structured_logger import get_logger
 import os
 import re
 import time
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
+from itertools import islice
 from typing import Optional
 from fastapi.responses import StreamingResponse
 import asyncio
@@ -19,11 +24,26 @@ from fastapi.responses import JSONResponse
 
 router = APIRouter()
 
+logger = get_logger("endpoints")
+
 # Updated dependency to get the singleton JD service from app state
 def get_jd_service(request: Request):
     return request.app.state.jd_service
 
+def resolve_jd_text(request: QuestionGenerationRequest, jd_service: JDService) -> str:
+    """The request's JD text, looked up in the JD registry when the client sent a jd_id"""
+    if request.jd_id:
+        jd_text = jd_service.registry.get_text(request.jd_id)
+        if jd_text is None:
+            logger.info("Unknown jd_id", jd_id=request.jd_id)
+            raise HTTPException(status_code=404, detail="Unknown jd_id, send jd_text instead")
+        return jd_text
+    if request.jd_text is None:
+        raise HTTPException(status_code=400, detail="Either jd_text or jd_id is required")
+    return request.jd_text
+
 @router.post("/analyze-jd", response_model=JDAnalysisResponse)
+@traced("endpoint.analyze_jd")
 async def analyze_jd(request: JDAnalysisRequest, jd_service: JDService = Depends(get_jd_service)):
     """
     Analyze if the text is a job description
@@ -38,19 +58,20 @@ async def analyze_jd(request: JDAnalysisRequest, jd_service: JDService = Depends
         
         # Log the user interaction
         if hasattr(jd_service, 'logging_service'):
-            jd_service.logging_service.log_user_interaction(
-                interaction_type="analyze_jd",
-                user_data={"jd_text_length": len(request.jd_text)},
-                result=result
-            )
-            
-            # Log the API call
-            jd_service.logging_service.log_api_call(
-                endpoint="/analyze-jd",
-                request_data={"jd_text_length": len(request.jd_text)},
-                response_data=result,
-                duration_ms=duration_ms
-            )
+            with timed("log"):
+                jd_service.logging_service.log_user_interaction(
+                    interaction_type="analyze_jd",
+                    user_data={"jd_text_length": len(request.jd_text)},
+                    result=result
+                )
+                
+                # Log the API call
+                jd_service.logging_service.log_api_call(
+                    endpoint="/analyze-jd",
+                    request_data={"jd_text_length": len(request.jd_text)},
+                    response_data=result,
+                    duration_ms=duration_ms
+                )
         
         return result
     except Exception as e:
@@ -75,46 +96,49 @@ async def analyze_jd(request: JDAnalysisRequest, jd_service: JDService = Depends
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/generate-questions", response_model=QuestionGenerationResponse)
+@traced("endpoint.generate_questions")
 async def generate_questions(request: QuestionGenerationRequest, jd_service: JDService = Depends(get_jd_service)):
     """
     Generate questions based on the job description
     """
-    print(f"Received request to generate {request.question_count} questions")
-    print(f"JD text length: {len(request.jd_text)} characters")
+    jd_text = resolve_jd_text(request, jd_service)
+    logger.debug("Received request to generate questions", question_count=request.question_count,
+                 jd_length=len(jd_text), jd_id=request.jd_id)
     
-    if len(request.jd_text) < 200:
-        print("JD text too short")
+    if len(jd_text) < 200:
+        logger.info("JD text too short", jd_length=len(jd_text))
         raise HTTPException(status_code=400, detail="Job description must be at least 200 characters")
     
     if request.question_count < 5 or request.question_count > 50:
-        print(f"Invalid question count: {request.question_count}")
+        logger.info("Invalid question count", question_count=request.question_count)
         raise HTTPException(status_code=400, detail="Question count must be between 5 and 50")
     
     try:
-        questions = await jd_service.generate_questions(request.jd_text, request.question_count)
+        questions = await jd_service.generate_questions(jd_text, request.question_count)
+        jd_id = request.jd_id or jd_service.registry.register(jd_text)
         
-        print(f"Generated {len(questions)} questions (requested {request.question_count})")
-        for i, q in enumerate(questions):
-            print(f"Question {i+1}: {q.get('text', '')[:50]}...")
+        logger.debug("Generated questions", count=len(questions), requested=request.question_count,
+                     questions=lambda: [q.get("text", "")[:50] for q in questions])
         
         # Return empty list if no questions were generated
         if not questions:
-            print("No questions were generated")
-            return {"questions": []}
+            logger.warning("No questions were generated")
+            return {"questions": [], "jd_id": jd_id}
             
-        return {"questions": questions}
+        return {"questions": questions, "jd_id": jd_id}
     except Exception as e:
-        print(f"Exception in generate_questions endpoint: {str(e)}")
+        logger.error("Exception in generate_questions endpoint", error=str(e))
         raise HTTPException(status_code=500, detail=f"Error generating questions: {str(e)}")
 
 @router.post("/evaluate-answer", response_model=AnswerEvaluationResponse)
+@traced("endpoint.evaluate_answer")
 async def evaluate_answer(request: AnswerEvaluationRequest, jd_service: JDService = Depends(get_jd_service)):
     """
     Evaluate a user's answer
     """
-    print(f"Evaluating answer for question ID: {request.question_id}")
-    print(f"User answer length: {len(request.user_answer)} characters")
-    print(f"Reference answer length: {len(request.reference_answer)} characters")
+    logger.debug("Evaluating answer", question_id=request.question_id,
+                 user_answer_length=len(request.user_answer),
+                 reference_answer_length=len(request.reference_answer))
     
     if not request.user_answer.strip():
         raise HTTPException(status_code=400, detail="User answer cannot be empty")
@@ -126,72 +150,91 @@ async def evaluate_answer(request: AnswerEvaluationRequest, jd_service: JDServic
         # If we don't have the question in memory but the request includes question_text,
         # store it in memory for future use
         if not question_data and hasattr(request, 'question_text') and request.question_text:
-            print(f"Storing question from request: {request.question_text[:50]}...")
+            logger.debug("Storing question from request", question=request.question_text)
             jd_service.questions[request.question_id] = {
                 "text": request.question_text,
                 "reference_answer": request.reference_answer
             }
         
-        result = await jd_service.evaluate_answer(
-            request.question_id, request.user_answer, request.reference_answer
-        )
-        print(f"Evaluation result: score={result.get('score')}")
+        # Provisional mode answers with the local score and refines it with the LLM in the background
+        if request.mode == "provisional":
+            result = await jd_service.start_evaluation(
+                request.question_id, request.user_answer, request.reference_answer
+            )
+        else:
+            result = await jd_service.evaluate_answer(
+                request.question_id, request.user_answer, request.reference_answer
+            )
+        logger.debug("Evaluation result", score=result.get("score"), status=result.get("status"))
         return result
     except Exception as e:
-        print(f"Exception in evaluate_answer endpoint: {str(e)}")
-        # Return a fallback response instead of raising an exception
-        return {
+        logger.error("Exception in evaluate_answer endpoint", error=str(e))
+        # Return the local score (or a canned response) instead of raising an exception
+        return jd_service.degraded_evaluation(request.question_text or "", request.user_answer,
+                                              request.reference_answer, {
             "score": 50.0,
             "feedback": "We encountered an issue while evaluating your answer.",
             "improvement_suggestions": "Please try again or provide more details in your answer."
-        }
+        })
+
+@router.get("/evaluations/{evaluation_id}", response_model=AnswerEvaluationResponse)
+@traced("endpoint.get_evaluation")
+async def get_evaluation(evaluation_id: str, wait: float = Query(0.0, ge=0.0, le=30.0),
+                         jd_service: JDService = Depends(get_jd_service)):
+    """
+    Get a provisional-mode evaluation: the provisional score until the LLM evaluation
+    finishes, then the LLM's (status "final"). With wait, holds the request up to that
+    many seconds for the LLM evaluation.
+    """
+    result = await jd_service.get_evaluation(evaluation_id, wait)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired evaluation_id")
+    return result
 
 @router.post("/generate-answer", response_model=AnswerGenerationResponse)
+@traced("endpoint.generate_answer")
 async def generate_answer(request: AnswerGenerationRequest, jd_service: JDService = Depends(get_jd_service)):
     """
     Generate an answer for a given question
     """
-    print(f"Generating answer for question: {request.question_text[:100]}...")
+    logger.debug("Generating answer", question=request.question_text)
     
-    # Get the word limit from the request, default to 100
-    word_limit = getattr(request, 'word_limit', 100)
-    print(f"Using word limit: {word_limit}")
+    word_limit = request.word_limit
     
     try:
-        answer = await jd_service.generate_answer(request.question_text)
+        answer = await jd_service.generate_answer(request.question_text, word_limit)
         
-        # Limit the answer to the specified word count
+        # The model was asked for at most word_limit words; enforce it
         words = answer.split()
         if len(words) > word_limit:
             answer = ' '.join(words[:word_limit]) + '...'
-            print(f"Answer truncated to {word_limit} words")
+            logger.debug("Answer truncated", word_limit=word_limit)
         
         return {"answer": answer}
     except Exception as e:
-        print(f"Exception in generate_answer endpoint: {str(e)}")
+        logger.error("Exception in generate_answer endpoint", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/generate-answer-stream")
+@traced("endpoint.generate_answer_stream")
 async def generate_answer_stream(request: AnswerGenerationRequest, jd_service: JDService = Depends(get_jd_service)):
     """
     Generate an answer for a given question with streaming response
     """
-    print(f"Generating streaming answer for question: {request.question_text[:100]}...")
+    logger.debug("Generating streaming answer", question=request.question_text)
     
-    # Get the word limit from the request, default to 100
-    word_limit = getattr(request, 'word_limit', 100)
-    print(f"Using word limit: {word_limit}")
+    word_limit = request.word_limit
     
     # First, generate the full answer
     try:
-        full_answer = await jd_service.generate_answer(request.question_text)
-        print(f"Generated full answer of length {len(full_answer)}")
+        full_answer = await jd_service.generate_answer(request.question_text, word_limit)
+        logger.debug("Generated full answer", length=len(full_answer), word_limit=word_limit)
         
-        # Limit the answer to the specified word count
+        # The model was asked for at most word_limit words; enforce it
         words = full_answer.split()
         if len(words) > word_limit:
             full_answer = ' '.join(words[:word_limit]) + '...'
-            print(f"Answer truncated to {word_limit} words")
+            logger.debug("Answer truncated", word_limit=word_limit)
         
         # If we have a valid answer, stream it
         if full_answer and len(full_answer) > 20:
@@ -209,7 +252,7 @@ async def generate_answer_stream(request: AnswerGenerationRequest, jd_service: J
             )
         else:
             # If we don't have a valid answer, return a fallback
-            print("Warning: Generated answer was too short or empty")
+            logger.warning("Generated answer was too short or empty")
             
             async def fallback_stream():
                 fallback = "I couldn't generate a detailed answer at this time. Please try again or write your own answer based on your experience."
@@ -225,9 +268,7 @@ async def generate_answer_stream(request: AnswerGenerationRequest, jd_service: J
                 media_type="text/plain"
             )
     except Exception as e:
-        print(f"Exception in generate_answer_stream endpoint: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.error("Exception in generate_answer_stream endpoint", exc_info=True, error=str(e))
         
         # Return a fallback response
         async def error_stream():
@@ -343,37 +384,27 @@ async def test_question_relevance(request: QuestionGenerationRequest, jd_service
     """
     Test endpoint to check if generated questions are relevant to the JD
     """
+    jd_text = resolve_jd_text(request, jd_service)
     try:
-        # Extract key terms from the JD
-        jd_text = request.jd_text.lower()
-        key_terms = set()
-        
-        # Extract potential key terms (this is a simple approach)
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', jd_text)
-        for word in words:
-            if word not in common_words:
-                key_terms.add(word)
+        # The JD's relevance engine, shared with generate_questions through the digest cache
+        relevance = jd_service.digest(jd_text).relevance
         
         # Generate questions
-        questions = await jd_service.generate_questions(request.jd_text, request.question_count)
+        questions = await jd_service.generate_questions(jd_text, request.question_count)
         
-        # Check relevance of each question
+        # Score all questions against the JD at once
+        scores = relevance.score_questions(questions)
         relevance_scores = []
-        for q in questions:
-            question_text = q.get('text', '').lower()
-            reference_answer = q.get('reference_answer', '').lower()
-            
-            # Count how many key terms appear in the question and answer
-            term_matches = sum(1 for term in key_terms if term in question_text or term in reference_answer)
-            
+        for q, score in zip(questions, scores):
             relevance_scores.append({
                 "question": q.get('text'),
-                "key_terms_matched": term_matches,
-                "relevance_score": min(100, term_matches * 10)  # Simple scoring
+                "key_terms_matched": len(relevance.matched_terms(q)),
+                "relevance_score": round(score * 100, 1),
+                "is_relevant": score >= relevance.threshold
             })
         
         return {
-            "jd_key_terms": list(key_terms)[:20],  # Show top 20 terms
+            "jd_key_terms": relevance.top_terms(20),  # Show top 20 terms
             "questions": questions,
             "relevance_analysis": relevance_scores,
             "average_relevance": sum(s["relevance_score"] for s in relevance_scores) / len(relevance_scores) if relevance_scores else 0
@@ -383,33 +414,114 @@ async def test_question_relevance(request: QuestionGenerationRequest, jd_service
             "error": str(e)
         }
 
-# Common English words to filter out
-common_words = set([
-    "the", "and", "that", "have", "for", "not", "with", "you", "this", "but",
-    "his", "from", "they", "she", "will", "would", "there", "their", "what",
-    "about", "which", "when", "make", "like", "time", "just", "know", "take",
-    "person", "into", "year", "your", "good", "some", "could", "them", "see",
-    "other", "than", "then", "now", "look", "only", "come", "its", "over",
-    "think", "also", "back", "after", "use", "two", "how", "our", "work",
-    "first", "well", "way", "even", "new", "want", "because", "any", "these",
-    "give", "day", "most", "can", "are", "is", "be", "has", "was", "were",
-    "had", "do", "does", "did", "doing", "done", "should", "must", "may",
-    "might", "can", "could", "shall", "will", "would", "should", "must",
-    "experience", "role", "job", "candidate", "skill", "ability", "work",
-    "team", "project", "develop", "create", "build", "implement", "design",
-    "manage", "lead", "communicate", "collaborate", "solve", "problem",
-    "solution", "requirement", "responsibility", "qualification", "year"
-])
+@router.get("/llm-stats")
+async def get_llm_stats(request: Request):
+    """
+    Get per-operation LLM telemetry rollups (latency, tokens, cost)
+    """
+    logging_service = request.app.state.logging_service
+    stats = logging_service.get_llm_stats()
+    
+    # Question selection mode and how often it avoided padding with template questions
+    jd_service = request.app.state.jd_service
+    selections = request.app.state.metrics_service.question_selections.collect()
+    outcomes = {outcome: int(count) for (mode, outcome), count in selections.items()
+                if mode == jd_service.question_selection}
+    generations = sum(outcomes.values())
+    question_selection = {
+        "mode": jd_service.question_selection,
+        "surplus_ratio": jd_service.question_surplus_ratio if jd_service.question_selection == "rank" else 1.0,
+        "outcomes": outcomes,
+        "padding_avoided_rate": 1 - outcomes.get("padded", 0) / generations if generations else None,
+        "dedup": jd_service.question_dedup,
+        "near_duplicates_removed": int(sum(request.app.state.metrics_service.near_duplicates.collect().values())),
+        "duplicate_replacements": int(sum(request.app.state.metrics_service.duplicate_replacements.collect().values()))
+    }
+    
+    # Estimated prompt tokens saved per operation by each preprocessing stage
+    prompt_savings = {}
+    for (operation, stage), tokens in request.app.state.metrics_service.prompt_tokens_saved.collect().items():
+        prompt_savings.setdefault(operation, {})[stage] = int(tokens)
+    
+    # Prompt and completion token budgets of the provider calls
+    token_budget = getattr(jd_service.llm_service, "token_budget", None)
+    
+    # Local JD classifier decisions and how often the LLM agreed, on audited confident texts and ambiguous ones
+    jd_classifier = None
+    if jd_service.jd_classifier is not None:
+        decisions = {decision: int(count) for (decision,), count in
+                     request.app.state.metrics_service.jd_classifier_decisions.collect().items()}
+        comparisons = {}
+        for (band, agreed), count in request.app.state.metrics_service.jd_classifier_agreement.collect().items():
+            comparisons.setdefault(band, {"true": 0, "false": 0})[agreed] += int(count)
+        validations = sum(decisions.values())
+        compared = sum(sum(band.values()) for band in comparisons.values())
+        jd_classifier = {
+            "threshold": jd_service.jd_classifier_threshold,
+            "audit_rate": jd_service.jd_classifier_audit_rate,
+            "model": jd_service.jd_classifier.metadata,
+            "decisions": decisions,
+            "local_rate": 1 - decisions.get("llm", 0) / validations if validations else None,
+            "agreement_rate": sum(band["true"] for band in comparisons.values()) / compared if compared else None,
+            "agreement_rate_by_band": {band: counts["true"] / sum(counts.values()) for band, counts in comparisons.items()}
+        }
+    
+    # Provisional-mode evaluations and how far their local scores were from the LLM's
+    differences = request.app.state.metrics_service.provisional_score_difference.collect().get(())
+    provisional_evaluations = {
+        "stored": len(jd_service.evaluations),
+        "compared": differences[2] if differences else 0,
+        "mean_abs_score_difference": differences[1] / differences[2] if differences else None
+    }
+    
+    # Response cache size, hit rate and the startup warm-up report, when the cache is enabled
+    response_cache = getattr(request.app.state, "response_cache", None)
+    cache_stats = None
+    if response_cache is not None:
+        cache_stats = {**response_cache.stats(), "warmup": getattr(request.app.state, "cache_warmup", None)}
+    
+    return {
+        "operations": stats,
+        "total_calls": sum(s["calls"] for s in stats),
+        "total_tokens": sum(s["total_tokens"] for s in stats),
+        "total_cost_usd": sum(s["cost_usd"] for s in stats),
+        "question_selection": question_selection,
+        "response_cache": cache_stats,
+        "jd_digest_cache": jd_service.digests.stats(),
+        "jd_classifier": jd_classifier,
+        "provisional_evaluations": provisional_evaluations,
+        "prompt_tokens_saved": prompt_savings,
+        # Estimated size of each template's static, cacheable prefix
+        "prompt_prefix_tokens": PROMPTS.prefix_tokens(),
+        "token_budgets": token_budget.stats() if token_budget is not None else None,
+        # Output token limit of each operation's model, and the questions one generation call holds
+        "completion_limits": ({operation: jd_service.llm_service.completion_limit(operation) for operation in
+                               ("analyze_jd", "evaluate_answer", "generate_questions", "generate_answer")}
+                              if hasattr(jd_service.llm_service, "completion_limit") else None),
+        "questions_per_call": (jd_service.llm_service.questions_per_call()
+                               if hasattr(jd_service.llm_service, "questions_per_call") else None),
+        # Default model and the per-operation overrides (see llm_factory)
+        "models": {
+            "default": getattr(jd_service.llm_service, "model", None),
+            "operations": getattr(jd_service.llm_service, "operation_models", {})
+        }
+    }
 
 @router.get("/logs/{log_type}")
-async def get_logs(log_type: str, request: Request, date: str = None):
+async def get_logs(log_type: str, request: Request, date: str = None,
+                   from_: Optional[datetime] = Query(None, alias="from"),
+                   to: Optional[datetime] = None,
+                   offset: int = Query(0, ge=0),
+                   limit: int = Query(100, ge=1, le=1000)):
     """
-    Get logs of a specific type for a specific date
+    Get logs of a specific type for a specific date, or for a from/to datetime range.
+    Range queries return one offset/limit page, newest first, read lazily day by day
+    (see LoggingService.iter_logs_range).
     """
     # Set content type to JSON
     headers = {"Content-Type": "application/json"}
     
-    print(f"Logs request received: type={log_type}, date={date}")
+    logger.debug("Logs request received", log_type=log_type, date=date)
     
     # Basic authentication check
     auth_header = request.headers.get("Authorization")
@@ -420,7 +532,7 @@ async def get_logs(log_type: str, request: Request, date: str = None):
             credentials = base64.b64decode(auth_header[6:]).decode("utf-8")
             username, password = credentials.split(":")
             
-            print(f"Auth credentials: username={username}")
+            logger.debug("Auth credentials", username=username)
             
             # Check if credentials are valid
             if username == os.getenv("USER_NAME", "") and password == os.getenv("USER_PASSWORD", ""):
@@ -430,23 +542,46 @@ async def get_logs(log_type: str, request: Request, date: str = None):
                 # Validate log type
                 valid_types = ["api", "llm", "app"]
                 if log_type not in valid_types:
-                    print(f"Invalid log type: {log_type}")
+                    logger.info("Invalid log type", log_type=log_type)
                     return JSONResponse(
                         status_code=400,
                         content={"error": f"Invalid log type. Must be one of: {', '.join(valid_types)}", "logs": []},
                         headers=headers
                     )
                 
+                # Range queries are streamed page by page instead of loaded in full
+                if from_ or to:
+                    range_end = as_local_time(to) if to else datetime.now()
+                    range_start = as_local_time(from_) if from_ else range_end - timedelta(days=1)
+                    if range_start > range_end:
+                        return JSONResponse(
+                            status_code=400,
+                            content={"error": "'from' must be earlier than 'to'", "logs": []},
+                            headers=headers
+                        )
+                    max_range_days = int(os.getenv("LOGS_MAX_RANGE_DAYS", "31"))
+                    if range_end - range_start > timedelta(days=max_range_days):
+                        return JSONResponse(
+                            status_code=400,
+                            content={"error": f"The 'from'/'to' range can span at most {max_range_days} days", "logs": []},
+                            headers=headers
+                        )
+                    
+                    return StreamingResponse(
+                        stream_logs_page(logging_service, log_type, range_start, range_end, offset, limit),
+                        media_type="application/json"
+                    )
+                
                 # Get logs for the specified date
                 logs = logging_service.get_logs(log_type, date)
-                print(f"Found {len(logs)} logs for type={log_type}, date={date}")
+                logger.debug("Found logs", count=len(logs), log_type=log_type, date=date)
                 
                 return JSONResponse(
                     content={"logs": logs},
                     headers=headers
                 )
         except Exception as e:
-            print(f"Error processing authentication: {str(e)}")
+            logger.error("Error processing authentication", error=str(e))
             return JSONResponse(
                 status_code=500,
                 content={"error": f"Authentication error: {str(e)}", "logs": []},
@@ -454,9 +589,39 @@ async def get_logs(log_type: str, request: Request, date: str = None):
             )
     
     # If authentication fails or is not provided, return 401 Unauthorized
-    print("Authentication failed or not provided")
+    logger.info("Authentication failed or not provided")
     return JSONResponse(
         status_code=401,
         content={"error": "Unauthorized. Please provide valid credentials.", "logs": []},
         headers=headers
-    ) 
\ No newline at end of file
+    )
+
+def as_local_time(value: datetime) -> datetime:
+    """
+    Convert a timezone-aware datetime to naive local time, matching the log timestamps
+    """
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+def stream_logs_page(logging_service, log_type: str, start: datetime, end: datetime, offset: int, limit: int):
+    """
+    Stream one page of range-query logs as a JSON document
+    """
+    logs = logging_service.iter_logs_range(log_type, start, end)
+    
+    # Fetch one extra entry to know whether another page exists
+    page = islice(logs, offset, offset + limit + 1)
+    
+    yield '{"logs": ['
+    count = 0
+    has_more = False
+    for log in page:
+        if count == limit:
+            has_more = True
+            break
+        yield ("," if count else "") + json.dumps(log, default=str)
+        count += 1
+    
+    next_offset = offset + count if has_more else None
+    yield f'], "offset": {offset}, "limit": {limit}, "next_offset": {json.dumps(next_offset)}}}'
@@ -25,17 +25,21 @@ from app.api.endpoints import (
     analyze_jd,
     generate_questions,
     evaluate_answer,
+    get_evaluation,
     generate_answer,
     generate_answer_stream,
     debug_question,
-    get_logs
+    get_logs,
+    get_llm_stats
 )
 
 # Register the endpoints with the router
 router.post("/analyze-jd", response_model=JDAnalysisResponse)(analyze_jd)
 router.post("/generate-questions", response_model=QuestionGenerationResponse)(generate_questions)
 router.post("/evaluate-answer", response_model=AnswerEvaluationResponse)(evaluate_answer)
+router.get("/evaluations/{evaluation_id}", response_model=AnswerEvaluationResponse)(get_evaluation)
 router.post("/generate-answer", response_model=AnswerGenerationResponse)(generate_answer)
 router.post("/generate-answer-stream")(generate_answer_stream)
 router.get("/debug-question/{question_id}")(debug_question)
-router.get("/logs/{log_type}")(get_logs) 
\ No newline at end of file
+router.get("/logs/{log_type}")(get_logs)
+router.get("/llm-stats")(get_llm_stats) 
\ No newline at end of file
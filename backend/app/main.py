@@ -1,16 +1,24 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.router import router
+from app.middleware import RequestLoggingMiddleware
 from app.services.jd_service import JDService
 from app.services.llm_factory import create_llm_service
 from app.services.logging_service import LoggingService
+from app.services.metrics_service import MetricsService
+from app.services.response_cache import LLMResponseCache, warm_cache
+from app.services.tracing_service import TracingService
+from app.services.structured_logger import get_logger
+import asyncio
 import os
-import time
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv(override=True)
 
+logger = get_logger("main")
+
 app = FastAPI(
     title="JD Analyzer API",
     description="API for analyzing job descriptions and generating questions",
@@ -38,68 +46,89 @@ async def startup_event():
     # Store the logging service in the app state
     app.state.logging_service = logging_service
     
-    # Attach the logging service to the LLM service
-    if hasattr(llm_service, 'logging_service'):
-        llm_service.logging_service = logging_service
+    # Create the metrics service and store it in the app state
+    metrics_service = MetricsService()
+    app.state.metrics_service = metrics_service
+    
+    # Create the tracing service (spans are exported to logs/traces)
+    app.state.tracing_service = TracingService()
+    
+    # Attach the logging and metrics services to the LLM service
+    llm_service.logging_service = logging_service
+    llm_service.metrics_service = metrics_service
     
     # Create the JD service with the LLM service
     jd_service = JDService(llm_service)
     
-    # Attach the logging service to the JD service
+    # Attach the logging and metrics services to the JD service
     jd_service.logging_service = logging_service
+    jd_service.metrics_service = metrics_service
+    
+    # Report the question store size at scrape time
+    metrics_service.gauge_callback(
+        "question_store_size", "Questions held in the in-memory store", lambda: len(jd_service.questions))
+    metrics_service.gauge_callback(
+        "jd_digest_cache_size", "Parsed job descriptions held in the digest cache", lambda: len(jd_service.digests))
+    metrics_service.gauge_callback(
+        "jd_registry_size", "Job descriptions held in the jd_id registry", lambda: len(jd_service.registry))
+    metrics_service.gauge_callback(
+        "evaluation_store_size", "Provisional-mode answer evaluations held for fetching",
+        lambda: len(jd_service.evaluations))
     
     # Store the JD service in the app state
     app.state.jd_service = jd_service
     
-    print(f"App initialized with LLM provider: {os.getenv('LLM_PROVIDER', 'deepseek')}")
-
-# Add middleware to log all requests
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    
-    # Get path and method
-    path = request.url.path
-    method = request.method
-    
-    # Try to get client IP
-    forwarded_for = request.headers.get("X-Forwarded-For")
-    client_ip = forwarded_for.split(",")[0] if forwarded_for else request.client.host
-    
-    # Check if logging service exists
-    has_logger = hasattr(app.state, 'logging_service') and app.state.logging_service is not None
-    
-    # Log request start
-    if has_logger:
-        app.state.logging_service.logger.info(f"Request started: {method} {path} from {client_ip}")
-    else:
-        print(f"Request started: {method} {path} from {client_ip}")
+    # Cache successful LLM responses by prompt (LLM_CACHE_SIZE=0 disables the cache)
+    cache_size = int(os.getenv("LLM_CACHE_SIZE", "0"))
+    if cache_size > 0 and llm_service.provider != "replay":
+        cached_operations = os.getenv("LLM_CACHE_OPERATIONS")
+        response_cache = LLMResponseCache(
+            cache_size, float(os.getenv("LLM_CACHE_TTL_HOURS", "24")),
+            [op.strip() for op in cached_operations.split(",") if op.strip()] if cached_operations is not None else None)
+        llm_service.response_cache = response_cache
+        app.state.response_cache = response_cache
+        metrics_service.gauge_callback(
+            "llm_response_cache_size", "Responses held in the LLM response cache", lambda: len(response_cache))
+        
+        # Warm the cache from recent provider logs in the background, so startup isn't delayed
+        if os.getenv("LLM_CACHE_WARMUP", "false").lower() == "true":
+            app.state.cache_warmup = {"status": "running"}
+            app.state.cache_warmup_task = asyncio.create_task(warm_response_cache(response_cache, llm_service.provider))
     
+    logger.info("App initialized", llm_provider=os.getenv('LLM_PROVIDER', 'deepseek'))
+
+async def warm_response_cache(response_cache: LLMResponseCache, provider: str):
+    """Load recent successful calls from the provider's JSON logs into the response cache"""
     try:
-        # Process the request
-        response = await call_next(request)
-        
-        # Calculate duration
-        duration_ms = (time.time() - start_time) * 1000
-        
-        # Log request completion
-        if has_logger:
-            app.state.logging_service.logger.info(f"Request completed: {method} {path} - Status: {response.status_code} - Duration: {duration_ms:.2f}ms")
-        else:
-            print(f"Request completed: {method} {path} - Status: {response.status_code} - Duration: {duration_ms:.2f}ms")
-        
-        return response
+        report = await warm_cache(
+            response_cache,
+            app.state.logging_service.json_logs_dir,
+            provider,
+            max_entries=int(os.getenv("LLM_CACHE_WARMUP_MAX_ENTRIES", "500")),
+            max_age_hours=float(os.getenv("LLM_CACHE_WARMUP_MAX_AGE_HOURS", "24"))
+        )
     except Exception as e:
-        # Calculate duration
-        duration_ms = (time.time() - start_time) * 1000
-        
-        # Log the error
-        if has_logger:
-            app.state.logging_service.logger.error(f"Request failed: {method} {path} - Error: {str(e)} - Duration: {duration_ms:.2f}ms")
-        else:
-            print(f"Request failed: {method} {path} - Error: {str(e)} - Duration: {duration_ms:.2f}ms")
-        
-        raise
+        logger.error("Response cache warm-up failed", error=str(e))
+        app.state.cache_warmup = {"status": "failed", "error": str(e)}
+        return
+    
+    app.state.cache_warmup = {"status": "done", **report}
+    logger.info("Response cache warmed", **report)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Stop a cache warm-up that is still reading the logs
+    if hasattr(app.state, 'cache_warmup_task'):
+        app.state.cache_warmup_task.cancel()
+    
+    # Flush traces and log records still queued for the background writers
+    if hasattr(app.state, 'tracing_service'):
+        app.state.tracing_service.close()
+    if hasattr(app.state, 'logging_service'):
+        app.state.logging_service.close()
+
+# Add middleware to log, time and trace all requests
+app.add_middleware(RequestLoggingMiddleware)
 
 # Include API routes
 app.include_router(router, prefix="/api")
@@ -107,4 +136,12 @@ app.include_router(router, prefix="/api")
 # Add a simple root endpoint
 @app.get("/")
 async def root():
-    return {"message": "Welcome to JD Analyzer API"} 
\ No newline at end of file
+    return {"message": "Welcome to JD Analyzer API"}
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(
+        app.state.metrics_service.render(),
+        media_type="text/plain; version=0.0.4"
+    )
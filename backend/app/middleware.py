@@ -0,0 +1,175 @@
+import json
+import time
+from contextlib import nullcontext
+from urllib.parse import parse_qs
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+
+from app.services.structured_logger import get_logger
+from app.services.timing_service import start_request_timings
+
+logger = get_logger("requests")
+
+class RequestLoggingMiddleware:
+    """
+    Pure ASGI middleware that logs, times, traces and records metrics for each request.
+
+    Unlike @app.middleware("http") (BaseHTTPMiddleware) it doesn't run the endpoint in
+    a separate task or proxy the body through a memory stream, so StreamingResponse
+    backpressure is kept. Duration is measured until the last body chunk is sent, and
+    time to first byte (response start) and response size are recorded alongside it.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        state = scope["app"].state
+
+        # Collect per-phase timings for the Server-Timing header
+        timings = start_request_timings()
+
+        request = Request(scope)
+        method = scope["method"]
+        path = scope["path"]
+
+        # Log request start; the client IP is only looked up when debug logging is on
+        logger.debug("Request started", method=method, path=path, client_ip=lambda: client_ip(request))
+
+        debug_timing = _debug_timing_requested(scope)
+        response = {"status": 500, "ttfb": None, "bytes": 0}
+        buffered = []
+
+        # Trace the request; child spans pick up the trace through contextvars
+        with start_request_trace(state, request) as root_span:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    response["status"] = message["status"]
+                    response["ttfb"] = time.perf_counter() - start_time
+
+                    headers = MutableHeaders(scope=message)
+                    if root_span is not None:
+                        headers["X-Trace-Id"] = root_span.trace_id
+
+                    # Buffer JSON bodies when the timing breakdown must be added to them
+                    if debug_timing and headers.get("content-type", "").startswith("application/json"):
+                        buffered.append(message)
+                        return
+
+                    # Streamed responses report the phases finished before the headers were sent
+                    headers["Server-Timing"] = timings.header_value(response["ttfb"] * 1000)
+                    await send(message)
+                    return
+
+                if message["type"] == "http.response.body":
+                    if buffered:
+                        buffered.append(message)
+                        if not message.get("more_body", False):
+                            await _send_with_timings(send, buffered, timings, start_time)
+                            response["bytes"] = int(MutableHeaders(scope=buffered[0]).get("content-length", 0))
+                        return
+                    response["bytes"] += len(message.get("body", b""))
+
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception as e:
+                duration_ms = (time.perf_counter() - start_time) * 1000
+                self._record(state, request, root_span, 500, duration_ms, response)
+                logger.error("Request failed", method=method, path=path, error=str(e),
+                             duration_ms=round(duration_ms, 2))
+                raise
+
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            self._record(state, request, root_span, response["status"], duration_ms, response)
+
+            # Log request completion; the logging handlers write from a background thread.
+            # Not timed: the headers, and with them Server-Timing, have already been sent
+            logger.info("Request completed", method=method, path=path, status=response["status"],
+                        duration_ms=round(duration_ms, 2),
+                        ttfb_ms=round((response["ttfb"] or 0) * 1000, 2),
+                        bytes=response["bytes"])
+
+    def _record(self, state, request: Request, root_span, status_code: int, duration_ms: float, response: dict):
+        """Record the request metrics and finish the root span"""
+        label = route_label(request)
+        if root_span is not None:
+            root_span.name = f"{request.method} {label}"
+            root_span.set_attribute("http.route", label)
+            root_span.set_attribute("http.status_code", status_code)
+            root_span.set_attribute("http.response_content_length", response["bytes"])
+
+        # Record the request metrics against the route template to keep label cardinality bounded
+        metrics_service = getattr(state, 'metrics_service', None)
+        if metrics_service is not None:
+            metrics_service.observe_request(
+                request.method, label, status_code, duration_ms / 1000,
+                ttfb_s=response["ttfb"], response_bytes=response["bytes"])
+
+
+def client_ip(request: Request) -> str:
+    """Get the client IP, preferring the first X-Forwarded-For entry"""
+    forwarded_for = request.headers.get("X-Forwarded-For")
+    if forwarded_for:
+        return forwarded_for.split(",")[0]
+    return request.client.host if request.client else "unknown"
+
+def start_request_trace(state, request: Request):
+    """Start the root span of a request, if the tracing service is configured"""
+    tracing_service = getattr(state, 'tracing_service', None)
+    if tracing_service is None:
+        return nullcontext()
+
+    return tracing_service.start_trace(
+        f"{request.method} {request.url.path}",
+        traceparent=request.headers.get("traceparent"),
+        attributes={"http.method": request.method, "http.target": request.url.path}
+    )
+
+def route_label(request: Request) -> str:
+    """Get the matched route template (e.g. /api/debug-question/{question_id}) for metric labels"""
+    route = request.scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+
+    # Routes included with a prefix may report their path without it, so restore it from the URL
+    path = request.scope.get("path", "")
+    static_part = template.split("{")[0]
+    prefix_end = path.find(static_part)
+    return path[:prefix_end] + template if prefix_end > 0 else template
+
+async def _send_with_timings(send, messages: list, timings, start_time: float):
+    """Send a buffered JSON response with a server_timing key added to its body"""
+    start_message, body_messages = messages[0], messages[1:]
+    body = b"".join(message.get("body", b"") for message in body_messages)
+    total_ms = (time.perf_counter() - start_time) * 1000
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = None
+    if isinstance(payload, dict):
+        payload["server_timing"] = timings.as_dict(total_ms)
+        body = json.dumps(payload).encode("utf-8")
+
+    headers = MutableHeaders(scope=start_message)
+    headers["Content-Length"] = str(len(body))
+    headers["Server-Timing"] = timings.header_value(total_ms)
+    await send(start_message)
+    await send({"type": "http.response.body", "body": body, "more_body": False})
+
+def _debug_timing_requested(scope) -> bool:
+    """Check for ?debug_timing=1 without building a full Request"""
+    query = scope.get("query_string", b"")
+    if b"debug_timing" not in query:
+        return False
+    values = parse_qs(query.decode("latin-1")).get("debug_timing", [""])
+    return values[0].lower() in ("1", "true")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 import uuid
 
 class JDAnalysisRequest(BaseModel):
@@ -10,9 +10,13 @@ class JDAnalysisResponse(BaseModel):
     confidence: float
     overview: str
     error: Optional[str] = None
+    # Content hash of the JD; send it instead of jd_text on later requests
+    jd_id: Optional[str] = None
 
 class QuestionGenerationRequest(BaseModel):
-    jd_text: str
+    # Either the JD text or the jd_id returned by /analyze-jd
+    jd_text: Optional[str] = None
+    jd_id: Optional[str] = None
     question_count: int = Field(..., ge=5, le=50)
 
 class Question(BaseModel):
@@ -22,20 +26,30 @@ class Question(BaseModel):
 
 class QuestionGenerationResponse(BaseModel):
     questions: List[Question]
+    jd_id: Optional[str] = None
 
 class AnswerEvaluationRequest(BaseModel):
     question_id: str
     user_answer: str
     reference_answer: str
     question_text: Optional[str] = None
+    # "provisional" returns a local score at once; the LLM's is fetched from /evaluations/{evaluation_id}
+    mode: Literal["sync", "provisional"] = "sync"
 
 class AnswerEvaluationResponse(BaseModel):
     score: float
     feedback: str
     improvement_suggestions: str
+    # Set in provisional mode
+    evaluation_id: Optional[str] = None
+    # "provisional" (local score, LLM evaluation pending), "final" (LLM score, in either mode) or
+    # "degraded" (local score, the LLM was unavailable); unset for canned feedback (e.g. too short answers)
+    status: Optional[str] = None
 
 class AnswerGenerationRequest(BaseModel):
     question_text: str
+    # Longest answer wanted; the prompt and the provider's max_tokens are derived from it
+    word_limit: int = Field(100, ge=10, le=1000)
 
 class AnswerGenerationResponse(BaseModel):
     answer: str 
\ No newline at end of file
@@ -0,0 +1,137 @@
+import math
+import os
+import re
+from typing import Dict, Any, List, Optional
+
+from app.services.relevance_service import STOP_WORDS, term_counts
+
+# Words reference answers use to describe a good answer rather than its content
+META_WORDS = frozenset([
+    "answer", "strong", "ideal", "would", "demonstrate", "mention", "discuss", "explain", "describe",
+    "show", "cover", "clear", "clearly", "specific", "detail", "detailed", "relevant", "concrete",
+    "example", "candidate", "understand", "approach", "etc"
+])
+FILLER_WORDS = STOP_WORDS | META_WORDS
+
+# Sentences, clauses and list items of a reference answer
+KEY_POINT_SEPARATORS = re.compile(r"[.;:!?]\s+|\n+|,\s*")
+LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+
+
+class KeyPoint:
+    """One clause of the reference answer and its content terms"""
+    def __init__(self, text: str, terms: set):
+        # Without the leading filler ("A strong answer would mention ..."), for suggestions
+        words = text.rstrip(".").split()
+        while len(words) > 1 and words[0].lower() in FILLER_WORDS:
+            words.pop(0)
+        self.text = " ".join(words)
+        self.terms = terms
+
+
+def split_key_points(reference_answer: str) -> List[KeyPoint]:
+    """
+    The key points of a reference answer: its sentences and comma-separated clauses
+    with at least one content term. A clause whose terms are all in the previous
+    point is merged into it.
+    """
+    points = []
+    for clause in KEY_POINT_SEPARATORS.split(reference_answer):
+        clause = LIST_MARKER.sub("", clause).strip()
+        terms = {term for term in term_counts(clause) if term not in META_WORDS}
+        if not terms:
+            continue
+        if points and terms <= points[-1].terms:
+            continue
+        points.append(KeyPoint(clause, terms))
+    return points
+
+
+class AnswerScorer:
+    """
+    Local, provisional answer score: how much of the reference answer the user's
+    answer covers, without an LLM call.
+
+    The score blends two signals, both over normalized content terms (stop words
+    and answer-describing words like "mention" removed, plurals folded):
+
+    - coverage: how many of the reference answer's key points (clauses) the answer
+      covers. A point is covered when the answer contains at least
+      `point_match_share` of its terms, and earns partial credit below that;
+    - similarity: the cosine of the sublinear TF-IDF vectors of the answer and the
+      reference, with document frequencies over the key points and the answer, so
+      terms every point repeats count for little. A cosine of `full_marks_cosine`
+      or more earns the full similarity share.
+    """
+    def __init__(self, coverage_weight: Optional[float] = None, point_match_share: float = 0.5,
+                 full_marks_cosine: float = 0.5):
+        self.coverage_weight = (coverage_weight if coverage_weight is not None
+                                else float(os.getenv("PROVISIONAL_COVERAGE_WEIGHT", "0.7")))
+        self.point_match_share = point_match_share
+        self.full_marks_cosine = full_marks_cosine
+
+    def score(self, question_text: str, user_answer: str, reference_answer: str) -> Optional[Dict[str, Any]]:
+        """
+        The provisional evaluation (score, feedback, improvement_suggestions, coverage,
+        similarity, missing points), or None when neither the reference answer nor the
+        question has content terms to compare with
+        """
+        points = split_key_points(reference_answer) or split_key_points(question_text)
+        if not points:
+            return None
+
+        answer_counts = term_counts(user_answer)
+        covered, missing = [], []
+        credit = 0.0
+        for point in points:
+            needed = self.point_match_share * len(point.terms)
+            matched = sum(1 for term in point.terms if term in answer_counts)
+            (covered if matched >= needed else missing).append(point)
+            credit += min(1.0, matched / needed)
+        coverage = credit / len(points)
+        similarity = self._cosine(answer_counts, points)
+
+        blended = (self.coverage_weight * coverage
+                   + (1 - self.coverage_weight) * min(1.0, similarity / self.full_marks_cosine))
+        return {
+            "score": round(100 * blended, 1),
+            "feedback": (f"Provisional score from comparing your answer with the reference answer: "
+                         f"it covers {len(covered)} of {len(points)} key points."),
+            "improvement_suggestions": self._suggestions(missing),
+            "coverage": coverage,
+            "similarity": similarity,
+            "missing_points": [point.text for point in missing]
+        }
+
+    def _cosine(self, answer_counts: Dict[str, int], points: List[KeyPoint]) -> float:
+        # Document frequencies over the key points and the answer
+        documents = [point.terms for point in points] + [set(answer_counts)]
+        document_frequency = {}
+        for terms in documents:
+            for term in terms:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        total = len(documents)
+        idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+        reference_counts = {}
+        for point in points:
+            for term in point.terms:
+                reference_counts[term] = reference_counts.get(term, 0) + 1
+        answer_vector = self._tfidf(answer_counts, idf)
+        reference_vector = self._tfidf(reference_counts, idf)
+
+        dot = sum(weight * reference_vector.get(term, 0.0) for term, weight in answer_vector.items())
+        norms = (math.sqrt(sum(w * w for w in answer_vector.values()))
+                 * math.sqrt(sum(w * w for w in reference_vector.values())))
+        return dot / norms if norms else 0.0
+
+    @staticmethod
+    def _tfidf(counts: Dict[str, int], idf: Dict[str, float]) -> Dict[str, float]:
+        return {term: (1 + math.log(count)) * idf[term] for term, count in counts.items()}
+
+    @staticmethod
+    def _suggestions(missing: List[KeyPoint], limit: int = 3) -> str:
+        if not missing:
+            return "Your answer touches every key point; add concrete examples and results to strengthen it."
+        return "Also address: " + "; ".join(point.text for point in missing[:limit]) + "."
+
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import random
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.services.relevance_service import tokenize
+
+# MinHash signature length, split into BANDS bands of ROWS rows for the candidate lookup.
+# With 10 bands of 3 rows, questions with a Jaccard similarity of 0.7 share a band with
+# probability 1 - (1 - 0.7 ** 3) ** 10, about 98.5% (0.8: 99.96%), while unrelated questions
+# sharing only stock phrasing (Jaccard around 0.2) do so with about 8%.
+NUM_PERMUTATIONS = 30
+ROWS = 3
+BANDS = NUM_PERMUTATIONS // ROWS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20240327)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(_MERSENNE_PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+# Term -> its hash under every permutation, shared by all indexes
+_TERM_HASHES = {}
+_TERM_HASHES_MAX_SIZE = 50_000
+
+def shingles(text: str) -> frozenset:
+    """
+    The set of content words of a question (stop words removed, plurals folded), so
+    rephrasings such as "have used" vs "used" compare as equal
+    """
+    return frozenset(tokenize(text))
+
+def _term_hashes(term: str) -> Tuple[int, ...]:
+    hashes = _TERM_HASHES.get(term)
+    if hashes is None:
+        if len(_TERM_HASHES) > _TERM_HASHES_MAX_SIZE:
+            _TERM_HASHES.clear()
+        base = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "big")
+        hashes = _TERM_HASHES[term] = tuple((a * base + b) % _MERSENNE_PRIME for a, b in _PERMUTATIONS)
+    return hashes
+
+def minhash(terms: frozenset) -> Tuple[int, ...]:
+    """MinHash signature of a term set; equal positions estimate the Jaccard similarity"""
+    if not terms:
+        return ()
+    if len(terms) == 1:
+        return _term_hashes(next(iter(terms)))
+    return tuple(map(min, *[_term_hashes(term) for term in terms]))
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateIndex:
+    """
+    Finds near-duplicate questions in O(n) with MinHash and banding.
+
+    Each question is only compared with the questions sharing one of its signature
+    bands (locality-sensitive hashing), and candidates are confirmed with the exact
+    Jaccard similarity of their content-word sets.
+    """
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = threshold if threshold is not None else float(os.getenv("NEAR_DUPLICATE_SIMILARITY", "0.7"))
+        self.term_sets = []
+        self._bands = [{} for _ in range(BANDS)]
+
+    def __len__(self) -> int:
+        return len(self.term_sets)
+
+    def find(self, terms: frozenset, signature: Optional[Tuple[int, ...]] = None) -> Optional[int]:
+        """Index of an added near-duplicate of the term set, if any"""
+        signature = signature if signature is not None else minhash(terms)
+        if not signature:
+            return None
+        # Every question sharing a band is a candidate; each is checked once
+        candidates = set()
+        for band, buckets in enumerate(self._bands):
+            candidates.update(buckets.get(signature[band * ROWS:(band + 1) * ROWS], ()))
+        for index in sorted(candidates):
+            if jaccard(terms, self.term_sets[index]) >= self.threshold:
+                return index
+        return None
+
+    def add(self, terms: frozenset, signature: Optional[Tuple[int, ...]] = None) -> int:
+        signature = signature if signature is not None else minhash(terms)
+        index = len(self.term_sets)
+        self.term_sets.append(terms)
+        if signature:
+            for band, buckets in enumerate(self._bands):
+                buckets.setdefault(signature[band * ROWS:(band + 1) * ROWS], []).append(index)
+        return index
+
+    def add_if_new(self, text: str) -> bool:
+        """Add the text unless it is a near-duplicate of one already added"""
+        terms = shingles(text)
+        signature = minhash(terms)
+        if self.find(terms, signature) is not None:
+            return False
+        self.add(terms, signature)
+        return True
+
+
+def cycle_pairs(first: List[Any], second: List[Any]) -> Iterator[Tuple[Any, Any]]:
+    """
+    Every (first, second) pair once, starting as cycling both lists together does
+    (first[i % n], second[i % m]), then shifting the second list to reach the pairs
+    that cycling alone repeats instead of visiting
+    """
+    for shift in range(len(second)):
+        for i, item in enumerate(first):
+            yield item, second[(i + shift) % len(second)]
+
+
+def remove_near_duplicates(questions: List[Dict[str, str]],
+                           index: Optional[NearDuplicateIndex] = None) -> Tuple[List[Dict[str, str]], int]:
+    """
+    Keep the first of each group of near-duplicate questions (compared by question text).
+
+    Pass an existing index to also drop questions that duplicate ones kept earlier.
+    Returns the kept questions, in order, and the number removed.
+    """
+    index = index if index is not None else NearDuplicateIndex()
+    kept = [q for q in questions if index.add_if_new(q.get("text", ""))]
+    return kept, len(questions) - len(kept)
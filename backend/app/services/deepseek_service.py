@@ -1,44 +1,75 @@
 import os
 import httpx
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import json
 import re
 import time
 import asyncio
+from app.services.llm_provider import LLMProvider
+from app.services.prompts import DEFAULT_ANSWER_WORD_LIMIT, PROMPTS, TokenBudget
+from app.services.skill_lexicon import SKILL_LEXICON
+from app.services.timing_service import timed
+from app.services.tracing_service import traced
+from app.services.structured_logger import get_logger
 
-class DeepSeekService:
+logger = get_logger("deepseek_service")
+
+class DeepSeekAPIError(Exception):
+    """Raised when the DeepSeek API returns a non-200 response"""
+    pass
+
+class DeepSeekService(LLMProvider):
+    # Provider name used for metrics, spans and the JSON log file ({provider}_api_YYYYMMDD.json)
+    provider = "deepseek"
+    # Prompt templates used (app/services/prompts.py)
+    prompt_family = "deepseek"
+    
     def __init__(self):
         # Get API key from OS environment variable
         self.api_key = os.environ.get("DEEPSEEK_API_KEY")
         self.model = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
-        self.api_url = "https://api.deepseek.com/v1/chat/completions"
+        # Operation -> model used instead of self.model (set by llm_factory)
+        self.operation_models = {}
+        # DEEPSEEK_BASE_URL can point at a compatible server (e.g. benchmarks/mock_llm_server.py)
+        base_url = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1").rstrip("/")
+        self.api_url = f"{base_url}/chat/completions"
         
         if not self.api_key:
-            print("WARNING: DEEPSEEK_API_KEY environment variable is not set")
+            logger.warning("DEEPSEEK_API_KEY environment variable is not set")
             # For development/testing, you can use a mock response
             self.use_mock = True
         else:
             self.use_mock = False
+        
+        # Prompt and completion token budgets per operation
+        self.token_budget = TokenBudget()
     
-    async def _call_api(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> Dict[str, Any]:
+    @traced("deepseek.chat_completion", kind="CLIENT")
+    async def _call_api(self, messages: List[Dict[str, str]], temperature: float = 0.7,
+                        max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        # Send the prompts without the indentation of their triple-quoted templates
+        messages = self._compact_messages(messages)
+        model = self._model_for(messages)
+        
         if self.use_mock:
-            print("Using mock response (no API key provided)")
-            start_time = time.time()
-            mock_response = self._get_mock_response(messages)
-            duration_ms = (time.time() - start_time) * 1000
+            logger.debug("Using mock response (no API key provided)")
+            start_time = time.perf_counter()
+            with timed("llm"):
+                mock_response = self._get_mock_response(messages)
+            duration_ms = (time.perf_counter() - start_time) * 1000
             
             # Log the mock API call
-            if hasattr(self, 'logging_service'):
-                operation = self._determine_operation(messages)
-                self.logging_service.log_deepseek_api(
-                    operation=operation,
-                    request_data={"messages": messages, "temperature": temperature},
-                    response_data=mock_response,
-                    duration_ms=duration_ms,
-                    is_mock=True
-                )
+            self._log_llm_call(messages, temperature, response_data=mock_response,
+                               duration_ms=duration_ms, is_mock=True)
             
             return mock_response
+        
+        # Serve repeated prompts from the response cache, if attached
+        if hasattr(self, 'response_cache'):
+            cached_response = self.response_cache.get(self._determine_operation(messages), model, messages)
+            if cached_response is not None:
+                self._log_llm_call(messages, temperature, response_data=cached_response, duration_ms=0.0, cache_hit=True)
+                return cached_response
             
         headers = {
             "Content-Type": "application/json",
@@ -46,76 +77,65 @@ class DeepSeekService:
         }
         
         payload = {
-            "model": self.model,
+            "model": model,
             "messages": messages,
             "temperature": temperature
         }
+        # Stop generation at the source rather than truncating what comes back
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
         
-        print(f"Calling DeepSeek API with payload: {payload}")
+        logger.debug("Calling DeepSeek API", model=model, messages=len(messages), max_tokens=max_tokens,
+                     prompt_chars=lambda: sum(len(m["content"]) for m in messages))
         
+        start_time = time.perf_counter()
         try:
-            start_time = time.time()
             async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=headers,
-                    json=payload,
-                    timeout=30.0
-                )
+                with timed("llm"):
+                    response = await client.post(
+                        self.api_url,
+                        headers=headers,
+                        json=payload,
+                        timeout=30.0
+                    )
                 
-                duration_ms = (time.time() - start_time) * 1000
+                duration_ms = (time.perf_counter() - start_time) * 1000
                 
                 if response.status_code != 200:
                     error_text = response.text
-                    print(f"DeepSeek API error: Status {response.status_code}, Response: {error_text}")
+                    logger.error("DeepSeek API error", status=response.status_code, response=error_text)
                     
                     # Log the failed API call
-                    if hasattr(self, 'logging_service'):
-                        operation = self._determine_operation(messages)
-                        self.logging_service.log_deepseek_api(
-                            operation=operation,
-                            request_data={"messages": messages, "temperature": temperature},
-                            error=f"Status {response.status_code}: {error_text}",
-                            duration_ms=duration_ms,
-                            is_mock=False
-                        )
+                    self._log_llm_call(messages, temperature, error=f"Status {response.status_code}: {error_text}",
+                                       duration_ms=duration_ms)
                     
-                    raise Exception(f"DeepSeek API error: {error_text}")
+                    raise DeepSeekAPIError(f"DeepSeek API error: {error_text}")
                     
                 response_data = response.json()
                 
                 # Log the successful API call
-                if hasattr(self, 'logging_service'):
-                    operation = self._determine_operation(messages)
-                    self.logging_service.log_deepseek_api(
-                        operation=operation,
-                        request_data={"messages": messages, "temperature": temperature},
-                        response_data=response_data,
-                        duration_ms=duration_ms,
-                        is_mock=False
-                    )
+                self._log_llm_call(messages, temperature, response_data=response_data, duration_ms=duration_ms)
+                if hasattr(self, 'response_cache'):
+                    self.response_cache.put(self._determine_operation(messages), model, messages, response_data)
                 
                 return response_data
+        except DeepSeekAPIError:
+            raise
         except Exception as e:
-            print(f"Exception during API call: {str(e)}")
+            logger.error("Exception during API call", error=str(e))
             
             # Log the exception
-            if hasattr(self, 'logging_service'):
-                operation = self._determine_operation(messages)
-                self.logging_service.log_deepseek_api(
-                    operation=operation,
-                    request_data={"messages": messages, "temperature": temperature},
-                    error=str(e),
-                    is_mock=False
-                )
+            self._log_llm_call(messages, temperature, error=str(e),
+                               duration_ms=(time.perf_counter() - start_time) * 1000)
             
             raise
     
     def _get_mock_response(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
         """Generate mock responses for testing without an API key"""
         user_message = next((m["content"] for m in messages if m["role"] == "user"), "")
+        operation = self._determine_operation(messages)
         
-        if "generate" in user_message.lower() and "questions" in user_message.lower():
+        if operation == "generate_questions":
             # Try to extract the requested question count
             count_match = re.search(r'generate exactly (\d+)', user_message)
             question_count = int(count_match.group(1)) if count_match else 5
@@ -124,35 +144,13 @@ class DeepSeekService:
             jd_match = re.search(r'Job Description:\s*(.*?)(?:\n\s*Return your response|$)', user_message, re.DOTALL)
             jd_text = jd_match.group(1).strip() if jd_match else ""
             
-            print(f"Generating mock response with {question_count} questions for JD: {jd_text[:100]}...")
+            logger.debug("Generating mock questions", question_count=question_count, jd_length=len(jd_text))
             
             # Generate mock questions based on keywords in the JD
             mock_questions = []
             
-            # Extract keywords from the JD
-            jd_lower = jd_text.lower()
-            keywords = []
-            
-            if "python" in jd_lower:
-                keywords.append("Python")
-            if "javascript" in jd_lower or "js" in jd_lower:
-                keywords.append("JavaScript")
-            if "react" in jd_lower:
-                keywords.append("React")
-            if "node" in jd_lower:
-                keywords.append("Node.js")
-            if "api" in jd_lower or "rest" in jd_lower:
-                keywords.append("API")
-            if "database" in jd_lower or "sql" in jd_lower:
-                keywords.append("database")
-            if "cloud" in jd_lower or "aws" in jd_lower or "azure" in jd_lower:
-                keywords.append("cloud")
-            if "docker" in jd_lower or "container" in jd_lower:
-                keywords.append("Docker")
-            if "agile" in jd_lower or "scrum" in jd_lower:
-                keywords.append("Agile")
-            if "test" in jd_lower or "qa" in jd_lower:
-                keywords.append("testing")
+            # Extract the broad topics of the skills the JD mentions
+            keywords = SKILL_LEXICON.topics(jd_text)
             
             # If no keywords were found, use some defaults
             if not keywords:
@@ -182,7 +180,7 @@ class DeepSeekService:
                     }
                 ]
             }
-        elif "analyze" in user_message.lower() and "job description" in user_message.lower():
+        elif operation == "analyze_jd":
             # Mock response for JD analysis
             return {
                 "choices": [
@@ -199,7 +197,7 @@ class DeepSeekService:
                     }
                 ]
             }
-        elif "evaluate" in user_message.lower() and "answer" in user_message.lower():
+        elif operation == "evaluate_answer":
             # Mock response for answer evaluation
             return {
                 "choices": [
@@ -216,12 +214,12 @@ class DeepSeekService:
                     }
                 ]
             }
-        elif "provide a comprehensive" in user_message.lower() and "answer" in user_message.lower():
+        elif operation == "generate_answer":
             # Extract the question from the prompt
             question_match = re.search(r'Question:\s*(.*?)(?:\n|Your answer should:|$)', user_message, re.DOTALL)
             question = question_match.group(1).strip() if question_match else "the interview question"
             
-            print(f"Generating mock answer for question: {question[:50]}...")
+            logger.debug("Generating mock answer", question=question)
             
             # Generate a more specific mock answer based on keywords in the question
             question_lower = question.lower()
@@ -263,7 +261,6 @@ class DeepSeekService:
                 In my previous roles, I've tackled similar challenges by breaking down complex problems into manageable components and implementing systematic solutions. For example, when working on a project that required optimizing performance, I conducted thorough analysis to identify bottlenecks and implemented targeted improvements that resulted in a 35% efficiency gain.
                 """
             
-            print(f"Generated mock answer: {mock_answer[:100]}...")
             
             return {
                 "choices": [
@@ -288,129 +285,79 @@ class DeepSeekService:
     
     async def analyze_jd(self, jd_text: str) -> Tuple[bool, float, str]:
         """
-        Analyze if the text is a job description and return confidence score and overview
-        """
-        prompt = f"""
-        Analyze the following text and determine if it constitutes a professional job description. 
-        Consider factors like presence of job responsibilities, required qualifications, and company information. 
-        Return confidence percentage (0-100%) and a concise 3-sentence overview highlighting key aspects if it is a JD.
-        
-        Text to analyze:
-        {jd_text}
-        
-        Return your response in JSON format with the following structure:
-        {{
-            "is_valid_jd": true/false,
-            "confidence": 0-100,
-            "overview": "3-sentence overview if valid"
-        }}
+        Analyze if the text is a job description and return confidence score and overview.
+        Raises when the API call fails or the response has no verdict, so the caller can fall back.
         """
+        messages, max_tokens = self._budgeted_prompt("analyze_jd", jd_text=jd_text)
         
-        messages = [
-            {"role": "system", "content": "You are an AI assistant that analyzes job descriptions."},
-            {"role": "user", "content": prompt}
-        ]
-        
-        response = await self._call_api(messages, temperature=0.3)
+        response = await self._call_api(messages, temperature=0.3, max_tokens=max_tokens)
         content = response["choices"][0]["message"]["content"]
         
-        try:
-            result = json.loads(content)
-            return (
-                result["is_valid_jd"],
-                result["confidence"],
-                result["overview"] if result["is_valid_jd"] else ""
-            )
-        except (json.JSONDecodeError, KeyError):
-            # Fallback parsing if the model doesn't return valid JSON
-            is_valid = "true" in content.lower() and "false" not in content.lower()
-            confidence = 0.0
-            overview = ""
-            
-            # Try to extract confidence
-            confidence_match = re.search(r'confidence"?\s*:\s*(\d+\.?\d*)', content)
-            if confidence_match:
-                confidence = float(confidence_match.group(1))
-            
-            # Try to extract overview
-            overview_match = re.search(r'overview"?\s*:\s*"([^"]+)"', content)
-            if overview_match:
-                overview = overview_match.group(1)
+        with timed("parse"):
+            try:
+                result = json.loads(content)
+                return (
+                    result["is_valid_jd"],
+                    result["confidence"],
+                    result["overview"] if result["is_valid_jd"] else ""
+                )
+            except (json.JSONDecodeError, KeyError):
+                # Fallback parsing if the model doesn't return valid JSON
+                if "true" not in content.lower() and "false" not in content.lower():
+                    raise ValueError("No verdict in the analysis response")
+                is_valid = "true" in content.lower() and "false" not in content.lower()
+                confidence = 0.0
+                overview = ""
+            
+                # Try to extract confidence
+                confidence_match = re.search(r'confidence"?\s*:\s*(\d+\.?\d*)', content)
+                if confidence_match:
+                    confidence = float(confidence_match.group(1))
+            
+                # Try to extract overview
+                overview_match = re.search(r'overview"?\s*:\s*"([^"]+)"', content)
+                if overview_match:
+                    overview = overview_match.group(1)
                 
-            return is_valid, confidence, overview
+                return is_valid, confidence, overview
     
-    async def generate_questions(self, jd_text: str, question_count: int) -> List[Dict[str, str]]:
+    async def _generate_question_batch(self, jd_text: str, question_count: int) -> List[Dict[str, str]]:
         """
-        Generate questions based on the job description
+        Generate questions based on the job description, in one call (see LLMProvider.generate_questions)
         """
-        prompt = f"""
-        Based on the following job description, generate exactly {question_count} relevant interview questions 
-        that would help assess a candidate's fit for this role. For each question, also provide a 
-        reference answer that would be considered correct.
-        
-        The questions should:
-        1. Be directly related to the specific skills, technologies, and requirements mentioned in the job description
-        2. Cover both technical skills and soft skills required for the role
-        3. Include questions about specific technologies mentioned in the JD
-        4. Include questions about relevant experience for the role
-        5. Be specific and tailored to this exact job, not generic interview questions
-        
-        Job Description:
-        {jd_text}
-        
-        Return your response in JSON format with the following structure:
-        {{
-            "questions": [
-                {{
-                    "text": "question 1",
-                    "reference_answer": "reference answer 1"
-                }},
-                {{
-                    "text": "question 2",
-                    "reference_answer": "reference answer 2"
-                }},
-                ...
-            ]
-        }}
-        
-        Important: Please generate exactly {question_count} questions, no more and no less.
-        Important: Make sure each question is directly relevant to the specific job description provided.
-        """
-        
-        messages = [
-            {"role": "system", "content": "You are an AI assistant that helps generate relevant interview questions based on job descriptions."},
-            {"role": "user", "content": prompt}
-        ]
+        messages, max_tokens = self._budgeted_prompt("generate_questions", jd_text=jd_text, question_count=question_count)
         
         try:
-            response = await self._call_api(messages, temperature=0.5)
+            response = await self._call_api(messages, temperature=0.5, max_tokens=max_tokens)
             content = response["choices"][0]["message"]["content"]
             
-            print(f"Raw response from question generation: {content[:200]}...")
+            logger.debug("Raw response from question generation", content=content)
             
-            try:
-                result = json.loads(content)
-                if "questions" in result and isinstance(result["questions"], list):
-                    questions = result["questions"]
-                    print(f"Parsed {len(questions)} questions from JSON response (requested {question_count})")
+            with timed("parse"):
+                try:
+                    result = json.loads(content)
+                    if "questions" in result and isinstance(result["questions"], list):
+                        questions = result["questions"]
+                        logger.debug("Parsed questions from JSON response", count=len(questions), requested=question_count)
                     
-                    # If we got fewer questions than requested, log a warning
-                    if len(questions) < question_count:
-                        print(f"Warning: Generated fewer questions ({len(questions)}) than requested ({question_count})")
+                        # If we got fewer questions than requested, log a warning
+                        if len(questions) < question_count:
+                            logger.warning("Generated fewer questions than requested", count=len(questions), requested=question_count)
                     
-                    return questions
-                else:
-                    print("Invalid response format - missing 'questions' array")
-                    # Try to extract questions with regex as fallback
+                        return questions
+                    else:
+                        logger.warning("Invalid response format - missing 'questions' array")
+                        # Try to extract questions with regex as fallback
+                        return self._extract_questions_fallback(content)
+                except (json.JSONDecodeError, KeyError) as e:
+                    logger.warning("Error parsing JSON response", error=str(e))
+                    # Fallback parsing if the model doesn't return valid JSON
                     return self._extract_questions_fallback(content)
-            except (json.JSONDecodeError, KeyError) as e:
-                print(f"Error parsing JSON response: {e}")
-                # Fallback parsing if the model doesn't return valid JSON
-                return self._extract_questions_fallback(content)
         except Exception as e:
-            print(f"API call error: {e}")
+            logger.error("API call error", error=str(e))
             return []
         
+    @traced("fallback.extract_questions")
     def _extract_questions_fallback(self, content: str) -> List[Dict[str, str]]:
         """
         Fallback method to extract questions if JSON parsing fails
@@ -445,40 +392,23 @@ class DeepSeekService:
                     "reference_answer": answer.strip()
                 })
         
-        print(f"Extracted {len(questions)} questions using fallback method")
+        logger.debug("Extracted questions using fallback method", count=len(questions))
         return questions
     
     async def evaluate_answer(self, question: str, user_answer: str, reference_answer: str) -> Tuple[float, str, str]:
         """
-        Evaluate a user's answer against a reference answer
+        Evaluate a user's answer against a reference answer.
+        Raises when the API call fails or the response has no score, so the caller can fall back.
         """
-        prompt = f"""
-        Evaluate the user's answer to the following interview question. Compare it semantically with 
-        the reference answer and provide a score from 0 to 100, feedback, and suggestions for improvement.
+        messages, max_tokens = self._budgeted_prompt("evaluate_answer", question=question, reference_answer=reference_answer,
+                                                   user_answer=user_answer)
         
-        Question: {question}
-        Reference Answer: {reference_answer}
-        User Answer: {user_answer}
-        
-        Return your response in JSON format with the following structure:
-        {{
-            "score": 0-100,
-            "feedback": "detailed feedback on the answer",
-            "improvement_suggestions": "suggestions for improvement"
-        }}
-        """
+        response = await self._call_api(messages, temperature=0.3, max_tokens=max_tokens)
+        content = response["choices"][0]["message"]["content"]
         
-        messages = [
-            {"role": "system", "content": "You are an AI assistant that evaluates interview answers."},
-            {"role": "user", "content": prompt}
-        ]
+        logger.debug("Raw evaluation response", content=content)
         
-        try:
-            response = await self._call_api(messages, temperature=0.3)
-            content = response["choices"][0]["message"]["content"]
-            
-            print(f"Raw evaluation response: {content[:200]}...")
-            
+        with timed("parse"):
             try:
                 result = json.loads(content)
                 return (
@@ -487,13 +417,9 @@ class DeepSeekService:
                     result["improvement_suggestions"]
                 )
             except (json.JSONDecodeError, KeyError) as e:
-                print(f"Error parsing evaluation JSON: {e}")
+                logger.warning("Error parsing evaluation JSON", error=str(e))
                 # Try to extract with regex as fallback
                 return self._extract_evaluation_fallback(content)
-        except Exception as e:
-            print(f"Error in evaluate_answer: {e}")
-            # Return default values
-            return 70.0, "Your answer covers some key points.", "Consider adding more specific examples and technical details."
 
     def _extract_evaluation_fallback(self, content: str) -> Tuple[float, str, str]:
         """Extract evaluation data using regex if JSON parsing fails"""
@@ -501,7 +427,9 @@ class DeepSeekService:
         
         # Try to extract score
         score_match = re.search(r'score"?\s*:?\s*(\d+)', content, re.IGNORECASE)
-        score = float(score_match.group(1)) if score_match else 50.0
+        if not score_match:
+            raise ValueError("No score in the evaluation response")
+        score = float(score_match.group(1))
         
         # Try to extract feedback
         feedback_match = re.search(r'feedback"?\s*:?\s*"([^"]+)', content, re.IGNORECASE)
@@ -513,47 +441,28 @@ class DeepSeekService:
         
         return score, feedback, suggestions 
 
-    async def generate_answer(self, question_text: str) -> str:
+    async def generate_answer(self, question_text: str, word_limit: int = DEFAULT_ANSWER_WORD_LIMIT) -> str:
         """
-        Generate an answer for a given question
+        Generate an answer of at most word_limit words for a given question
         """
-        prompt = f"""
-        Please provide a comprehensive and well-structured answer to the following interview question:
-        
-        Question: {question_text}
-        
-        Your answer should:
-        - Be detailed and thorough
-        - Include specific examples where appropriate
-        - Demonstrate technical knowledge and expertise
-        - Be structured in a clear and logical way
-        
-        Answer:
-        """
-        
-        messages = [
-            {"role": "system", "content": "You are an AI assistant that helps job candidates prepare for interviews by generating high-quality answers to interview questions."},
-            {"role": "user", "content": prompt}
-        ]
+        messages, max_tokens = self._budgeted_prompt("generate_answer", question_text=question_text, word_limit=word_limit)
         
         try:
-            print(f"Calling API to generate answer for question: {question_text[:50]}...")
-            response = await self._call_api(messages, temperature=0.7)
+            logger.debug("Calling API to generate answer", question=question_text)
+            response = await self._call_api(messages, temperature=0.7, max_tokens=max_tokens)
             
             # Debug the raw response
-            print(f"Raw response type: {type(response)}")
-            print(f"Raw response keys: {response.keys() if isinstance(response, dict) else 'Not a dict'}")
             
             if not isinstance(response, dict) or "choices" not in response:
-                print(f"Invalid response format: {response}")
+                logger.warning("Invalid response format", response=response)
                 return "Error: Received invalid response format from the API."
             
             if not response["choices"] or not isinstance(response["choices"], list):
-                print(f"No choices in response: {response}")
+                logger.warning("No choices in response", response=response)
                 return "Error: No answer choices in the response."
             
             content = response["choices"][0]["message"]["content"]
-            print(f"Raw content from API: {content[:100]}...")
+            logger.debug("Raw content from API", content=content)
             
             # Clean up the response
             answer = content.strip()
@@ -564,13 +473,16 @@ class DeepSeekService:
             
             return answer
         except Exception as e:
-            print(f"Error in generate_answer: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Error in generate_answer", exc_info=True, error=str(e))
             return "I couldn't generate an answer at this time. Please try again later or write your own answer." 
 
     def _determine_operation(self, messages: List[Dict[str, str]]) -> str:
         """Determine the operation type based on the messages content"""
+        operation = PROMPTS.operation_of(messages)
+        if operation:
+            return operation
+        
+        # Prompts built before the template registry (e.g. in replayed logs)
         user_message = next((m["content"] for m in messages if m["role"] == "user"), "")
         
         if "generate" in user_message.lower() and "questions" in user_message.lower():
@@ -584,31 +496,12 @@ class DeepSeekService:
         else:
             return "unknown_operation" 
 
-    async def generate_answer_stream(self, question_text: str):
+    async def generate_answer_stream(self, question_text: str, word_limit: int = DEFAULT_ANSWER_WORD_LIMIT):
         """
         Generate an answer for a given question with streaming
         """
-        prompt = f"""
-        Please provide a comprehensive and well-structured answer to the following interview question:
-        
-        Question: {question_text}
-        
-        Your answer should:
-        - Be detailed and thorough
-        - Include specific examples where appropriate
-        - Demonstrate technical knowledge and expertise
-        - Be structured in a clear and logical way
-        
-        Answer:
-        """
-        
-        messages = [
-            {"role": "system", "content": "You are an AI assistant that helps job candidates prepare for interviews by generating high-quality answers to interview questions."},
-            {"role": "user", "content": prompt}
-        ]
-        
         if self.use_mock:
-            print("Using mock response for streaming answer generation")
+            logger.debug("Using mock response for streaming answer generation")
             # For mock responses, simulate streaming by yielding chunks of text
             mock_answer = self._get_mock_answer_for_question(question_text)
             
@@ -625,16 +518,16 @@ class DeepSeekService:
             return
         
         try:
-            print("Calling real API for streaming answer generation")
+            logger.debug("Calling real API for streaming answer generation")
             # For real API, we'll use the non-streaming API and simulate streaming
             # In a production environment, you would use the actual streaming API
-            full_answer = await self.generate_answer(question_text)
+            full_answer = await self.generate_answer(question_text, word_limit)
             
             if not full_answer or len(full_answer) < 20:
-                print(f"Error: Generated answer too short: {full_answer}")
+                logger.warning("Generated answer too short", answer=full_answer)
                 raise ValueError("Generated answer is too short or empty")
             
-            print(f"Successfully generated full answer of length {len(full_answer)}")
+            logger.debug("Generated full answer", length=len(full_answer))
             
             # Split into sentences for more natural streaming
             sentences = re.split(r'(?<=[.!?])\s+', full_answer)
@@ -644,9 +537,7 @@ class DeepSeekService:
                 await asyncio.sleep(0.2)  # Slightly longer delay between sentences
             
         except Exception as e:
-            print(f"Error in generate_answer_stream: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Error in generate_answer_stream", exc_info=True, error=str(e))
             
             # Generate a fallback answer
             fallback = "I couldn't generate an answer at this time due to a technical issue. Please try again later or write your own answer based on your experience and knowledge."
@@ -0,0 +1,199 @@
+"""
+Local JD classifier: logistic regression over word unigrams and bigrams, used by
+JDService.analyze_jd to answer obvious cases without calling the LLM.
+
+The model is trained offline from the analyze_jd calls in the provider JSON logs
+(the LLM's is_valid_jd is the label) plus the labeled seed examples shipped next
+to this module, and is stored as a small JSON artifact of feature weights.
+
+Retrain from the backend directory:
+    python -m app.services.jd_classifier --log-dir logs/json
+"""
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import string
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL_PATH = os.path.join(MODULE_DIR, "jd_classifier_model.json")
+DEFAULT_SEED_PATH = os.path.join(MODULE_DIR, "jd_classifier_seed.jsonl")
+
+# Punctuation separates tokens and every digit becomes "0" ("5+ years" -> "0 years");
+# str.translate and split are several times faster than a tokenizing regex
+TOKEN_TABLE = str.maketrans({**{char: " " for char in string.punctuation}, **{digit: "0" for digit in string.digits}})
+
+# Only the start of longer texts is classified, which keeps predictions well under a millisecond
+MAX_TEXT_CHARS = 8000
+
+# The JD in a logged analyze_jd prompt (current template and older layouts)
+LOGGED_JD_PATTERN = re.compile(r"Text to analyze:\s*(?P<jd_text>.*?)\s*(?:Return your response in JSON|$)", re.DOTALL)
+LOGGED_LABEL_PATTERN = re.compile(r'"is_valid_jd"\s*:\s*(?P<label>true|false)', re.IGNORECASE)
+
+def extract_features(text: str) -> List[str]:
+    """The distinct unigrams and bigrams of the text"""
+    tokens = text.lower().translate(TOKEN_TABLE).split()
+    features = set(tokens)
+    features.update(map(" ".join, zip(tokens, tokens[1:])))
+    return list(features)
+
+
+class JDClassifier:
+    """
+    Binary logistic regression over the presence of unigrams and bigrams.
+
+    Each text is an L2-normalized binary feature vector, so long and short texts
+    produce comparable scores. Features missing from the weights count as zero.
+    """
+    def __init__(self, bias: float, weights: Dict[str, float], metadata: Optional[Dict[str, Any]] = None):
+        self.bias = bias
+        self.weights = weights
+        self.metadata = metadata or {}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> "JDClassifier":
+        with open(path, "r") as f:
+            artifact = json.load(f)
+        return cls(artifact["bias"], artifact["weights"], artifact.get("metadata"))
+
+    def save(self, path: str = DEFAULT_MODEL_PATH):
+        with open(path, "w") as f:
+            json.dump({"bias": self.bias, "weights": self.weights, "metadata": self.metadata}, f, sort_keys=True)
+            f.write("\n")
+
+    def probability(self, text: str) -> float:
+        """Probability that the text is a job description"""
+        features = extract_features(text[:MAX_TEXT_CHARS])
+        if not features:
+            return 1 / (1 + math.exp(-self.bias))
+        weights = self.weights
+        score = self.bias + sum(weights.get(feature, 0.0) for feature in features) / math.sqrt(len(features))
+        # Clamp so exp cannot overflow on extreme scores
+        score = max(-30.0, min(30.0, score))
+        return 1 / (1 + math.exp(-score))
+
+
+def train_classifier(examples: List[Tuple[str, bool]], epochs: int = 200, learning_rate: float = 10.0,
+                     l2: float = 1e-5, max_features: int = 1500, seed: int = 13) -> JDClassifier:
+    """
+    Fit the logistic regression with SGD and keep the max_features largest weights.
+    examples are (text, is_valid_jd) pairs.
+    """
+    rng = random.Random(seed)
+    data = []
+    for text, label in examples:
+        # Sorted, so training does not depend on the string hash seed
+        features = sorted(extract_features(text))
+        if features:
+            data.append((features, 1 / math.sqrt(len(features)), 1.0 if label else 0.0))
+
+    bias = 0.0
+    weights = {}
+    for epoch in range(epochs):
+        rng.shuffle(data)
+        rate = learning_rate / (1 + epoch * 0.1)
+        for features, value, label in data:
+            score = bias + value * sum(weights.get(feature, 0.0) for feature in features)
+            score = max(-30.0, min(30.0, score))
+            gradient = 1 / (1 + math.exp(-score)) - label
+            bias -= rate * gradient
+            for feature in features:
+                weight = weights.get(feature, 0.0)
+                weights[feature] = weight - rate * (gradient * value + l2 * weight)
+
+    kept = sorted(weights.items(), key=lambda item: abs(item[1]), reverse=True)[:max_features]
+    return JDClassifier(round(bias, 4), {feature: round(weight, 4) for feature, weight in kept if round(weight, 4)})
+
+def read_logged_examples(log_dir: str) -> List[Tuple[str, bool]]:
+    """
+    (JD text, is_valid_jd) pairs from the successful analyze_jd calls in the provider
+    JSON logs ({provider}_api_YYYYMMDD.json). Mock calls, errors and response cache
+    hits are skipped. The texts are as sent to the LLM, i.e. preprocessed.
+    """
+    examples = []
+    for path in sorted(glob.glob(os.path.join(log_dir, "*_api_*.json"))):
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    if (entry.get("operation") != "analyze_jd" or entry.get("error") or entry.get("is_mock")
+                            or entry.get("cache_hit")):
+                        continue
+                    prompt = entry["request"]["messages"][-1]["content"]
+                    content = entry["response"]["choices"][0]["message"]["content"]
+                except (json.JSONDecodeError, KeyError, IndexError, TypeError):
+                    continue
+                jd_match = LOGGED_JD_PATTERN.search(prompt)
+                label_match = LOGGED_LABEL_PATTERN.search(content)
+                if jd_match and label_match:
+                    examples.append((jd_match.group("jd_text"), label_match.group("label").lower() == "true"))
+    return examples
+
+def read_seed_examples(path: str = DEFAULT_SEED_PATH) -> List[Tuple[str, bool]]:
+    """(text, is_valid_jd) pairs from a JSON-lines file of {"text", "is_valid_jd"} objects"""
+    with open(path, "r") as f:
+        return [(item["text"], bool(item["is_valid_jd"])) for item in map(json.loads, f) if item]
+
+def cross_validate(examples: List[Tuple[str, bool]], threshold: float, folds: int = 5) -> Dict[str, float]:
+    """Held-out accuracy, and the share and accuracy of predictions confident at threshold"""
+    shuffled = examples[:]
+    random.Random(5).shuffle(shuffled)
+    correct = confident = confident_correct = 0
+    for fold in range(folds):
+        train = [example for i, example in enumerate(shuffled) if i % folds != fold]
+        model = train_classifier(train)
+        for text, label in shuffled[fold::folds]:
+            probability = model.probability(text)
+            correct += (probability >= 0.5) == label
+            if probability >= threshold or probability <= 1 - threshold:
+                confident += 1
+                confident_correct += (probability >= 0.5) == label
+    return {
+        "accuracy": correct / len(shuffled),
+        "confident_share": confident / len(shuffled),
+        "confident_accuracy": confident_correct / confident if confident else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local JD classifier from logged analyze_jd results")
+    parser.add_argument("--log-dir", default=os.path.join("logs", "json"))
+    parser.add_argument("--seed", default=DEFAULT_SEED_PATH, help="labeled seed examples (JSON lines); '' for none")
+    parser.add_argument("--out", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("JD_CLASSIFIER_THRESHOLD", "0.95")))
+    args = parser.parse_args()
+
+    logged = read_logged_examples(args.log_dir)
+    seeded = read_seed_examples(args.seed) if args.seed else []
+    # One example per text; a logged label wins over a seed label
+    examples = {}
+    for text, label in seeded + logged:
+        examples[hashlib.sha256(text.strip().encode("utf-8")).hexdigest()] = (text, label)
+    examples = list(examples.values())
+    valid = sum(1 for _, label in examples if label)
+    if not valid or valid == len(examples):
+        parser.error(f"need both valid and invalid examples, have {valid} valid of {len(examples)}")
+
+    evaluation = cross_validate(examples, args.threshold)
+    model = train_classifier(examples)
+    model.metadata = {
+        "trained_at": datetime.now().isoformat(timespec="seconds"),
+        "logged_examples": len(logged),
+        "seed_examples": len(seeded),
+        "valid_examples": valid,
+        "invalid_examples": len(examples) - valid,
+        "cross_validation": {key: round(value, 4) for key, value in evaluation.items()}
+    }
+    model.save(args.out)
+    print(f"{len(examples)} examples ({len(logged)} logged, {len(seeded)} seed), {len(model.weights)} features")
+    print(f"5-fold accuracy {evaluation['accuracy']:.1%}; at threshold {args.threshold}: "
+          f"{evaluation['confident_share']:.1%} answered locally, {evaluation['confident_accuracy']:.1%} correct")
+    print(f"Wrote {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.services.prompts import truncate_text
+from app.services.relevance_service import RelevanceEngine
+from app.services.skill_lexicon import SKILL_LEXICON
+from app.services.structured_logger import get_logger
+
+logger = get_logger("jd_digest")
+
+# Words that mark a text as a job description (analyze_jd's low-confidence heuristic)
+JOB_KEYWORDS = ["job", "position", "role", "responsibilities", "requirements",
+                "qualifications", "skills", "experience", "salary", "apply"]
+
+# Section kind -> words that identify its heading, checked in order ("About the role" is a responsibility)
+SECTION_KINDS = {
+    "responsibilities": ("responsibilit", "duties", "what you will do", "what you'll do", "the role", "your role"),
+    "requirements": ("requirement", "qualification", "looking for", "must have", "you have", "skills",
+                     "nice to have", "preferred"),
+    "benefits": ("benefit", "perk", "we offer", "compensation", "salary"),
+    "legal": ("equal opportunity", "equal employment", "eeo", "diversity", "inclusion", "accommodation",
+              "privacy", "disclaimer", "legal", "notice"),
+    "apply": ("how to apply", "to apply", "application", "next steps", "hiring process", "interview process"),
+    "about": ("about", "company", "who we are", "our team", "overview", "story", "history", "mission"),
+}
+
+# Sections that say nothing about what to ask a candidate, left out of prompts and the summary
+BOILERPLATE_KINDS = ("benefits", "legal", "apply", "about")
+
+# Lines of EEO and recruiting boilerplate, wherever they appear
+BOILERPLATE_LINE_PATTERN = re.compile(
+    r"equal (?:employment )?opportunity|without regard to|reasonable accommodation|e-verify|protected veteran"
+    r"|affirmative action|drug[- ]free|background check|recruit(?:ment|ing) agenc", re.IGNORECASE)
+
+# A short line ending in ":" or starting with "Heading:" opens a section
+HEADING_PATTERN = re.compile(r"^\s*(?:#+\s*)?(?P<heading>[A-Za-z][\w '&/,()-]{1,60}?)\s*:\s*(?P<rest>.*)$")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+def content_hash(jd_text: str) -> str:
+    """Cache key of a JD: the SHA-256 of its whitespace-trimmed text"""
+    return hashlib.sha256(jd_text.strip().encode("utf-8")).hexdigest()
+
+def section_kind(heading: str) -> Optional[str]:
+    heading = heading.lower()
+    for kind, words in SECTION_KINDS.items():
+        if any(word in heading for word in words):
+            return kind
+    return None
+
+def split_sections(jd_text: str) -> Tuple[List[str], List[Tuple[str, List[str]]]]:
+    """
+    Split a JD into its preamble lines (e.g. the title) and (heading, lines) sections.
+
+    A heading is a short line ending in ":", or a known section name followed by
+    ":" and text on the same line ("About us: We run ..."). Whitespace is collapsed,
+    blank lines are dropped and repeated lines are kept once.
+    """
+    preamble = []
+    sections = []
+    seen = set()
+    for line in jd_text.splitlines():
+        line = WHITESPACE_PATTERN.sub(" ", line).strip()
+        if not line or line in seen:
+            continue
+        seen.add(line)
+        match = HEADING_PATTERN.match(line)
+        if match and (not match.group("rest") or section_kind(match.group("heading"))):
+            sections.append((match.group("heading").strip(), [match.group("rest")] if match.group("rest") else []))
+        elif sections:
+            sections[-1][1].append(line)
+        else:
+            preamble.append(line)
+    return preamble, sections
+
+
+class JDDigest:
+    """
+    Everything derived from one JD text, computed once.
+
+    Holds the sections, the lexicon skills with their mention counts, the
+    relevance engine (the tokenized JD and its key terms), the job-keyword count
+    used by analyze_jd, and two prompt-ready forms of the JD:
+
+    - prompt_text: the JD without boilerplate (company history, benefits, EEO and
+      application notices), whitespace collapsed, repeated lines removed and
+      capped at prompt_max_chars. Lines are cut from the end of the least
+      important sections first, so responsibilities and requirements survive.
+    - summary: the title and the responsibility and requirement sections on one
+      line each, capped at summary_max_chars, plus the skill list.
+    """
+    def __init__(self, jd_text: str, summary_max_chars: int = 1500, prompt_max_chars: int = 6000):
+        self.content_hash = content_hash(jd_text)
+        self.length = len(jd_text)
+        self.preamble, self.sections = split_sections(jd_text)
+        self.title = " ".join(self.preamble)
+        self.skills = SKILL_LEXICON.counts(jd_text)
+        # The lexicon keeps the scan, so these do not rescan the text
+        self.skill_labels = SKILL_LEXICON.labels(jd_text)
+        self.skill_topics = SKILL_LEXICON.topics(jd_text)
+        self.relevance = RelevanceEngine(jd_text)
+        jd_lower = jd_text.lower()
+        self.job_keyword_count = sum(1 for keyword in JOB_KEYWORDS if keyword in jd_lower)
+        self.prompt_text = self._prepare(jd_text, prompt_max_chars)
+        self.summary = self._summarize(jd_text, summary_max_chars)
+
+    @property
+    def key_terms(self) -> List[str]:
+        """The 20 most frequent JD terms"""
+        return self.relevance.top_terms(20)
+
+    def _prepare(self, jd_text: str, max_chars: int) -> str:
+        # [priority, minimum lines kept, lines]; priority 1 sections are cut before priority 2
+        blocks = []
+        preamble = [line for line in self.preamble if not BOILERPLATE_LINE_PATTERN.search(line)]
+        if preamble:
+            blocks.append([2, 1, preamble])
+        for heading, lines in self.sections:
+            kind = section_kind(heading)
+            if kind in BOILERPLATE_KINDS:
+                continue
+            lines = [line for line in lines if not BOILERPLATE_LINE_PATTERN.search(line)]
+            if lines:
+                blocks.append([2 if kind else 1, 2, [f"{heading}:"] + lines])
+        if not blocks:
+            return truncate_text(WHITESPACE_PATTERN.sub(" ", jd_text).strip(), max_chars)
+
+        # Section-aware truncation: drop lines from the end of the least important sections
+        # first, keeping each section's heading and first line
+        total = sum(len(line) + 1 for _, _, lines in blocks for line in lines) + 2 * len(blocks)
+        for priority in (1, 2):
+            for block_priority, min_lines, lines in reversed(blocks):
+                while block_priority == priority and total > max_chars and len(lines) > min_lines:
+                    total -= len(lines.pop()) + 1
+        return truncate_text("\n\n".join("\n".join(lines) for _, _, lines in blocks), max_chars)
+
+    def _summarize(self, jd_text: str, max_chars: int) -> str:
+        kept = [f"{heading}: {' '.join(lines)}" for heading, lines in self.sections
+                if lines and section_kind(heading) not in BOILERPLATE_KINDS]
+        if not kept:
+            # No recognizable sections: the whole text, whitespace collapsed
+            kept = [WHITESPACE_PATTERN.sub(" ", jd_text).strip()]
+        elif self.title:
+            kept.insert(0, self.title)
+
+        summary = truncate_text("\n".join(kept), max_chars)
+        if self.skill_labels:
+            summary += "\nSkills: " + ", ".join(self.skill_labels)
+        return summary
+
+
+class JDDigestCache:
+    """
+    LRU cache of JD digests keyed by content hash, shared by the JDService methods,
+    so a JD is parsed once however many endpoints see it
+    """
+    def __init__(self, max_entries: Optional[int] = None, summary_max_chars: Optional[int] = None,
+                 prompt_max_chars: Optional[int] = None):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("JD_DIGEST_CACHE_SIZE", "128"))
+        self.summary_max_chars = (summary_max_chars if summary_max_chars is not None
+                                  else int(os.getenv("JD_SUMMARY_MAX_CHARS", "1500")))
+        self.prompt_max_chars = (prompt_max_chars if prompt_max_chars is not None
+                                 else int(os.getenv("JD_PROMPT_MAX_CHARS", "6000")))
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, jd_text: str) -> JDDigest:
+        """The digest of the JD, built on a miss"""
+        key = content_hash(jd_text)
+        digest = self._entries.get(key)
+        if digest is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return digest
+
+        self.misses += 1
+        digest = JDDigest(jd_text, self.summary_max_chars, self.prompt_max_chars)
+        logger.debug("Built JD digest", length=digest.length, sections=len(digest.sections),
+                     skills=len(digest.skills), prompt_length=len(digest.prompt_text),
+                     summary_length=len(digest.summary))
+        if self.max_entries > 0:
+            self._entries[key] = digest
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return digest
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+class JDRegistry:
+    """
+    Content-addressed store of submitted JD texts, so clients can send a jd_id
+    (the content hash) instead of the full text on later requests.
+
+    Also keeps each JD's successful analysis for reuse. Least recently used
+    entries are evicted; clients resend the text when their jd_id is unknown.
+    """
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("JD_REGISTRY_SIZE", "1000"))
+        # jd_id -> {"text": ..., "analysis": ...}
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def register(self, jd_text: str) -> str:
+        """Store the JD (if new) and return its jd_id"""
+        jd_id = content_hash(jd_text)
+        if jd_id in self._entries:
+            self._entries.move_to_end(jd_id)
+        elif self.max_entries > 0:
+            self._entries[jd_id] = {"text": jd_text, "analysis": None}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return jd_id
+
+    def get_text(self, jd_id: str) -> Optional[str]:
+        entry = self._entries.get(jd_id)
+        if entry is None:
+            return None
+        self._entries.move_to_end(jd_id)
+        return entry["text"]
+
+    def get_analysis(self, jd_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(jd_id)
+        return entry["analysis"] if entry is not None else None
+
+    def set_analysis(self, jd_id: str, analysis: Dict[str, Any]):
+        entry = self._entries.get(jd_id)
+        if entry is not None:
+            entry["analysis"] = analysis
+
@@ -1,25 +1,113 @@
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 import uuid
 import json
-import re
 import asyncio
+import contextvars
+import math
+import os
+import random
+from collections import OrderedDict
+from app.services.answer_scorer import AnswerScorer
+from app.services.dedup_service import NearDuplicateIndex, cycle_pairs, remove_near_duplicates
+from app.services.jd_classifier import DEFAULT_MODEL_PATH, JDClassifier
+from app.services.jd_digest import JDDigest, JDDigestCache, JDRegistry, section_kind
+from app.services.prompts import DEFAULT_ANSWER_WORD_LIMIT, answer_max_tokens, estimate_tokens
+from app.services.timing_service import timed
+from app.services.tracing_service import traced, add_span_event, set_span_attributes
+from app.services.structured_logger import get_logger
+
+logger = get_logger("jd_service")
 
 class JDService:
     def __init__(self, llm_service):
         self.llm_service = llm_service
+        # "filter" keeps the relevant questions of exactly question_count generated ones;
+        # "rank" asks for a surplus and keeps the best BM25 matches with the JD
+        self.question_selection = os.getenv("QUESTION_SELECTION", "filter").lower()
+        self.question_surplus_ratio = float(os.getenv("QUESTION_SURPLUS_RATIO", "1.5"))
+        # Drop near-duplicate questions and ask the LLM only for the missing replacements
+        self.question_dedup = os.getenv("QUESTION_DEDUP", "true").lower() == "true"
+        # Each JD is parsed once (sections, skills, key terms, summary) and shared by every method
+        self.digests = JDDigestCache()
+        # Submitted JD texts and their analyses by jd_id, so clients need not resend the text
+        self.registry = JDRegistry()
+        # Send the JD without boilerplate sections, whitespace and repeated lines in prompts
+        self.jd_preprocessing = os.getenv("JD_PREPROCESSING", "true").lower() == "true"
+        # Send the compact JD summary instead of the full text in question generation prompts
+        self.prompt_summary = os.getenv("JD_PROMPT_SUMMARY", "false").lower() == "true"
+        # Local classifier that answers confidently classified texts without the LLM (see jd_classifier)
+        self.jd_classifier = self._load_jd_classifier()
+        self.jd_classifier_threshold = float(os.getenv("JD_CLASSIFIER_THRESHOLD", "0.95"))
+        # Share of the local answers also checked by the LLM in the background, to measure agreement
+        self.jd_classifier_audit_rate = float(os.getenv("JD_CLASSIFIER_AUDIT_RATE", "0.05"))
+        # Local answer scores, returned at once in provisional mode and when the LLM is unavailable
+        self.answer_scorer = AnswerScorer()
+        # evaluation_id -> {"result": ..., "provisional_score": ..., "task": ...}, least recently used evicted
+        self.evaluations = OrderedDict()
+        self.evaluation_store_size = int(os.getenv("EVALUATION_STORE_SIZE", "1000"))
+        self._background_tasks = set()
         # In-memory storage for questions and answers
         # In a production app, this would be a database
         self.questions = {}
-        print(f"JDService initialized with {type(llm_service).__name__}")
+        logger.info("JDService initialized", llm_service=type(llm_service).__name__)
+    
+    def _load_jd_classifier(self) -> Optional[JDClassifier]:
+        # Opt-in until the shipped model is retrained on logged traffic
+        if os.getenv("JD_CLASSIFIER", "false").lower() != "true":
+            return None
+        path = os.getenv("JD_CLASSIFIER_PATH") or DEFAULT_MODEL_PATH
+        try:
+            classifier = JDClassifier.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("JD classifier not loaded, every JD goes to the LLM", path=path, error=str(e))
+            return None
+        logger.info("JD classifier loaded", path=path, features=len(classifier.weights),
+                    trained_at=classifier.metadata.get("trained_at"))
+        return classifier
+    
+    def _run_in_background(self, coroutine) -> asyncio.Task:
+        """Run a coroutine after the response, keeping a reference until it finishes"""
+        # In an empty context, so its LLM calls are not attributed to this request's timings and trace
+        task = contextvars.Context().run(asyncio.create_task, coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+    
+    def digest(self, jd_text: str) -> JDDigest:
+        """The parsed JD, from the digest cache"""
+        with timed("digest"):
+            return self.digests.get(jd_text)
+    
+    def prompt_jd(self, jd_text: str, operation: str, allow_summary: bool = False) -> str:
+        """
+        The JD as sent in the operation's prompt: the summary (if enabled and allowed),
+        the preprocessed text, or the text as submitted. Records the tokens saved.
+        """
+        digest = self.digest(jd_text)
+        prompt_jd, stage = jd_text, None
+        if allow_summary and self.prompt_summary and len(digest.summary) < len(jd_text):
+            prompt_jd, stage = digest.summary, "jd_summary"
+        elif self.jd_preprocessing and len(digest.prompt_text) < len(jd_text):
+            prompt_jd, stage = digest.prompt_text, "jd_preprocessing"
+        
+        if stage:
+            saved_tokens = estimate_tokens(jd_text) - estimate_tokens(prompt_jd)
+            logger.debug("Prepared JD for prompt", operation=operation, stage=stage,
+                         jd_tokens=lambda: estimate_tokens(jd_text), saved_tokens=saved_tokens)
+            if hasattr(self, 'metrics_service'):
+                self.metrics_service.record_prompt_savings(operation, stage, saved_tokens)
+        return prompt_jd
     
+    @traced("jd_service.analyze_jd")
     async def analyze_jd(self, jd_text: str) -> Dict[str, Any]:
         """
         Analyze if the text is a job description
         """
+        jd_id = None
         try:
             # Check if the text is long enough to be a job description
             if len(jd_text.strip()) < 50:
-                print("Text is too short to be a job description")
+                logger.debug("Text is too short to be a job description", length=len(jd_text))
                 return {
                     "is_valid_jd": False,
                     "confidence": 0.0,
@@ -27,86 +115,132 @@ class JDService:
                     "error": None
                 }
             
-            # Try to analyze with the LLM service
-            is_valid, confidence, overview = await self.llm_service.analyze_jd(jd_text)
+            # Register the JD, reusing its analysis if it was already analyzed
+            jd_id = self.registry.register(jd_text)
+            analysis = self.registry.get_analysis(jd_id)
+            if analysis is not None:
+                logger.debug("Reusing JD analysis", jd_id=jd_id)
+                return analysis
+            
+            # Answer confidently classified texts locally; only ambiguous ones go to the LLM
+            probability = None
+            if self.jd_classifier is not None:
+                with timed("jd_classifier"):
+                    probability = self.jd_classifier.probability(jd_text)
+                set_span_attributes(**{"jd_classifier.probability": probability})
+                if probability >= self.jd_classifier_threshold or probability <= 1 - self.jd_classifier_threshold:
+                    analysis = self._classify_jd_locally(jd_text, jd_id, probability)
+                    self.registry.set_analysis(jd_id, analysis)
+                    return analysis
+            
+            # Try to analyze with the LLM service; if it fails, only the keyword check below decides
+            try:
+                is_valid, confidence, overview = await self.llm_service.analyze_jd(self.prompt_jd(jd_text, "analyze_jd"))
+                llm_error = None
+            except Exception as e:
+                logger.error("Error calling LLM service for JD analysis", error=str(e))
+                is_valid, confidence, overview = False, 0.0, ""
+                llm_error = str(e)
+            if probability is not None and hasattr(self, 'metrics_service'):
+                self.metrics_service.record_jd_classification("llm")
+                # Agreement only counts verdicts the LLM actually gave
+                if llm_error is None:
+                    self.metrics_service.record_jd_classifier_agreement("ambiguous", (probability >= 0.5) == is_valid)
             
             # If the LLM service returns very low confidence, do a basic heuristic check
             if confidence < 10:
                 # Simple heuristic: check for common job description keywords
-                jd_lower = jd_text.lower()
-                job_keywords = ["job", "position", "role", "responsibilities", "requirements", 
-                               "qualifications", "skills", "experience", "salary", "apply"]
-                
-                keyword_count = sum(1 for keyword in job_keywords if keyword in jd_lower)
+                keyword_count = self.digest(jd_text).job_keyword_count
                 
                 # If we find at least 3 job-related keywords, it's probably a job description
                 if keyword_count >= 3 and len(jd_text.strip()) > 200:
-                    print(f"LLM gave low confidence, but found {keyword_count} job keywords - treating as valid JD")
+                    logger.info("LLM gave low confidence, treating as valid JD from keywords", keyword_count=keyword_count)
                     is_valid = True
                     confidence = max(confidence, 60.0)  # Set a minimum confidence
                     if not overview:
                         overview = "This appears to be a job description based on keyword analysis."
             
-            return {
+            analysis = {
                 "is_valid_jd": is_valid,
                 "confidence": confidence,
                 "overview": overview,
-                "error": None
+                "error": llm_error,
+                "jd_id": jd_id
             }
+            # Failed analyses are not reused, so the next request asks the LLM again
+            if llm_error is None:
+                self.registry.set_analysis(jd_id, analysis)
+            return analysis
         except Exception as e:
-            print(f"Error in analyze_jd: {str(e)}")
+            logger.error("Error in analyze_jd", error=str(e))
             return {
                 "is_valid_jd": False,
                 "confidence": 0.0,
                 "overview": "",
-                "error": str(e)
+                "error": str(e),
+                "jd_id": jd_id
             }
     
-    def generate_test_questions(self, jd_text: str, question_count: int) -> List[Dict[str, str]]:
-        """
-        Generate test questions without using the API
-        """
-        print(f"Generating {question_count} test questions")
+    def _classify_jd_locally(self, jd_text: str, jd_id: str, probability: float) -> Dict[str, Any]:
+        """The analysis of a text the classifier is confident about, without an LLM call"""
+        is_valid = probability >= 0.5
+        logger.debug("Classified JD locally", probability=probability, is_valid_jd=is_valid)
+        if hasattr(self, 'metrics_service'):
+            self.metrics_service.record_jd_classification("local_valid" if is_valid else "local_invalid")
         
-        # Extract keywords from the JD
-        jd_lower = jd_text.lower()
-        keywords = []
+        # Check a sample of the local answers with the LLM, after responding
+        if self.jd_classifier_audit_rate > 0 and random.random() < self.jd_classifier_audit_rate:
+            self._run_in_background(self._audit_jd_classification(jd_text, is_valid))
         
-        # Check for common technologies and skills
-        tech_keywords = {
-            "python": "Python programming",
-            "javascript": "JavaScript",
-            "react": "React.js",
-            "node": "Node.js",
-            "api": "API development",
-            "rest": "RESTful services",
-            "database": "database design",
-            "sql": "SQL",
-            "nosql": "NoSQL databases",
-            "mongodb": "MongoDB",
-            "aws": "AWS",
-            "azure": "Azure",
-            "cloud": "cloud services",
-            "docker": "Docker",
-            "kubernetes": "Kubernetes",
-            "microservice": "microservices architecture",
-            "agile": "Agile methodologies",
-            "scrum": "Scrum",
-            "test": "testing strategies",
-            "ci/cd": "CI/CD pipelines",
-            "git": "Git",
-            "frontend": "frontend development",
-            "backend": "backend development",
-            "fullstack": "full-stack development",
-            "mobile": "mobile development",
-            "security": "security practices",
-            "performance": "performance optimization"
+        return {
+            "is_valid_jd": is_valid,
+            "confidence": round(probability * 100, 1),
+            "overview": self._local_overview(jd_text) if is_valid else "",
+            "error": None,
+            "jd_id": jd_id
         }
+    
+    async def _audit_jd_classification(self, jd_text: str, is_valid: bool):
+        """Ask the LLM about a locally classified text and record whether it agrees"""
+        try:
+            llm_is_valid, _, _ = await self.llm_service.analyze_jd(self.prompt_jd(jd_text, "analyze_jd"))
+        except Exception as e:
+            logger.warning("JD classifier audit failed", error=str(e))
+            return
+        if llm_is_valid != is_valid:
+            logger.info("LLM disagrees with the JD classifier", classifier_is_valid=is_valid, length=len(jd_text))
+        if hasattr(self, 'metrics_service'):
+            self.metrics_service.record_jd_classifier_agreement("confident", llm_is_valid == is_valid)
+    
+    def _local_overview(self, jd_text: str) -> str:
+        """A short overview built from the JD digest: title, sections and skills"""
+        digest = self.digest(jd_text)
+        title = digest.preamble[0] if digest.preamble else ""
+        sentences = [f"This is a job description for the {title} position." if 0 < len(title) <= 100
+                     else "This text is a job description."]
+        kinds = {section_kind(heading) for heading, _ in digest.sections}
+        covered = [kind for kind in ("responsibilities", "requirements", "benefits") if kind in kinds]
+        if covered:
+            listed = covered[0] if len(covered) == 1 else ", ".join(covered[:-1]) + " and " + covered[-1]
+            sentences.append(f"It describes the {listed} of the role.")
+        if digest.skill_labels:
+            sentences.append("Key skills include " + ", ".join(digest.skill_labels[:6]) + ".")
+        return " ".join(sentences)
+    
+    @traced("fallback.test_questions")
+    def generate_test_questions(self, jd_text: str, question_count: int,
+                                dedup_index: Optional[NearDuplicateIndex] = None) -> List[Dict[str, str]]:
+        """
+        Generate test questions without using the API.
+        Pass the index of the questions already selected to skip near-duplicates of them.
+        """
+        logger.info("Generating test questions", question_count=question_count)
+        
+        if hasattr(self, 'metrics_service'):
+            self.metrics_service.record_fallback("test_questions")
         
-        # Find matching keywords in the JD
-        for key, value in tech_keywords.items():
-            if key in jd_lower:
-                keywords.append(value)
+        # The skills and technologies the JD mentions
+        keywords = list(self.digest(jd_text).skill_labels)
         
         # If no keywords were found, use some defaults
         if not keywords:
@@ -136,22 +270,25 @@ class JDService:
             }
         ]
         
-        # Generate questions based on the templates and keywords
+        # Generate questions based on the templates and keywords, each pair at most once,
+        # skipping near-duplicates of the indexed questions (the ones they pad)
         generated_questions = []
-        for i in range(question_count):
-            # Select a keyword and template
-            keyword = keywords[i % len(keywords)]
-            template = question_templates[i % len(question_templates)]
+        for keyword, template in cycle_pairs(keywords, question_templates):
+            if len(generated_questions) >= question_count:
+                break
+            text = template["template"].format(keyword=keyword)
+            if dedup_index is not None and not dedup_index.add_if_new(text):
+                continue
             
             # Create the question and answer
             question = {
-                "text": template["template"].format(keyword=keyword),
+                "text": text,
                 "reference_answer": template["answer_template"].format(keyword=keyword)
             }
             
             generated_questions.append(question)
         
-        print(f"Generated {len(generated_questions)} test questions based on JD keywords")
+        logger.debug("Generated test questions based on JD keywords", count=len(generated_questions))
         
         # Add unique IDs
         questions_with_ids = []
@@ -170,6 +307,7 @@ class JDService:
         
         return questions_with_ids
 
+    @traced("jd_service.generate_questions")
     async def generate_questions(self, jd_text: str, question_count: int) -> List[Dict[str, str]]:
         """
         Generate questions based on the job description
@@ -179,18 +317,29 @@ class JDService:
             if hasattr(self, 'logging_service'):
                 self.logging_service.logger.info(f"Generating {question_count} questions for JD of length {len(jd_text)}")
             
-            # Extract key terms from the JD for validation
-            key_terms = self._extract_key_terms(jd_text)
-            print(f"Extracted key terms from JD: {', '.join(list(key_terms)[:10])}...")
-            
-            # Generate questions
-            questions_data = await self.llm_service.generate_questions(jd_text, question_count)
-            
-            print(f"Raw questions data: {questions_data}")
+            # The JD is tokenized once per content, for validating the questions
+            digest = self.digest(jd_text)
+            relevance = digest.relevance
+            logger.debug("Extracted key terms from JD", count=len(relevance.jd_counts), sample=0.1)
+            prompt_jd = self.prompt_jd(jd_text, "generate_questions", allow_summary=True)
+            
+            # Generate questions, with a surplus to rank when selecting by rank
+            requested_count = question_count
+            if self.question_selection == "rank":
+                surplus_count = math.ceil(question_count * self.question_surplus_ratio)
+                # The surplus only fills the room left in one completion; it never adds a batch
+                per_call = self.llm_service.questions_per_call() if hasattr(self.llm_service, 'questions_per_call') else surplus_count
+                requested_count = max(question_count, min(surplus_count, per_call))
+                if requested_count < surplus_count:
+                    logger.info("Clamped the question surplus to the completion limit", question_count=question_count,
+                                surplus_count=surplus_count, requested_count=requested_count, per_call=per_call)
+            questions_data = await self.llm_service.generate_questions(prompt_jd, requested_count)
+            
+            logger.debug("Received questions data", count=len(questions_data) if questions_data else 0)
             
             # Ensure we have questions data
             if not questions_data:
-                print("No questions data returned from DeepSeek API, using test questions")
+                logger.warning("No questions data returned from LLM, using test questions")
                 test_questions = self.generate_test_questions(jd_text, question_count)
                 
                 # Log the fallback to test questions
@@ -199,44 +348,87 @@ class JDService:
                 
                 return test_questions
             
-            # Validate question relevance
-            relevant_questions = []
-            for q in questions_data:
-                if self._is_question_relevant(q, key_terms):
-                    relevant_questions.append(q)
+            # Validate question relevance, scoring the whole batch at once
+            with timed("relevance"):
+                if self.question_selection == "rank":
+                    relevant_questions = relevance.rank_questions(questions_data)
                 else:
-                    print(f"Discarding irrelevant question: {q.get('text', '')[:50]}...")
-                    
-                    # Log the discarded question
-                    if hasattr(self, 'logging_service'):
-                        self.logging_service.logger.warning(f"Discarded irrelevant question: {q.get('text', '')[:50]}...")
+                    scores = relevance.score_questions(questions_data)
+                    relevant_questions = [q for q, score in zip(questions_data, scores) if score >= relevance.threshold]
+            
+            discarded = len(questions_data) - len(relevant_questions)
+            if discarded:
+                logger.debug("Discarded irrelevant questions", count=discarded, received=len(questions_data))
+                
+                # Log the discarded questions
+                if hasattr(self, 'logging_service'):
+                    self.logging_service.logger.warning(f"Discarded {discarded} irrelevant questions")
+            
+            # Remove near-duplicates, then request replacements for only the questions still missing
+            duplicates = 0
+            replacements = 0
+            dedup_index = None
+            if self.question_dedup:
+                with timed("dedup"):
+                    dedup_index = NearDuplicateIndex()
+                    relevant_questions, duplicates = remove_near_duplicates(relevant_questions, dedup_index)
+                missing = question_count - len(relevant_questions)
+                if duplicates and missing > 0:
+                    logger.debug("Requesting replacements for near-duplicate questions",
+                                 duplicates=duplicates, missing=missing)
+                    extra_questions = await self.llm_service.generate_questions(prompt_jd, missing)
+                    if extra_questions:
+                        with timed("relevance"):
+                            extra_questions = relevance.filter_questions(extra_questions)
+                        with timed("dedup"):
+                            extra_questions, extra_duplicates = remove_near_duplicates(extra_questions, dedup_index)
+                        duplicates += extra_duplicates
+                        replacements = len(extra_questions[:missing])
+                        relevant_questions.extend(extra_questions[:missing])
+                if duplicates and hasattr(self, 'metrics_service'):
+                    self.metrics_service.record_near_duplicates(duplicates, replacements)
+            
+            relevant_count = len(relevant_questions)
             
             # If we lost too many questions, fill in with test questions
-            if len(relevant_questions) < question_count * 0.7:  # If we lost more than 30%
-                print(f"Too many irrelevant questions, filling in with test questions")
+            if relevant_count < question_count * 0.7:  # If we lost more than 30%
+                logger.debug("Too many irrelevant questions, filling in with test questions")
                 
                 # Log the filling in with test questions
                 if hasattr(self, 'logging_service'):
-                    self.logging_service.logger.warning(f"Filling in with test questions due to too many irrelevant questions")
+                    self.logging_service.logger.warning("Filling in with test questions due to too many irrelevant questions")
                 
+                # Padding goes through the same near-duplicate index as the selected questions
                 additional_needed = question_count - len(relevant_questions)
-                test_questions = self.generate_test_questions(jd_text, additional_needed)
+                test_questions = self.generate_test_questions(jd_text, additional_needed, dedup_index)
                 relevant_questions.extend(test_questions)
+                outcome = "padded"
+            else:
+                outcome = "complete" if relevant_count >= question_count else "short"
+            
+            # Count how often the selection avoided template padding
+            if hasattr(self, 'metrics_service'):
+                self.metrics_service.record_question_selection(self.question_selection, outcome)
+            logger.info("Selected questions", mode=self.question_selection, requested=question_count,
+                        generated=requested_count, received=len(questions_data),
+                        relevant=relevant_count, duplicates=duplicates, replacements=replacements,
+                        outcome=outcome)
             
             # Add unique IDs to questions and store them
             questions_with_ids = []
-            for q in relevant_questions[:question_count]:  # Limit to requested count
-                question_id = str(uuid.uuid4())
-                self.questions[question_id] = {
-                    "text": q["text"],
-                    "reference_answer": q["reference_answer"]
-                }
-                
-                questions_with_ids.append({
-                    "id": question_id,
-                    "text": q["text"],
-                    "reference_answer": q["reference_answer"]
-                })
+            with timed("store"):
+                for q in relevant_questions[:question_count]:  # Limit to requested count
+                    question_id = str(uuid.uuid4())
+                    self.questions[question_id] = {
+                        "text": q["text"],
+                        "reference_answer": q["reference_answer"]
+                    }
+                    
+                    questions_with_ids.append({
+                        "id": question_id,
+                        "text": q["text"],
+                        "reference_answer": q["reference_answer"]
+                    })
             
             # Log the successful question generation
             if hasattr(self, 'logging_service'):
@@ -244,7 +436,7 @@ class JDService:
             
             return questions_with_ids
         except Exception as e:
-            print(f"Error generating questions: {str(e)}")
+            logger.error("Error generating questions", error=str(e))
             
             # Log the error
             if hasattr(self, 'logging_service'):
@@ -253,79 +445,34 @@ class JDService:
             # Fallback to test questions
             return self.generate_test_questions(jd_text, question_count)
 
-    def _extract_key_terms(self, jd_text: str) -> set:
-        """Extract key terms from the job description"""
-        # Convert to lowercase
-        jd_lower = jd_text.lower()
-        
-        # Extract words (simple approach)
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', jd_lower)
-        
-        # Filter out common words
-        common_words = set([
-            "the", "and", "that", "have", "for", "not", "with", "you", "this", "but",
-            "his", "from", "they", "she", "will", "would", "there", "their", "what",
-            "about", "which", "when", "make", "like", "time", "just", "know", "take",
-            "person", "into", "year", "your", "good", "some", "could", "them", "see",
-            "other", "than", "then", "now", "look", "only", "come", "its", "over",
-            "think", "also", "back", "after", "use", "two", "how", "our", "work",
-            "first", "well", "way", "even", "new", "want", "because", "any", "these",
-            "give", "day", "most", "can", "are", "is", "be", "has", "was", "were",
-            "had", "do", "does", "did", "doing", "done", "should", "must", "may",
-            "might", "can", "could", "shall", "will", "would", "should", "must",
-            "experience", "role", "job", "candidate", "skill", "ability", "work",
-            "team", "project", "develop", "create", "build", "implement", "design",
-            "manage", "lead", "communicate", "collaborate", "solve", "problem",
-            "solution", "requirement", "responsibility", "qualification", "year"
-        ])
-        
-        key_terms = set()
-        for word in words:
-            if word not in common_words:
-                key_terms.add(word)
-        
-        return key_terms
-
-    def _is_question_relevant(self, question: Dict[str, str], key_terms: set) -> bool:
-        """Check if a question is relevant to the job description"""
-        question_text = question.get('text', '').lower()
-        reference_answer = question.get('reference_answer', '').lower()
-        
-        # Count how many key terms appear in the question and answer
-        term_matches = sum(1 for term in key_terms if term in question_text or term in reference_answer)
-        
-        # Consider it relevant if it matches at least 2 key terms
-        return term_matches >= 2
-    
+    @traced("jd_service.evaluate_answer")
     async def evaluate_answer(self, question_id: str, user_answer: str, reference_answer: str) -> Dict[str, Any]:
         """
         Evaluate a user's answer
         """
         try:
-            print(f"Looking for question ID: {question_id}")
-            print(f"Available question IDs: {list(self.questions.keys())}")
+            logger.debug("Looking up question", question_id=question_id, stored_questions=len(self.questions))
             
             # Get the question text
             question_data = self.questions.get(question_id)
             
             if not question_data:
-                print(f"Question ID {question_id} not found in stored questions")
-                # Use a default evaluation if question not found
-                return {
+                logger.warning("Question ID not found in stored questions", question_id=question_id)
+                # Score against the reference answer sent with the request, or use a default evaluation
+                return self.degraded_evaluation("", user_answer, reference_answer, {
                     "score": 65.0,
                     "feedback": "Your answer was evaluated without the original question context.",
                     "improvement_suggestions": "Try to be more specific and provide concrete examples."
-                }
+                })
             
             question_text = question_data.get("text", "")
             stored_reference_answer = question_data.get("reference_answer", "")
             
-            print(f"Found question: {question_text[:50]}...")
-            print(f"Using reference answer from storage: {stored_reference_answer[:50]}...")
+            logger.debug("Found question", text=question_text, reference_answer_length=len(stored_reference_answer))
             
             # Check if user answer is too short
             if not user_answer or len(user_answer.strip()) < 20:
-                print("User answer is too short for proper evaluation")
+                logger.debug("User answer is too short for proper evaluation")
                 return {
                     "score": 30.0,
                     "feedback": "Your answer is too brief to properly address the question.",
@@ -339,28 +486,29 @@ class JDService:
                 )
                 
                 # Log successful evaluation
-                print(f"Successfully evaluated answer with score: {score}")
+                logger.debug("Evaluated answer", score=score)
                 
                 return {
                     "score": score,
                     "feedback": feedback,
-                    "improvement_suggestions": suggestions
+                    "improvement_suggestions": suggestions,
+                    "status": "final"
                 }
             except Exception as e:
-                print(f"Error calling LLM service for evaluation: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.error("Error calling LLM service for evaluation", exc_info=True, error=str(e))
                 
-                # Provide a more helpful fallback response
-                return {
+                # Score locally against the stored reference answer instead
+                return self.degraded_evaluation(question_text, user_answer, stored_reference_answer, {
                     "score": 60.0,
                     "feedback": "We encountered an issue while evaluating your answer with our AI system.",
                     "improvement_suggestions": "While we couldn't provide specific feedback, generally strong answers include concrete examples from your experience and address all parts of the question."
-                }
+                })
         except Exception as e:
-            print(f"Error in evaluate_answer: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Error in evaluate_answer", exc_info=True, error=str(e))
+            
+            if hasattr(self, 'metrics_service'):
+                self.metrics_service.record_fallback("canned_evaluation")
+            add_span_event("fallback", path="canned_evaluation")
             
             # Provide a more helpful fallback response
             return {
@@ -369,33 +517,120 @@ class JDService:
                 "improvement_suggestions": "Consider adding more specific examples and technical details to strengthen your answer."
             }
 
-    async def generate_answer(self, question_text: str) -> str:
+    def degraded_evaluation(self, question_text: str, user_answer: str, reference_answer: str,
+                            canned: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Generate an answer for a given question
+        The local score of an answer the LLM could not evaluate, with status "degraded",
+        or the canned evaluation when there is nothing to compare the answer with
+        """
+        evaluation = self.answer_scorer.score(question_text, user_answer, reference_answer)
+        path = "local_evaluation" if evaluation is not None else "canned_evaluation"
+        if hasattr(self, 'metrics_service'):
+            self.metrics_service.record_fallback(path)
+        add_span_event("fallback", path=path)
+        if evaluation is None:
+            return canned
+        return {
+            "score": evaluation["score"],
+            "feedback": evaluation["feedback"],
+            "improvement_suggestions": evaluation["improvement_suggestions"],
+            "status": "degraded"
+        }
+    
+    @traced("jd_service.start_evaluation")
+    async def start_evaluation(self, question_id: str, user_answer: str, reference_answer: str) -> Dict[str, Any]:
+        """
+        Return the local, provisional score of an answer at once, with an evaluation_id,
+        and run the LLM evaluation in the background (see get_evaluation).
+        
+        Answers evaluate_answer scores without the LLM (unknown question, too short)
+        and answers with nothing to compare against are evaluated directly.
+        """
+        question_data = self.questions.get(question_id)
+        if not question_data or not user_answer or len(user_answer.strip()) < 20:
+            return await self.evaluate_answer(question_id, user_answer, reference_answer)
+        
+        with timed("answer_scorer"):
+            provisional = self.answer_scorer.score(
+                question_data.get("text", ""), user_answer, question_data.get("reference_answer", ""))
+        if provisional is None:
+            return await self.evaluate_answer(question_id, user_answer, reference_answer)
+        logger.debug("Provisional answer score", score=provisional["score"], coverage=provisional["coverage"],
+                     similarity=provisional["similarity"])
+        
+        evaluation_id = str(uuid.uuid4())
+        result = {
+            "score": provisional["score"],
+            "feedback": provisional["feedback"],
+            "improvement_suggestions": provisional["improvement_suggestions"],
+            "evaluation_id": evaluation_id,
+            "status": "provisional"
+        }
+        entry = {"result": result, "provisional_score": provisional["score"], "task": None}
+        self.evaluations[evaluation_id] = entry
+        while len(self.evaluations) > self.evaluation_store_size:
+            self.evaluations.popitem(last=False)
+        entry["task"] = self._run_in_background(
+            self._refine_evaluation(entry, evaluation_id, question_id, user_answer, reference_answer))
+        return result
+    
+    async def _refine_evaluation(self, entry: Dict[str, Any], evaluation_id: str, question_id: str,
+                                 user_answer: str, reference_answer: str):
+        """Replace a provisional score with the LLM's evaluation (or the degraded one, if the LLM fails)"""
+        result = await self.evaluate_answer(question_id, user_answer, reference_answer)
+        if result.get("status") not in ("final", "degraded"):
+            # A canned evaluation after an unexpected error: keep the local score, marked degraded
+            result = {**entry["result"], "status": "degraded"}
+        status = result["status"]
+        entry["result"] = {**result, "evaluation_id": evaluation_id}
+        if status == "final" and hasattr(self, 'metrics_service'):
+            self.metrics_service.observe_provisional_score(entry["provisional_score"], result["score"])
+        logger.debug("Refined answer evaluation", evaluation_id=evaluation_id, status=status,
+                     provisional_score=entry["provisional_score"], score=result["score"])
+    
+    async def get_evaluation(self, evaluation_id: str, wait: float = 0.0) -> Optional[Dict[str, Any]]:
+        """
+        The current result of a provisional-mode evaluation: provisional until the LLM
+        evaluation finishes. Waits up to `wait` seconds for it. None if unknown.
+        """
+        entry = self.evaluations.get(evaluation_id)
+        if entry is None:
+            return None
+        self.evaluations.move_to_end(evaluation_id)
+        task = entry["task"]
+        if wait > 0 and task is not None and not task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(task), wait)
+            except asyncio.TimeoutError:
+                pass
+        return entry["result"]
+    
+    @traced("jd_service.generate_answer")
+    async def generate_answer(self, question_text: str, word_limit: int = DEFAULT_ANSWER_WORD_LIMIT) -> str:
+        """
+        Generate an answer of at most word_limit words for a given question
         """
         try:
-            # First, try to generate a fallback answer based on the question content
-            fallback_answer = await self._generate_fallback_answer(question_text)
-            
             # Try to get an answer from the API
             try:
-                answer = await self.llm_service.generate_answer(question_text)
+                answer = await self.llm_service.generate_answer(question_text, word_limit)
                 
                 # If we got a valid answer from the API, return it
                 if answer and len(answer.strip()) > 50 and not answer.startswith("I couldn't generate"):
                     return answer
                     
-                # Otherwise, use our fallback
-                print(f"API returned invalid answer, using fallback for: {question_text[:50]}...")
-                return fallback_answer
+                # Otherwise, generate a fallback answer with a simplified prompt
+                logger.warning("LLM returned invalid answer, using fallback", question=question_text)
+                return await self._generate_fallback_answer(question_text, word_limit)
             except Exception as e:
-                print(f"Error calling API for answer generation: {str(e)}")
-                return fallback_answer
+                logger.error("Error calling LLM for answer generation", error=str(e))
+                return await self._generate_fallback_answer(question_text, word_limit)
         except Exception as e:
-            print(f"Error in generate_answer: {str(e)}")
+            logger.error("Error in generate_answer", error=str(e))
             return "I couldn't generate an answer at this time. Please try again later or write your own answer."
 
-    async def _generate_fallback_answer(self, question_text: str) -> str:
+    @traced("jd_service.generate_fallback_answer")
+    async def _generate_fallback_answer(self, question_text: str, word_limit: int = DEFAULT_ANSWER_WORD_LIMIT) -> str:
         """Generate a fallback answer using the LLM with a simplified prompt"""
         try:
             # Use a simplified prompt for fallback generation
@@ -404,7 +639,7 @@ class JDService:
             
             Question: {question_text}
             
-            Keep your answer concise and professional.
+            Keep your answer concise and professional, in at most {word_limit} words.
             """
             
             messages = [
@@ -413,7 +648,8 @@ class JDService:
             ]
             
             # Try to use the DeepSeek service with a simplified prompt
-            response = await self.llm_service._call_api(messages, temperature=0.7)
+            response = await self.llm_service._call_api(messages, temperature=0.7,
+                                                        max_tokens=answer_max_tokens(word_limit))
             
             if response and "choices" in response and len(response["choices"]) > 0:
                 answer = response["choices"][0]["message"]["content"].strip()
@@ -423,23 +659,21 @@ class JDService:
             # If that fails, return a generic response
             return "I couldn't generate a specific answer at this time. Please write your own answer based on your experience and knowledge relevant to this question."
         except Exception as e:
-            print(f"Error in _generate_fallback_answer: {str(e)}")
+            logger.error("Error in _generate_fallback_answer", error=str(e))
             return "I couldn't generate a specific answer at this time. Please write your own answer based on your experience and knowledge relevant to this question."
 
-    async def generate_answer_stream(self, question_text: str):
+    async def generate_answer_stream(self, question_text: str, word_limit: int = DEFAULT_ANSWER_WORD_LIMIT):
         """
         Generate an answer for a given question with streaming
         """
         try:
-            # Try to get a fallback answer in case we need it
-            fallback_answer = await self._generate_fallback_answer(question_text)
-            
             # Use the DeepSeek service to generate a streaming answer
-            async for chunk in self.llm_service.generate_answer_stream(question_text):
+            async for chunk in self.llm_service.generate_answer_stream(question_text, word_limit):
                 yield chunk
             
         except Exception as e:
-            print(f"Error in generate_answer_stream: {str(e)}")
+            logger.error("Error in generate_answer_stream", error=str(e))
+            fallback_answer = await self._generate_fallback_answer(question_text, word_limit)
             
             # Yield the fallback answer in chunks to simulate streaming
             words = fallback_answer.split()
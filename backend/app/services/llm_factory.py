@@ -1,8 +1,38 @@
 import os
+from typing import Dict, Optional, Tuple
 from app.services.deepseek_service import DeepSeekService
 from app.services.openai_service import OpenAIService
+from app.services.replay_service import ReplayService
+from app.services.structured_logger import get_logger
 from dotenv import load_dotenv
 
+logger = get_logger("llm_factory")
+
+# Operations whose model can be set separately, e.g. OPENAI_MODEL_ANALYZE_JD=gpt-4o-mini
+TIERED_OPERATIONS = ("analyze_jd", "evaluate_answer", "generate_questions", "generate_answer")
+
+def get_operation_models(prefix: str) -> Dict[str, str]:
+    """Per-operation model overrides from the {prefix}_MODEL_{OPERATION} environment variables"""
+    models = {}
+    for operation in TIERED_OPERATIONS:
+        model = os.getenv(f"{prefix}_MODEL_{operation.upper()}")
+        if model:
+            models[operation] = model
+    return models
+
+def get_completion_limits(prefix: str) -> Tuple[Optional[int], Dict[str, int]]:
+    """
+    Output token limits from {prefix}_MAX_COMPLETION_TOKENS (default model) and
+    {prefix}_MAX_COMPLETION_TOKENS_{OPERATION}, for models missing from MODEL_COMPLETION_LIMITS
+    """
+    default = os.getenv(f"{prefix}_MAX_COMPLETION_TOKENS")
+    limits = {}
+    for operation in TIERED_OPERATIONS:
+        limit = os.getenv(f"{prefix}_MAX_COMPLETION_TOKENS_{operation.upper()}")
+        if limit:
+            limits[operation] = int(limit)
+    return (int(default) if default else None), limits
+
 def create_llm_service():
     """
     Factory function to create the appropriate LLM service based on environment variables
@@ -14,41 +44,46 @@ def create_llm_service():
     llm_provider = os.getenv("LLM_PROVIDER", "deepseek").lower()
     use_mock = os.getenv("USE_MOCK_RESPONSES", "false").lower() == "true"
     
-    # Print all environment variables for debugging
-    print("\n--- Environment Variables ---")
-    print(f"LLM_PROVIDER: {os.getenv('LLM_PROVIDER')}")
-    print(f"USE_MOCK_RESPONSES: {os.getenv('USE_MOCK_RESPONSES')}")
-    print(f"DEEPSEEK_MODEL: {os.getenv('DEEPSEEK_MODEL')}")
-    print(f"OPENAI_MODEL: {os.getenv('OPENAI_MODEL')}")
-    print("---------------------------\n")
+    # Log the LLM settings for debugging
+    logger.debug("LLM settings", provider=os.getenv('LLM_PROVIDER'), use_mock=os.getenv('USE_MOCK_RESPONSES'),
+                 deepseek_model=os.getenv('DEEPSEEK_MODEL'), openai_model=os.getenv('OPENAI_MODEL'))
     
     # Check if API keys are set in environment variables
     deepseek_key = os.environ.get("DEEPSEEK_API_KEY")
     openai_key = os.environ.get("OPENAI_API_KEY")
     
-    print(f"Creating LLM service with provider: '{llm_provider}'")
-    print(f"DeepSeek API key: {'Set' if deepseek_key else 'Not set'}")
-    print(f"OpenAI API key: {'Set' if openai_key else 'Not set'}")
-    print(f"Use mock responses: {use_mock}")
+    logger.info("Creating LLM service", provider=llm_provider, use_mock=use_mock,
+                deepseek_key="set" if deepseek_key else "not set",
+                openai_key="set" if openai_key else "not set")
     
     # Create the appropriate service based on the provider
     if llm_provider == "openai":
-        print("Initializing OpenAI service...")
         service = OpenAIService()
         if not openai_key and not use_mock:
-            print("WARNING: Using OpenAI provider but OPENAI_API_KEY is not set")
-            print("Set the OPENAI_API_KEY environment variable or enable USE_MOCK_RESPONSES")
+            logger.warning("Using OpenAI provider but OPENAI_API_KEY is not set; "
+                           "set the OPENAI_API_KEY environment variable or enable USE_MOCK_RESPONSES")
+    elif llm_provider == "replay":
+        # Serve recorded responses from the provider JSON logs (see REPLAY_* settings)
+        service = ReplayService()
     else:  # Default to DeepSeek
-        print("Initializing DeepSeek service...")
         service = DeepSeekService()
         if not deepseek_key and not use_mock:
-            print("WARNING: Using DeepSeek provider but DEEPSEEK_API_KEY is not set")
-            print("Set the DEEPSEEK_API_KEY environment variable or enable USE_MOCK_RESPONSES")
+            logger.warning("Using DeepSeek provider but DEEPSEEK_API_KEY is not set; "
+                           "set the DEEPSEEK_API_KEY environment variable or enable USE_MOCK_RESPONSES")
+    
+    # Smaller, faster models for the operations that don't need the default one
+    if llm_provider != "replay":
+        prefix = "OPENAI" if llm_provider == "openai" else "DEEPSEEK"
+        service.operation_models = get_operation_models(prefix)
+        if service.operation_models:
+            logger.info("Using per-operation models", default=service.model, **service.operation_models)
+        # Output token limits of models the built-in table does not know
+        service.max_completion_tokens, service.operation_completion_limits = get_completion_limits(prefix)
     
     # Override the use_mock setting if specified in the environment
-    if use_mock:
+    if use_mock and llm_provider != "replay":
         service.use_mock = True
-        print("Using mock responses as specified in environment variables")
+        logger.info("Using mock responses as specified in environment variables")
     
-    print(f"Created {type(service).__name__} successfully")
+    logger.info("Created LLM service", service=type(service).__name__)
     return service 
\ No newline at end of file
@@ -0,0 +1,135 @@
+import asyncio
+import math
+from typing import Dict, Any, List, Optional, Tuple
+from app.services.logging_service import extract_finish_reason, extract_usage
+from app.services.prompts import PROMPTS, compact_messages, estimate_tokens, model_completion_limit
+from app.services.timing_service import timed
+from app.services.tracing_service import set_span_attributes
+from app.services.structured_logger import get_logger
+
+logger = get_logger("llm_provider")
+
+class LLMProvider:
+    """
+    Helpers shared by the LLM provider services: prompt budgeting and compaction,
+    per-operation model selection and output limits, batched question generation
+    and call logging.
+
+    Subclasses set provider, prompt_family, model, operation_models and token_budget,
+    and implement _determine_operation and _generate_question_batch.
+    """
+    # Provider name used for metrics, spans and the JSON log file ({provider}_api_YYYYMMDD.json)
+    provider = "unknown"
+    # Prompt templates used (app/services/prompts.py)
+    prompt_family = None
+    # Output token limit of the default model, instead of its MODEL_COMPLETION_LIMITS entry (set by llm_factory)
+    max_completion_tokens = None
+    # Operation -> output token limit of the operation's model (set by llm_factory)
+    operation_completion_limits = {}
+
+    def _determine_operation(self, messages: List[Dict[str, str]]) -> str:
+        raise NotImplementedError
+
+    async def _generate_question_batch(self, jd_text: str, question_count: int) -> List[Dict[str, str]]:
+        raise NotImplementedError
+
+    def completion_limit(self, operation: str) -> int:
+        """Largest max_tokens the operation's model accepts"""
+        if operation in self.operation_completion_limits:
+            return self.operation_completion_limits[operation]
+        if operation in self.operation_models:
+            return model_completion_limit(self.operation_models[operation])
+        return self.max_completion_tokens or model_completion_limit(self.model)
+
+    def questions_per_call(self) -> int:
+        """How many questions one generate_questions call can return within the model's output limit"""
+        return self.token_budget.questions_per_call(self.completion_limit("generate_questions"))
+
+    async def generate_questions(self, jd_text: str, question_count: int = 5) -> List[Dict[str, str]]:
+        """
+        Generate interview questions based on a job description.
+        Counts whose completion would not fit the model's output limit are
+        generated in equal concurrent batches, so no call is cut off by max_tokens.
+        Returns: List of dictionaries with 'text' and 'reference_answer' keys
+        """
+        per_call = self.questions_per_call()
+        if question_count <= per_call:
+            return await self._generate_question_batch(jd_text, question_count)
+
+        calls = math.ceil(question_count / per_call)
+        sizes = [question_count // calls + (1 if i < question_count % calls else 0) for i in range(calls)]
+        logger.info("Generating questions in batches", provider=self.provider, question_count=question_count,
+                    batches=sizes)
+        batches = await asyncio.gather(*(self._generate_question_batch(jd_text, size) for size in sizes))
+        return [question for batch in batches for question in batch]
+
+    def _model_for(self, messages: List[Dict[str, str]]) -> str:
+        """The model configured for the messages' operation"""
+        return self.operation_models.get(self._determine_operation(messages), self.model)
+
+    def _budgeted_prompt(self, operation: str, **fields) -> Tuple[List[Dict[str, str]], Optional[int]]:
+        """The operation's messages, inputs trimmed to the prompt token budget, and its max_tokens"""
+        template = PROMPTS.get(self.prompt_family, operation)
+        fields, trimmed_tokens = self.token_budget.fit(template, fields)
+        if trimmed_tokens:
+            logger.warning("Trimmed prompt input to the token budget", provider=self.provider, operation=operation,
+                           trimmed_tokens=trimmed_tokens, budget=self.token_budget.prompt_tokens)
+            if hasattr(self, 'metrics_service'):
+                self.metrics_service.record_prompt_savings(operation, "budget", trimmed_tokens)
+        messages = template.render(**fields)
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        if prompt_tokens > self.token_budget.prompt_tokens:
+            logger.warning("Prompt exceeds the token budget; inputs are not trimmed below the minimum",
+                           provider=self.provider, operation=operation, prompt_tokens=prompt_tokens,
+                           budget=self.token_budget.prompt_tokens)
+        return messages, self.token_budget.max_tokens(operation, fields, self.completion_limit(operation))
+
+    def _compact_messages(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """The messages with compacted prompts; records the estimated tokens saved"""
+        messages, saved_tokens = compact_messages(messages)
+        if hasattr(self, 'metrics_service'):
+            self.metrics_service.record_prompt_savings(self._determine_operation(messages), "compaction", saved_tokens)
+        return messages
+
+    def _log_llm_call(self, messages: List[Dict[str, str]], temperature: float,
+                      response_data: Dict[str, Any] = None, error: str = None,
+                      duration_ms: float = None, is_mock: bool = False, cache_hit: bool = False):
+        """Record an API call with the logging and metrics services, if attached"""
+        operation = self._determine_operation(messages)
+        model = self.operation_models.get(operation, self.model)
+        # Prompt tokens and the share the provider served from its prefix cache
+        usage = extract_usage(response_data)
+        finish_reason = extract_finish_reason(response_data)
+        set_span_attributes(**{"llm.provider": self.provider, "llm.operation": operation,
+                               "llm.model": model, "llm.is_mock": is_mock, "llm.cache_hit": cache_hit,
+                               "llm.prompt_tokens": usage["prompt_tokens"],
+                               "llm.cached_prompt_tokens": usage["cached_prompt_tokens"],
+                               "llm.finish_reason": finish_reason or ""})
+
+        # Completions cut off by max_tokens, so the token budgets can be tuned
+        truncated = finish_reason == "length" and not cache_hit
+        if truncated:
+            logger.warning("LLM completion hit max_tokens", provider=self.provider, operation=operation,
+                           completion_tokens=usage["completion_tokens"])
+
+        if hasattr(self, 'metrics_service'):
+            self.metrics_service.observe_llm_call(
+                self.provider, operation, duration_ms / 1000 if duration_ms is not None else None,
+                error=bool(error), cache_hit=cache_hit, model=model, prompt_tokens=usage["prompt_tokens"],
+                cached_prompt_tokens=usage["cached_prompt_tokens"], truncated=truncated)
+
+        if not hasattr(self, 'logging_service'):
+            return
+
+        with timed("log"):
+            self.logging_service.log_llm_call(
+                provider=self.provider,
+                operation=operation,
+                model=model,
+                request_data={"messages": messages, "temperature": temperature},
+                response_data=response_data,
+                error=error,
+                duration_ms=duration_ms,
+                is_mock=is_mock,
+                cache_hit=cache_hit
+            )
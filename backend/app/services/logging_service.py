@@ -1,10 +1,84 @@
+import glob
+import heapq
 import json
 import logging
 import os
+import queue
+import threading
 import time
-from datetime import datetime
-from typing import Dict, Any, Optional, List
+from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, Optional, List, Iterator
 import uuid
+from app.services.structured_logger import default_level, get_logger
+
+logger = get_logger("logging_service")
+
+# Approximate USD prices per 1K tokens as (prompt, completion), used for cost rollups
+MODEL_PRICING = {
+    "deepseek-chat": (0.00027, 0.0011),
+    "deepseek-reasoner": (0.00055, 0.00219),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015)
+}
+
+# Map the public log types to the JSON log file prefixes ("llm" covers every provider's {provider}_api file)
+LOG_TYPE_FILE_MAP = {
+    "api": "api_calls",
+    "llm": "*_api",
+    "app": "user_interactions"
+}
+
+def extract_usage(response_data: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Extract token counts from an OpenAI-compatible response"""
+    usage = (response_data or {}).get("usage") or {}
+    
+    # DeepSeek reports prompt_cache_hit_tokens, OpenAI reports prompt_tokens_details.cached_tokens
+    cached_tokens = usage.get("prompt_cache_hit_tokens")
+    if cached_tokens is None:
+        cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+    
+    prompt_tokens = usage.get("prompt_tokens") or 0
+    completion_tokens = usage.get("completion_tokens") or 0
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": usage.get("total_tokens") or prompt_tokens + completion_tokens,
+        "cached_prompt_tokens": cached_tokens or 0
+    }
+
+def extract_finish_reason(response_data: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Why the provider stopped generating ("length" when max_tokens cut the completion)"""
+    choices = (response_data or {}).get("choices") or [{}]
+    return choices[0].get("finish_reason")
+
+class JsonLinesWriter:
+    """
+    Appends lines to files from a background thread (a QueueListener, like the log
+    handlers), so the caller, e.g. the event loop, only queues them
+    """
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._listener = QueueListener(self._queue, _JsonLinesHandler())
+        self._listener.start()
+    
+    def write(self, filepath: str, line: str):
+        """Queue a line to be appended to the file"""
+        self._queue.put(logging.makeLogRecord({"msg": line, "filepath": filepath}))
+    
+    def close(self):
+        """Stop the writer thread after appending the queued lines"""
+        self._listener.stop()
+
+class _JsonLinesHandler(logging.Handler):
+    """Appends each queued line to its file (runs on the JsonLinesWriter thread)"""
+    def emit(self, record: logging.LogRecord):
+        try:
+            with open(record.filepath, "a") as f:
+                f.write(record.msg + "\n")
+        except OSError as e:
+            logger.error("Error writing JSON lines", path=record.filepath, error=str(e))
 
 class LoggingService:
     def __init__(self):
@@ -15,22 +89,39 @@ class LoggingService:
         # Set up file logging
         self.log_file = os.path.join(self.logs_dir, f"app_{datetime.now().strftime('%Y%m%d')}.log")
         
-        # Configure logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(self.log_file),
-                logging.StreamHandler()
-            ]
-        )
+        # Configure logging; records are only queued on the caller's thread (e.g. the event
+        # loop) and the file and console handlers write them from a background thread
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handlers = [logging.FileHandler(self.log_file), logging.StreamHandler()]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        
+        log_queue = queue.SimpleQueue()
+        self._queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self._queue_listener.start()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
         
         self.logger = logging.getLogger("interview-prep")
+        
+        # Production mode (LOG_MODE) drops the per-call info lines
+        self.logger.setLevel(max(logging.INFO, default_level()))
         self.logger.info("Logging service initialized")
         
         # JSON logs directory
         self.json_logs_dir = os.path.join(self.logs_dir, "json")
         os.makedirs(self.json_logs_dir, exist_ok=True)
+        self._json_writer = JsonLinesWriter()
+        
+        # In-memory LLM telemetry rollups keyed by (provider, operation, model)
+        self.llm_rollups = {}
+        self._rollup_lock = threading.Lock()
+    
+    def close(self):
+        """Stop the background log writers after flushing queued records and JSON entries"""
+        self._json_writer.close()
+        self._queue_listener.stop()
     
     def log_api_call(self, 
                     endpoint: str, 
@@ -58,11 +149,14 @@ class LoggingService:
         # Log to text file
         if error:
             self.logger.error(f"API call to {endpoint} failed: {error}")
-            self.logger.debug(f"Request data: {json.dumps(self._sanitize_data(request_data))}")
-        else:
+        elif self.logger.isEnabledFor(logging.INFO):
             self.logger.info(f"API call to {endpoint} completed in {duration_ms:.2f}ms")
-            self.logger.debug(f"Request data: {json.dumps(self._sanitize_data(request_data))}")
-            self.logger.debug(f"Response data: {json.dumps(self._sanitize_data(response_data)) if response_data else None}")
+        
+        # Only serialize the payloads when debug logging is on
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Request data: {json.dumps(log_entry['request'])}")
+            if not error:
+                self.logger.debug(f"Response data: {json.dumps(log_entry['response'])}")
         
         # Log to JSON file
         self._write_json_log(log_entry, "api_calls")
@@ -93,8 +187,9 @@ class LoggingService:
             self.logger.error(f"User interaction {interaction_type} failed: {error}")
         else:
             self.logger.info(f"User interaction {interaction_type} completed")
-            self.logger.debug(f"User data: {json.dumps(self._sanitize_data(user_data))}")
-            self.logger.debug(f"Result: {json.dumps(self._sanitize_data(result)) if result else None}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"User data: {json.dumps(log_entry['user_data'])}")
+                self.logger.debug(f"Result: {json.dumps(log_entry['result'])}")
         
         # Log to JSON file
         self._write_json_log(log_entry, "user_interactions")
@@ -107,17 +202,52 @@ class LoggingService:
                         duration_ms: Optional[float] = None,
                         is_mock: bool = False):
         """Log a DeepSeek API call to both text log and JSON file"""
+        self.log_llm_call(
+            provider="deepseek",
+            operation=operation,
+            request_data=request_data,
+            response_data=response_data,
+            error=error,
+            duration_ms=duration_ms,
+            is_mock=is_mock
+        )
+    
+    def log_llm_call(self,
+                     provider: str,
+                     operation: str,
+                     request_data: Dict[str, Any],
+                     response_data: Optional[Dict[str, Any]] = None,
+                     error: Optional[str] = None,
+                     duration_ms: Optional[float] = None,
+                     is_mock: bool = False,
+                     model: Optional[str] = None,
+                     cache_hit: bool = False):
+        """
+        Log an LLM provider call with token accounting and update the per-operation rollups.
+        
+        The full entry is written to the provider's JSON log (e.g. deepseek_api_YYYYMMDD.json).
+        """
         
         # Generate a unique ID for this log entry
         log_id = str(uuid.uuid4())
         
+        usage = extract_usage(response_data)
+        model = model or (response_data or {}).get("model")
+        cost_usd = self._estimate_cost(model, usage) if not (is_mock or cache_hit) else 0.0
+        
         # Create log entry
         log_entry = {
             "id": log_id,
             "timestamp": datetime.now().isoformat(),
-            "type": "deepseek_api",
+            "type": f"{provider}_api",
+            "provider": provider,
+            "model": model,
             "operation": operation,
             "is_mock": is_mock,
+            "cache_hit": cache_hit,
+            "usage": usage,
+            "finish_reason": extract_finish_reason(response_data),
+            "cost_usd": cost_usd,
             "request": self._sanitize_data(request_data),
             "response": self._sanitize_data(response_data) if response_data else None,
             "error": error,
@@ -125,19 +255,102 @@ class LoggingService:
         }
         
         # Log to text file
-        if is_mock:
-            self.logger.info(f"Mock DeepSeek API call for {operation}")
-        elif error:
-            self.logger.error(f"DeepSeek API call for {operation} failed: {error}")
-        else:
-            self.logger.info(f"DeepSeek API call for {operation} completed in {duration_ms:.2f}ms")
+        if error:
+            self.logger.error(f"{provider} API call for {operation} failed: {error}")
+        elif is_mock:
+            self.logger.info(f"Mock {provider} API call for {operation}")
+        elif self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(f"{provider} API call for {operation} completed in {duration_ms:.2f}ms "
+                             f"({usage['total_tokens']} tokens)")
         
-        self.logger.debug(f"Request data: {json.dumps(self._sanitize_data(request_data))}")
-        if response_data:
-            self.logger.debug(f"Response data: {json.dumps(self._sanitize_data(response_data))}")
+        # Only serialize the payloads when debug logging is on
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Request data: {json.dumps(log_entry['request'])}")
+            if response_data:
+                self.logger.debug(f"Response data: {json.dumps(log_entry['response'])}")
+        
+        truncated = log_entry["finish_reason"] == "length" and not cache_hit
+        self._update_llm_rollup(provider, operation, model, usage, cost_usd, duration_ms, error, is_mock, cache_hit,
+                                truncated)
         
         # Log to JSON file
-        self._write_json_log(log_entry, "deepseek_api")
+        self._write_json_log(log_entry, f"{provider}_api")
+    
+    def get_llm_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get the in-memory LLM telemetry rollups, one entry per provider, operation and model
+        """
+        with self._rollup_lock:
+            rollups = [dict(rollup) for rollup in self.llm_rollups.values()]
+        
+        stats = []
+        for rollup in rollups:
+            calls = rollup["calls"]
+            provider_calls = calls - rollup["mock_calls"] - rollup["cache_hits"]
+            duration_s = rollup["duration_ms"] / 1000
+            
+            stats.append({
+                **rollup,
+                "avg_latency_ms": rollup["duration_ms"] / calls if calls else 0.0,
+                "tokens_per_second": rollup["completion_tokens"] / duration_s if duration_s else 0.0,
+                "avg_total_tokens": rollup["total_tokens"] / calls if calls else 0.0,
+                "cost_per_request_usd": rollup["cost_usd"] / calls if calls else 0.0,
+                "error_rate": rollup["errors"] / calls if calls else 0.0,
+                "truncation_rate": rollup["truncated"] / provider_calls if provider_calls else 0.0,
+                # Share of prompt tokens the provider served from its prefix cache
+                "prefix_cache_hit_rate": (rollup["provider_cached_prompt_tokens"] / rollup["provider_prompt_tokens"]
+                                          if rollup["provider_prompt_tokens"] else 0.0)
+            })
+        
+        stats.sort(key=lambda s: (s["provider"], s["operation"], s["model"] or ""))
+        return stats
+    
+    def _estimate_cost(self, model: Optional[str], usage: Dict[str, int]) -> float:
+        """Estimate the USD cost of a call from its token usage"""
+        prompt_price, completion_price = MODEL_PRICING.get(model or "", (0.0, 0.0))
+        return (usage["prompt_tokens"] * prompt_price + usage["completion_tokens"] * completion_price) / 1000
+    
+    def _update_llm_rollup(self, provider: str, operation: str, model: Optional[str], usage: Dict[str, int],
+                           cost_usd: float, duration_ms: Optional[float], error: Optional[str], is_mock: bool,
+                           cache_hit: bool, truncated: bool):
+        """Add one call to the in-memory rollup for its provider, operation and model"""
+        with self._rollup_lock:
+            rollup = self.llm_rollups.get((provider, operation, model))
+            if rollup is None:
+                rollup = {
+                    "provider": provider,
+                    "operation": operation,
+                    "model": model,
+                    "calls": 0,
+                    "errors": 0,
+                    "mock_calls": 0,
+                    "cache_hits": 0,
+                    # Completions cut off by max_tokens (finish_reason "length")
+                    "truncated": 0,
+                    "duration_ms": 0.0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "total_tokens": 0,
+                    "cached_prompt_tokens": 0,
+                    # Prompt tokens of the calls the provider actually served (no mocks or response cache hits)
+                    "provider_prompt_tokens": 0,
+                    "provider_cached_prompt_tokens": 0,
+                    "cost_usd": 0.0
+                }
+                self.llm_rollups[(provider, operation, model)] = rollup
+            
+            rollup["calls"] += 1
+            rollup["errors"] += 1 if error else 0
+            rollup["mock_calls"] += 1 if is_mock else 0
+            rollup["cache_hits"] += 1 if cache_hit else 0
+            rollup["truncated"] += 1 if truncated else 0
+            rollup["duration_ms"] += duration_ms or 0.0
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens", "cached_prompt_tokens"):
+                rollup[key] += usage[key]
+            if not (is_mock or cache_hit):
+                rollup["provider_prompt_tokens"] += usage["prompt_tokens"]
+                rollup["provider_cached_prompt_tokens"] += usage["cached_prompt_tokens"]
+            rollup["cost_usd"] += cost_usd
     
     def _sanitize_data(self, data: Any) -> Any:
         """Remove sensitive information from data before logging"""
@@ -156,16 +369,15 @@ class LoggingService:
             return data
     
     def _write_json_log(self, log_entry: Dict[str, Any], log_type: str):
-        """Write a log entry to a JSON file"""
+        """Write a log entry to a JSON file (appended by the background JSON writer)"""
         try:
             # Create a filename based on the date and log type
             date_str = datetime.now().strftime('%Y%m%d')
             filename = f"{log_type}_{date_str}.json"
             filepath = os.path.join(self.json_logs_dir, filename)
             
-            # Append to the file
-            with open(filepath, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
+            # Serialize here, while the entry can't change, and append from the writer thread
+            self._json_writer.write(filepath, json.dumps(log_entry))
         except Exception as e:
             self.logger.error(f"Error writing JSON log: {str(e)}")
     
@@ -174,7 +386,7 @@ class LoggingService:
         Get logs of a specific type for a specific date
         """
         try:
-            print(f"Getting logs for type={log_type}, date={date_str}")
+            logger.debug("Getting logs", log_type=log_type, date=date_str)
             
             # Determine the log file path
             if date_str:
@@ -183,52 +395,39 @@ class LoggingService:
                 date_obj = datetime.strptime(date_str, "%Y-%m-%d")
                 date_formatted = date_obj.strftime("%Y-%m-%d")
                 date_formatted_compact = date_obj.strftime("%Y%m%d")
-                print(f"Parsed date: {date_formatted} (compact: {date_formatted_compact})")
             else:
                 # Use today's date
                 from datetime import datetime
                 date_formatted = datetime.now().strftime("%Y-%m-%d")
                 date_formatted_compact = datetime.now().strftime("%Y%m%d")
-                print(f"Using today's date: {date_formatted} (compact: {date_formatted_compact})")
-            
-            # Map the new log type to the old log type
-            old_log_type_map = {
-                "api": "api_calls",
-                "llm": "deepseek_api",
-                "app": "user_interactions"
-            }
             
-            old_log_type = old_log_type_map.get(log_type, log_type)
-            print(f"Mapped log type: {log_type} -> {old_log_type}")
-            
-            # Try the existing JSON log file first
-            json_log_file = os.path.join(self.json_logs_dir, f"{old_log_type}_{date_formatted_compact}.json")
-            print(f"Looking for JSON log file: {json_log_file}")
-            
-            if os.path.exists(json_log_file):
-                print(f"Found JSON log file: {json_log_file}")
-                # Parse the JSON log file
+            # Try the existing JSON log files first
+            json_log_files = self._json_log_files(log_type, date_formatted_compact)
+            if json_log_files:
+                logger.debug("Found JSON log files", paths=json_log_files)
+                # Parse the JSON log files
                 logs = []
-                with open(json_log_file, "r") as f:
-                    for line in f:
-                        try:
-                            log_entry = json.loads(line.strip())
-                            
-                            # Convert the JSON log entry to the expected format
-                            timestamp = log_entry.get("timestamp", time.time())
-                            level = log_entry.get("level", "INFO")
-                            message = log_entry.get("message", "")
-                            data = log_entry.get("data", {})
-                            
-                            logs.append({
-                                "timestamp": timestamp,
-                                "level": level,
-                                "message": message,
-                                "data": data
-                            })
-                        except Exception as e:
-                            print(f"Error parsing JSON log line: {str(e)}")
-                            continue
+                for json_log_file in json_log_files:
+                    with open(json_log_file, "r") as f:
+                        for line in f:
+                            try:
+                                log_entry = json.loads(line.strip())
+                                
+                                # Convert the JSON log entry to the expected format
+                                timestamp = log_entry.get("timestamp", time.time())
+                                level = log_entry.get("level", "INFO")
+                                message = log_entry.get("message", "")
+                                data = log_entry.get("data", {})
+                                
+                                logs.append({
+                                    "timestamp": timestamp,
+                                    "level": level,
+                                    "message": message,
+                                    "data": data
+                                })
+                            except Exception as e:
+                                logger.warning("Error parsing JSON log line", sample=0.01, error=str(e))
+                                continue
                 
                 # Sort logs by timestamp (newest first)
                 logs.sort(key=lambda x: x["timestamp"], reverse=True)
@@ -237,27 +436,27 @@ class LoggingService:
             
             # If JSON log file doesn't exist, try the regular log file
             log_file = os.path.join(self.logs_dir, f"{log_type}_{date_formatted}.log")
-            print(f"JSON log file not found, looking for regular log file: {log_file}")
+            logger.debug("JSON log file not found, looking for regular log file", path=log_file)
             
             # Also try the compact date format for regular log files
             if not os.path.exists(log_file):
                 log_file = os.path.join(self.logs_dir, f"{log_type}_{date_formatted_compact}.log")
-                print(f"Regular log file not found, trying compact date format: {log_file}")
+                logger.debug("Regular log file not found, trying compact date format", path=log_file)
             
             # Also try the app log file which might have a different naming convention
             if not os.path.exists(log_file) and log_type == "app":
                 log_file = os.path.join(self.logs_dir, f"app_{date_formatted_compact}.log")
-                print(f"App log file not found, trying different naming convention: {log_file}")
+                logger.debug("App log file not found, trying different naming convention", path=log_file)
             
             if not os.path.exists(log_file):
-                print(f"No log files found for type={log_type}, date={date_str}")
+                logger.debug("No log files found", log_type=log_type, date=date_str)
                 return []
             
-            print(f"Found regular log file: {log_file}")
+            logger.debug("Found regular log file", path=log_file)
             
             # Parse the log file
             logs = []
-            with open(json_log_file, "r") as f:
+            with open(log_file, "r") as f:
                 for line in f:
                     try:
                         log_entry = json.loads(line.strip())
@@ -275,7 +474,7 @@ class LoggingService:
                             "data": data
                         })
                     except json.JSONDecodeError as e:
-                        print(f"Error parsing JSON log line: {str(e)}")
+                        logger.warning("Error parsing JSON log line", sample=0.01, error=str(e))
                         continue
             
             # Sort logs by timestamp (newest first)
@@ -284,5 +483,92 @@ class LoggingService:
             return logs
 
         except Exception as e:
-            print(f"Error getting logs: {str(e)}")
-            return [] 
\ No newline at end of file
+            logger.error("Error getting logs", error=str(e))
+            return []
+
+    def iter_logs_range(self, log_type: str, start: datetime, end: datetime) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over logs of a specific type between two datetimes (newest first).
+        
+        Daily JSON segments cover disjoint days, so they are read one after the other
+        from the newest, each through a generator: a page only reads as many
+        segments, and as much of each, as it needs. The "llm" type has one segment per
+        provider and day; those are merged newest first.
+        
+        Segments are deliberately not scanned in parallel: a concurrent scan has to read
+        every day of the range before the first entry can be returned, while a page of
+        a disjoint, newest-first sequence is usually served from the last day alone.
+        """
+        start_ts = start.timestamp()
+        end_ts = end.timestamp()
+        
+        day = end.date()
+        while day >= start.date():
+            segments = [self._read_log_segment(segment_file, start_ts, end_ts)
+                        for segment_file in self._json_log_files(log_type, day.strftime('%Y%m%d'))]
+            # Same-day segments of several providers ("llm") are interleaved by timestamp
+            if len(segments) == 1:
+                yield from segments[0]
+            elif segments:
+                yield from heapq.merge(*segments, key=lambda entry: self._timestamp_to_epoch(entry["timestamp"]),
+                                       reverse=True)
+            day -= timedelta(days=1)
+    
+    def _json_log_files(self, log_type: str, date_compact: str) -> List[str]:
+        """The JSON log files of a log type for one day (one per provider for "llm")"""
+        prefix = LOG_TYPE_FILE_MAP.get(log_type, glob.escape(log_type))
+        return sorted(glob.glob(os.path.join(self.json_logs_dir, f"{prefix}_{date_compact}.json")))
+    
+    def _read_log_segment(self, filepath: str, start_ts: float, end_ts: float) -> Iterator[Dict[str, Any]]:
+        """Yield the entries of one daily JSON log segment inside the time range, newest first"""
+        try:
+            for line in self._reversed_lines(filepath):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    log_entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                
+                timestamp = log_entry.get("timestamp", time.time())
+                sort_key = self._timestamp_to_epoch(timestamp)
+                if sort_key < start_ts or sort_key > end_ts:
+                    continue
+                
+                yield {
+                    "timestamp": timestamp,
+                    "level": log_entry.get("level", "INFO"),
+                    "message": log_entry.get("message", ""),
+                    "data": log_entry.get("data", {})
+                }
+        except OSError as e:
+            self.logger.error(f"Error reading log segment {filepath}: {str(e)}")
+    
+    def _reversed_lines(self, filepath: str, block_size: int = 65536) -> Iterator[bytes]:
+        """The lines of a file from last to first, read backwards in blocks (entries are appended in time order)"""
+        with open(filepath, "rb") as f:
+            position = f.seek(0, os.SEEK_END)
+            remainder = b""
+            while position > 0:
+                size = min(block_size, position)
+                position -= size
+                f.seek(position)
+                lines = (f.read(size) + remainder).split(b"\n")
+                # The first line may continue in the previous block
+                remainder = lines.pop(0)
+                yield from reversed(lines)
+            yield remainder
+    
+    def _timestamp_to_epoch(self, timestamp: Any) -> float:
+        """Convert a log timestamp (epoch seconds or ISO string) to epoch seconds"""
+        if isinstance(timestamp, (int, float)):
+            return float(timestamp)
+        try:
+            return float(timestamp)
+        except (TypeError, ValueError):
+            pass
+        try:
+            return datetime.fromisoformat(str(timestamp)).timestamp()
+        except ValueError:
+            return 0.0
@@ -0,0 +1,287 @@
+import threading
+from typing import Dict, Any, Callable, List, Tuple, Optional, Sequence
+
+# Default latency buckets (seconds) for request and LLM call histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class _ThreadShards:
+    """
+    Per-thread metric storage.
+
+    Every thread writes only to its own shard, so the hot path takes no lock.
+    Shards are summed when the metrics are scraped.
+    """
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def shard(self) -> Dict[Tuple[str, ...], Any]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            # Only taken once per thread, when its shard is created
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def snapshot(self) -> List[Dict[Tuple[str, ...], Any]]:
+        with self._lock:
+            shards = list(self._shards)
+        return [dict(shard) for shard in shards]
+
+
+class Counter:
+    """A monotonically increasing counter with labels"""
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = _ThreadShards()
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        shard = self._shards.shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def collect(self) -> Dict[Tuple[str, ...], float]:
+        totals = {}
+        for shard in self._shards.snapshot():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0.0) + value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """A cumulative histogram with labels, rendered in the Prometheus bucket format"""
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _ThreadShards()
+
+    def observe(self, value: float, *labels: str):
+        shard = self._shards.shard()
+        series = shard.get(labels)
+        if series is None:
+            # Per-bucket (non-cumulative) counts, then sum and count
+            series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            shard[labels] = series
+
+        # Buckets are few, so a linear scan beats bisect's call overhead
+        index = 0
+        for bound in self.buckets:
+            if value <= bound:
+                break
+            index += 1
+        series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def collect(self) -> Dict[Tuple[str, ...], Tuple[List[int], float, int]]:
+        totals = {}
+        for shard in self._shards.snapshot():
+            for labels, (counts, total, count) in shard.items():
+                merged = totals.get(labels)
+                if merged is None:
+                    totals[labels] = (list(counts), total, count)
+                else:
+                    merged_counts = [a + b for a, b in zip(merged[0], counts)]
+                    totals[labels] = (merged_counts, merged[1] + total, merged[2] + count)
+        return totals
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bucket_names = self.labelnames + ("le",)
+        for labels, (counts, total, count) in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_names, labels + (_format_value(bound),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(bucket_names, labels + ('+Inf',))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class GaugeCallback:
+    """A gauge whose value is computed by a callback at scrape time"""
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        try:
+            lines.append(f"{self.name} {_format_value(float(self.callback()))}")
+        except Exception:
+            # A failing callback must not break the whole scrape
+            pass
+        return lines
+
+
+class MetricsService:
+    """
+    Prometheus-compatible metrics registry for the API.
+
+    Recording is lock-free (per-thread shards); the text exposition format
+    is only built when /metrics is scraped.
+    """
+    def __init__(self):
+        self._metrics = []
+
+        self.http_requests = self.counter(
+            "http_requests_total", "Total HTTP requests", ["method", "route", "status"])
+        self.http_request_duration = self.histogram(
+            "http_request_duration_seconds", "HTTP request latency in seconds", ["method", "route", "status"])
+        self.http_time_to_first_byte = self.histogram(
+            "http_time_to_first_byte_seconds", "Time until the response headers were sent", ["method", "route"])
+        self.http_response_size = self.histogram(
+            "http_response_size_bytes", "HTTP response body size in bytes", ["method", "route"],
+            buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576))
+        self.llm_calls = self.counter(
+            "llm_calls_total", "Total LLM provider calls", ["provider", "operation", "outcome"])
+        self.llm_call_duration = self.histogram(
+            "llm_call_duration_seconds", "LLM provider call latency in seconds", ["provider", "operation"])
+        self.llm_model_call_duration = self.histogram(
+            "llm_model_call_duration_seconds", "LLM provider call latency in seconds by model",
+            ["provider", "operation", "model"])
+        self.llm_prompt_tokens = self.counter(
+            "llm_prompt_tokens_total", "Prompt tokens sent to LLM providers", ["provider", "operation"])
+        self.llm_cached_prompt_tokens = self.counter(
+            "llm_cached_prompt_tokens_total", "Prompt tokens the LLM provider served from its prefix cache",
+            ["provider", "operation"])
+        self.llm_truncated_completions = self.counter(
+            "llm_truncated_completions_total", "LLM completions cut off by max_tokens (finish_reason length)",
+            ["provider", "operation"])
+        self.fallbacks = self.counter(
+            "fallback_total", "Responses served from a fallback path", ["path"])
+        self.question_selections = self.counter(
+            "question_selection_total", "Question generations by selection mode and outcome (complete, short, padded)",
+            ["mode", "outcome"])
+        self.near_duplicates = self.counter(
+            "question_near_duplicates_total", "Near-duplicate generated questions removed", [])
+        self.duplicate_replacements = self.counter(
+            "question_duplicate_replacements_total", "Replacement questions kept for removed near-duplicates", [])
+        self.prompt_tokens_saved = self.counter(
+            "prompt_tokens_saved_total", "Estimated prompt tokens saved by JD preprocessing and prompt compaction",
+            ["operation", "stage"])
+        self.jd_classifier_decisions = self.counter(
+            "jd_classifier_decisions_total",
+            "JD validations by the local classifier's decision (local_valid, local_invalid, llm)", ["decision"])
+        self.jd_classifier_agreement = self.counter(
+            "jd_classifier_agreement_total",
+            "LLM JD validations compared with the local classifier, by band (confident, ambiguous)",
+            ["band", "agreed"])
+        self.provisional_score_difference = self.histogram(
+            "provisional_score_difference", "Absolute difference between provisional (local) and LLM answer scores",
+            [], buckets=(5, 10, 15, 20, 30, 40, 50, 75, 100))
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str]) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str],
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge_callback(self, name: str, documentation: str, callback: Callable[[], float]) -> GaugeCallback:
+        metric = GaugeCallback(name, documentation, callback)
+        self._metrics.append(metric)
+        return metric
+
+    def observe_request(self, method: str, route: str, status_code: int, duration_s: float,
+                        ttfb_s: Optional[float] = None, response_bytes: Optional[int] = None):
+        """Record one HTTP request; duration_s covers the whole (possibly streamed) response"""
+        status = str(status_code)
+        self.http_requests.inc(method, route, status)
+        self.http_request_duration.observe(duration_s, method, route, status)
+        if ttfb_s is not None:
+            self.http_time_to_first_byte.observe(ttfb_s, method, route)
+        if response_bytes is not None:
+            self.http_response_size.observe(response_bytes, method, route)
+
+    def observe_llm_call(self, provider: str, operation: str, duration_s: Optional[float], error: bool = False,
+                         cache_hit: bool = False, prompt_tokens: int = 0, cached_prompt_tokens: int = 0,
+                         truncated: bool = False, model: Optional[str] = None):
+        """
+        Record one LLM provider call; cache hits are counted but kept out of the latency histogram,
+        the prompt token counters and the truncation counter
+        """
+        if cache_hit:
+            self.llm_calls.inc(provider, operation, "cache_hit")
+            return
+        self.llm_calls.inc(provider, operation, "error" if error else "success")
+        if duration_s is not None:
+            self.llm_call_duration.observe(duration_s, provider, operation)
+            if model:
+                self.llm_model_call_duration.observe(duration_s, provider, operation, model)
+        if prompt_tokens:
+            self.llm_prompt_tokens.inc(provider, operation, amount=prompt_tokens)
+            self.llm_cached_prompt_tokens.inc(provider, operation, amount=cached_prompt_tokens)
+        if truncated:
+            self.llm_truncated_completions.inc(provider, operation)
+
+    def record_fallback(self, path: str):
+        """Record a response served from a fallback path (e.g. test_questions)"""
+        self.fallbacks.inc(path)
+
+    def record_question_selection(self, mode: str, outcome: str):
+        """Record whether a question generation was complete, short, or padded with template questions"""
+        self.question_selections.inc(mode, outcome)
+
+    def record_near_duplicates(self, removed: int, replaced: int):
+        """Record near-duplicate questions removed and the replacements kept for them"""
+        self.near_duplicates.inc(amount=removed)
+        self.duplicate_replacements.inc(amount=replaced)
+
+    def record_prompt_savings(self, operation: str, stage: str, tokens: int):
+        """Record the estimated prompt tokens a preprocessing stage saved on one call"""
+        if tokens > 0:
+            self.prompt_tokens_saved.inc(operation, stage, amount=tokens)
+
+    def record_jd_classification(self, decision: str):
+        """Record whether the local classifier answered a JD validation or passed it to the LLM"""
+        self.jd_classifier_decisions.inc(decision)
+
+    def record_jd_classifier_agreement(self, band: str, agreed: bool):
+        """Record whether the LLM agreed with the local classifier on one JD"""
+        self.jd_classifier_agreement.inc(band, "true" if agreed else "false")
+
+    def observe_provisional_score(self, provisional: float, final: float):
+        """Record how far a provisional answer score was from the LLM's score"""
+        self.provisional_score_difference.observe(abs(final - provisional))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
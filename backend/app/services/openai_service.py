@@ -1,62 +1,89 @@
 import os
 import httpx
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import json
 import re
 import time
 import asyncio
-from openai import AsyncOpenAI
+from app.services.dedup_service import cycle_pairs
+from app.services.llm_provider import LLMProvider
+from app.services.prompts import DEFAULT_ANSWER_WORD_LIMIT, PROMPTS, TokenBudget
+from app.services.skill_lexicon import SKILL_LEXICON
+from app.services.timing_service import timed
+from app.services.tracing_service import traced
+from app.services.structured_logger import get_logger
+from openai import AsyncOpenAI, NOT_GIVEN
 import uuid
 
-class OpenAIService:
+logger = get_logger("openai_service")
+
+class OpenAIService(LLMProvider):
+    # Provider name used for metrics, spans and the JSON log file ({provider}_api_YYYYMMDD.json)
+    provider = "openai"
+    # Prompt templates used (app/services/prompts.py)
+    prompt_family = "openai"
+    
     def __init__(self):
         # Get API key from OS environment variable
         self.api_key = os.environ.get("OPENAI_API_KEY")
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o")
+        # Operation -> model used instead of self.model (set by llm_factory)
+        self.operation_models = {}
         self.temperature = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
         
         if not self.api_key:
-            print("WARNING: OPENAI_API_KEY environment variable is not set")
+            logger.warning("OPENAI_API_KEY environment variable is not set")
             # For development/testing, you can use a mock response
             self.use_mock = True
         else:
             self.use_mock = False
-            # Initialize the OpenAI client
-            self.client = AsyncOpenAI(api_key=self.api_key)
+            # Initialize the OpenAI client; OPENAI_BASE_URL can point at a compatible server
+            self.client = AsyncOpenAI(api_key=self.api_key, base_url=os.getenv("OPENAI_BASE_URL") or None)
+        
+        # Prompt and completion token budgets per operation
+        self.token_budget = TokenBudget()
     
-    async def _call_api(self, messages: List[Dict[str, str]], temperature: float = None) -> Dict[str, Any]:
+    @traced("openai.chat_completion", kind="CLIENT")
+    async def _call_api(self, messages: List[Dict[str, str]], temperature: float = None,
+                        max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        # Use the provided temperature or default to the class temperature
+        temp = temperature if temperature is not None else self.temperature
+        # Send the prompts without the indentation of their triple-quoted templates
+        messages = self._compact_messages(messages)
+        model = self._model_for(messages)
+        
         if self.use_mock:
-            print("Using mock response (no API key provided)")
-            start_time = time.time()
-            mock_response = self._get_mock_response(messages)
-            duration_ms = (time.time() - start_time) * 1000
+            logger.debug("Using mock response (no API key provided)")
+            start_time = time.perf_counter()
+            with timed("llm"):
+                mock_response = self._get_mock_response(messages)
+            duration_ms = (time.perf_counter() - start_time) * 1000
             
             # Log the mock API call
-            if hasattr(self, 'logging_service'):
-                operation = self._determine_operation(messages)
-                self.logging_service.log_openai_api(
-                    operation=operation,
-                    request_data={"messages": messages, "temperature": temperature or self.temperature},
-                    response_data=mock_response,
-                    duration_ms=duration_ms,
-                    is_mock=True
-                )
+            self._log_llm_call(messages, temp, response_data=mock_response,
+                               duration_ms=duration_ms, is_mock=True)
             
             return mock_response
         
+        # Serve repeated prompts from the response cache, if attached
+        if hasattr(self, 'response_cache'):
+            cached_response = self.response_cache.get(self._determine_operation(messages), model, messages)
+            if cached_response is not None:
+                self._log_llm_call(messages, temp, response_data=cached_response, duration_ms=0.0, cache_hit=True)
+                return cached_response
+        
+        start_time = time.perf_counter()
         try:
-            start_time = time.time()
-            
-            # Use the provided temperature or default to the class temperature
-            temp = temperature if temperature is not None else self.temperature
-            
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": m["role"], "content": m["content"]} for m in messages],
-                temperature=temp
-            )
+            with timed("llm"):
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": m["role"], "content": m["content"]} for m in messages],
+                    temperature=temp,
+                    # Stop generation at the source rather than truncating what comes back
+                    max_tokens=max_tokens or NOT_GIVEN
+                )
             
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter() - start_time) * 1000
             
             # Convert the response to a dictionary format similar to DeepSeek
             response_dict = {
@@ -74,44 +101,48 @@ class OpenAIService:
                         "finish_reason": response.choices[0].finish_reason
                     }
                 ],
-                "usage": {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens
-                }
+                "usage": self._usage_to_dict(response.usage)
             }
             
             # Log the API call
-            if hasattr(self, 'logging_service'):
-                operation = self._determine_operation(messages)
-                self.logging_service.log_openai_api(
-                    operation=operation,
-                    request_data={"messages": messages, "temperature": temp},
-                    response_data=response_dict,
-                    duration_ms=duration_ms,
-                    is_mock=False
-                )
+            self._log_llm_call(messages, temp, response_data=response_dict, duration_ms=duration_ms)
+            if hasattr(self, 'response_cache'):
+                self.response_cache.put(self._determine_operation(messages), model, messages, response_dict)
             
             return response_dict
         except Exception as e:
-            print(f"Error calling OpenAI API: {str(e)}")
+            logger.error("Error calling OpenAI API", error=str(e))
             
             # Log the error
-            if hasattr(self, 'logging_service'):
-                operation = self._determine_operation(messages)
-                self.logging_service.log_openai_api(
-                    operation=operation,
-                    request_data={"messages": messages, "temperature": temp},
-                    error=str(e),
-                    duration_ms=(time.time() - start_time) * 1000,
-                    is_mock=False
-                )
+            self._log_llm_call(messages, temp, error=str(e),
+                               duration_ms=(time.perf_counter() - start_time) * 1000)
             
             raise e
     
+    def _usage_to_dict(self, usage) -> Dict[str, Any]:
+        """Convert the SDK usage object to a plain dictionary, keeping cached prompt tokens"""
+        if usage is None:
+            return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        
+        usage_dict = {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens
+        }
+        
+        details = getattr(usage, "prompt_tokens_details", None)
+        if details is not None:
+            usage_dict["prompt_tokens_details"] = {"cached_tokens": getattr(details, "cached_tokens", 0) or 0}
+        
+        return usage_dict
+    
     def _determine_operation(self, messages: List[Dict[str, str]]) -> str:
         """Determine the operation being performed based on the messages content"""
-        # This is the same logic as in DeepSeekService
+        operation = PROMPTS.operation_of(messages)
+        if operation:
+            return operation
+        
+        # Prompts built before the template registry (e.g. in logged requests)
         user_message = next((m["content"] for m in messages if m["role"] == "user"), "")
         
         if "analyze if the following text is a job description" in user_message.lower():
@@ -290,162 +321,127 @@ class OpenAIService:
             }
         }
     
+    def _get_mock_default_response(self) -> Dict[str, Any]:
+        """Generate a mock response for prompts that don't match a known operation"""
+        return {
+            "id": "mock-response-id",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o-mock",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {
+                        "role": "assistant",
+                        "content": "I'm not sure how to respond to that."
+                    },
+                    "finish_reason": "stop"
+                }
+            ],
+            "usage": {
+                "prompt_tokens": 50,
+                "completion_tokens": 10,
+                "total_tokens": 60
+            }
+        }
+    
     async def analyze_jd(self, jd_text: str) -> Tuple[bool, float, str]:
         """
         Analyze if the text is a job description
         Returns: (is_valid_jd, confidence, overview)
+        Raises when the API call fails or the response has no is_valid_jd, so the caller can fall back
         """
-        prompt = f"""
-        Please analyze if the following text is a job description.
-        
-        Text to analyze:
-        {jd_text}
-        
-        Return your response in the following JSON format:
-        {{
-            "is_valid_jd": true/false,
-            "confidence": 0-100,
-            "overview": "Brief overview of the job description if valid"
-        }}
-        
-        If the text is not a job description or is too short/incomplete, set is_valid_jd to false and provide a low confidence score.
-        """
-        
-        messages = [
-            {"role": "system", "content": "You are an AI assistant that analyzes job descriptions."},
-            {"role": "user", "content": prompt}
-        ]
-        
-        try:
-            print(f"Analyzing text to determine if it's a job description (length: {len(jd_text)})")
-            
-            # Call the OpenAI API
-            response = await self._call_api(messages)
-            
-            # Debug the raw response
-            print(f"Raw response from OpenAI API: {response}")
-            
-            if "choices" in response and len(response["choices"]) > 0:
-                content = response["choices"][0]["message"]["content"]
-                print(f"Raw content from API: {content}")
-                
-                # Try to parse the JSON response
-                try:
-                    # Find JSON in the response (in case the model adds extra text)
-                    import re
-                    json_match = re.search(r'({.*})', content, re.DOTALL)
-                    if json_match:
-                        json_str = json_match.group(1)
-                        result = json.loads(json_str)
-                    else:
-                        # If no JSON pattern found, try parsing the whole content
-                        result = json.loads(content)
-                    
-                    # Extract the values
-                    is_valid = result.get("is_valid_jd", False)
-                    confidence = float(result.get("confidence", 0))
-                    overview = result.get("overview", "")
-                    
-                    # Ensure confidence is between 0 and 100
-                    confidence = max(0, min(100, confidence))
-                    
-                    print(f"Analysis result: Valid={is_valid}, Confidence={confidence}, Overview={overview[:50]}...")
-                    return (is_valid, confidence, overview)
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing JSON from API response: {e}")
-                    print(f"Content that failed to parse: {content}")
-                    
-                    # Try to extract values using regex as a fallback
-                    is_valid_match = re.search(r'"is_valid_jd":\s*(true|false)', content, re.IGNORECASE)
-                    is_valid = is_valid_match and is_valid_match.group(1).lower() == 'true' if is_valid_match else False
-                    
-                    confidence_match = re.search(r'"confidence":\s*(\d+(?:\.\d+)?)', content)
-                    confidence = float(confidence_match.group(1)) if confidence_match else 0
-                    
-                    overview_match = re.search(r'"overview":\s*"([^"]*)"', content)
-                    overview = overview_match.group(1) if overview_match else ""
-                    
-                    print(f"Extracted using regex: Valid={is_valid}, Confidence={confidence}, Overview={overview[:50]}...")
-                    return (is_valid, confidence, overview)
-            
-            print("Invalid response format from API")
-            return (False, 0.0, "")
-        except Exception as e:
-            print(f"Error in analyze_jd: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return (False, 0.0, "")
+        messages, max_tokens = self._budgeted_prompt("analyze_jd", jd_text=jd_text)
+        
+        logger.debug("Analyzing text to determine if it's a job description", jd_length=len(jd_text))
+        
+        # Call the OpenAI API
+        response = await self._call_api(messages, max_tokens=max_tokens)
+        
+        if not response.get("choices"):
+            raise ValueError("Invalid response format from API")
+        
+        content = response["choices"][0]["message"]["content"] or ""
+        logger.debug("Raw content from API", content=content)
+        
+        with timed("parse"):
+            # Try to parse the JSON response
+            try:
+                # Find JSON in the response (in case the model adds extra text)
+                json_match = re.search(r'({.*})', content, re.DOTALL)
+                if json_match:
+                    json_str = json_match.group(1)
+                    result = json.loads(json_str)
+                else:
+                    # If no JSON pattern found, try parsing the whole content
+                    result = json.loads(content)
+            
+                # Extract the values
+                if "is_valid_jd" not in result:
+                    raise ValueError("No is_valid_jd in the analysis response")
+                is_valid = bool(result["is_valid_jd"])
+                confidence = float(result.get("confidence", 0))
+                overview = result.get("overview", "")
+            
+                # Ensure confidence is between 0 and 100
+                confidence = max(0, min(100, confidence))
+            
+                logger.debug("Analysis result", valid=is_valid, confidence=confidence, overview=overview)
+                return (is_valid, confidence, overview)
+            except json.JSONDecodeError as e:
+                logger.warning("Error parsing JSON from API response", error=str(e), content=content)
+            
+                # Try to extract values using regex as a fallback
+                is_valid_match = re.search(r'"is_valid_jd":\s*(true|false)', content, re.IGNORECASE)
+                if not is_valid_match:
+                    raise ValueError("No is_valid_jd in the analysis response")
+                is_valid = is_valid_match.group(1).lower() == 'true'
+            
+                confidence_match = re.search(r'"confidence":\s*(\d+(?:\.\d+)?)', content)
+                confidence = float(confidence_match.group(1)) if confidence_match else 0
+            
+                overview_match = re.search(r'"overview":\s*"([^"]*)"', content)
+                overview = overview_match.group(1) if overview_match else ""
+            
+                logger.debug("Extracted using regex", valid=is_valid, confidence=confidence, overview=overview)
+                return (is_valid, confidence, overview)
     
-    async def generate_answer(self, question_text: str) -> str:
+    async def generate_answer(self, question_text: str, word_limit: int = DEFAULT_ANSWER_WORD_LIMIT) -> str:
         """
         Generate an answer for a given interview question
-        Returns: A comprehensive answer to the question
-        """
-        prompt = f"""
-        Please provide a comprehensive and well-structured answer to this interview question:
-        
-        Question: {question_text}
-        
-        Your answer should:
-        1. Be detailed and thorough
-        2. Include specific examples or approaches
-        3. Demonstrate expertise in the subject
-        4. Be structured in a clear and logical way
-        5. Be around 200-300 words
+        Returns: An answer of at most word_limit words
         """
-        
-        messages = [
-            {"role": "system", "content": "You are an AI assistant helping prepare for job interviews."},
-            {"role": "user", "content": prompt}
-        ]
+        messages, max_tokens = self._budgeted_prompt("generate_answer", question_text=question_text, word_limit=word_limit)
         
         try:
-            print(f"Generating answer for question: {question_text[:50]}...")
+            logger.debug("Generating answer", question=question_text)
             
             # Call the OpenAI API
-            response = await self._call_api(messages)
+            response = await self._call_api(messages, max_tokens=max_tokens)
             
             if "choices" in response and len(response["choices"]) > 0:
                 answer = response["choices"][0]["message"]["content"].strip()
                 
                 if answer and len(answer) > 50:
-                    print(f"Successfully generated answer of length {len(answer)}")
+                    logger.debug("Generated answer", length=len(answer))
                     return answer
             
-            print("Invalid response or too short answer from API")
+            logger.warning("Invalid response or too short answer from API")
             return self._get_mock_answer_for_question(question_text)
         except Exception as e:
-            print(f"Error in generate_answer: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Error in generate_answer", exc_info=True, error=str(e))
             return self._get_mock_answer_for_question(question_text)
     
-    async def generate_answer_stream(self, question_text: str):
+    async def generate_answer_stream(self, question_text: str, word_limit: int = DEFAULT_ANSWER_WORD_LIMIT):
         """
         Generate an answer for a given question with streaming response
-        Yields: Chunks of the generated answer
+        Yields: Chunks of an answer of at most word_limit words
         """
-        prompt = f"""
-        Please provide a comprehensive and well-structured answer to this interview question:
-        
-        Question: {question_text}
-        
-        Your answer should:
-        1. Be detailed and thorough
-        2. Include specific examples or approaches
-        3. Demonstrate expertise in the subject
-        4. Be structured in a clear and logical way
-        5. Be around 200-300 words
-        """
-        
-        messages = [
-            {"role": "system", "content": "You are an AI assistant helping prepare for job interviews."},
-            {"role": "user", "content": prompt}
-        ]
+        messages, max_tokens = self._budgeted_prompt("generate_answer", question_text=question_text, word_limit=word_limit)
         
         # If using mock responses, simulate streaming with a pre-generated answer
         if self.use_mock:
-            print("Using mock response for streaming answer generation")
+            logger.debug("Using mock response for streaming answer generation")
             mock_answer = self._get_mock_answer_for_question(question_text)
             
             # Split into sentences for more natural streaming
@@ -458,13 +454,15 @@ class OpenAIService:
             return
         
         try:
-            print("Calling OpenAI API for streaming answer generation")
+            logger.debug("Calling OpenAI API for streaming answer generation")
+            messages = self._compact_messages(messages)
             
             # Use the OpenAI streaming API
             stream = await self.client.chat.completions.create(
-                model=self.model,
+                model=self._model_for(messages),
                 messages=[{"role": m["role"], "content": m["content"]} for m in messages],
                 temperature=self.temperature,
+                max_tokens=max_tokens,
                 stream=True
             )
             
@@ -479,15 +477,13 @@ class OpenAIService:
                     yield content
             
             if not collected_content or len(collected_content) < 20:
-                print(f"Error: Generated answer too short: {collected_content}")
+                logger.warning("Generated answer too short", answer=collected_content)
                 raise ValueError("Generated answer is too short or empty")
             
-            print(f"Successfully generated full answer of length {len(collected_content)}")
+            logger.debug("Generated full answer", length=len(collected_content))
             
         except Exception as e:
-            print(f"Error in generate_answer_stream: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Error in generate_answer_stream", exc_info=True, error=str(e))
             
             # Generate a fallback answer
             fallback = "I couldn't generate an answer at this time due to a technical issue. Please try again later or write your own answer based on your experience and knowledge."
@@ -529,151 +525,99 @@ class OpenAIService:
             In my previous roles, I've tackled similar challenges by breaking down complex problems into manageable components and implementing systematic solutions. For example, when working on a project that required optimizing performance, I conducted thorough analysis to identify bottlenecks and implemented targeted improvements that resulted in a 35% efficiency gain.
             """
     
-    async def generate_questions(self, jd_text: str, question_count: int = 5) -> List[Dict[str, str]]:
+    async def _generate_question_batch(self, jd_text: str, question_count: int) -> List[Dict[str, str]]:
         """
-        Generate interview questions based on a job description
+        Generate interview questions based on a job description, in one call (see LLMProvider.generate_questions)
         Returns: List of dictionaries with 'text' and 'reference_answer' keys
         """
-        prompt = f"""
-        Generate {question_count} interview questions based on this job description:
-        
-        {jd_text}
-        
-        For each question, also provide a reference answer that would be considered excellent.
-        
-        Return your response in the following JSON format:
-        {{
-            "questions": [
-                {{
-                    "text": "Question 1",
-                    "reference_answer": "Reference answer for question 1"
-                }},
-                ...
-            ]
-        }}
-        
-        Make sure the questions are:
-        1. Relevant to the job description
-        2. A mix of technical and behavioral questions
-        3. Specific enough to assess the candidate's skills and experience
-        4. Open-ended to encourage detailed responses
-        
-        The reference answers should:
-        1. Be comprehensive and detailed
-        2. Include specific examples or approaches
-        3. Highlight key points that would make an answer excellent
-        """
-        
-        messages = [
-            {"role": "system", "content": "You are an AI assistant that helps generate relevant interview questions based on job descriptions."},
-            {"role": "user", "content": prompt}
-        ]
+        messages, max_tokens = self._budgeted_prompt("generate_questions", jd_text=jd_text, question_count=question_count)
         
         try:
-            print(f"Generating {question_count} questions based on JD (length: {len(jd_text)})")
+            logger.debug("Generating questions", question_count=question_count, jd_length=len(jd_text))
             
             # Call the OpenAI API
-            response = await self._call_api(messages)
+            response = await self._call_api(messages, max_tokens=max_tokens)
             
             if "choices" in response and len(response["choices"]) > 0:
                 content = response["choices"][0]["message"]["content"]
-                print(f"Raw content from API: {content[:200]}...")
+                logger.debug("Raw content from API", content=content)
                 
-                # Try to parse the JSON response
-                try:
-                    # Find JSON in the response (in case the model adds extra text)
-                    import re
-                    json_match = re.search(r'({.*})', content, re.DOTALL)
-                    if json_match:
-                        json_str = json_match.group(1)
-                        result = json.loads(json_str)
-                    else:
-                        # If no JSON pattern found, try parsing the whole content
-                        result = json.loads(content)
+                with timed("parse"):
+                    # Try to parse the JSON response
+                    try:
+                        # Find JSON in the response (in case the model adds extra text)
+                        import re
+                        json_match = re.search(r'({.*})', content, re.DOTALL)
+                        if json_match:
+                            json_str = json_match.group(1)
+                            result = json.loads(json_str)
+                        else:
+                            # If no JSON pattern found, try parsing the whole content
+                            result = json.loads(content)
                     
-                    # Extract the questions
-                    questions = result.get("questions", [])
+                        # Extract the questions
+                        questions = result.get("questions", [])
                     
-                    # Ensure we have the requested number of questions
-                    if len(questions) < question_count:
-                        print(f"Warning: Only generated {len(questions)} questions, expected {question_count}")
+                        # Ensure we have the requested number of questions
+                        if len(questions) < question_count:
+                            logger.warning("Generated fewer questions than requested", count=len(questions), requested=question_count)
                     
-                    # Add unique IDs to each question
-                    questions_with_ids = []
-                    for q in questions:
-                        question_id = str(uuid.uuid4())
-                        questions_with_ids.append({
-                            "id": question_id,
-                            "text": q.get("text", ""),
-                            "reference_answer": q.get("reference_answer", "")
-                        })
+                        # Add unique IDs to each question
+                        questions_with_ids = []
+                        for q in questions:
+                            question_id = str(uuid.uuid4())
+                            questions_with_ids.append({
+                                "id": question_id,
+                                "text": q.get("text", ""),
+                                "reference_answer": q.get("reference_answer", "")
+                            })
                     
-                    print(f"Successfully generated {len(questions_with_ids)} questions")
-                    return questions_with_ids
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing JSON from API response: {e}")
-                    print(f"Content that failed to parse: {content}")
+                        logger.debug("Generated questions", count=len(questions_with_ids))
+                        return questions_with_ids
+                    except json.JSONDecodeError as e:
+                        logger.warning("Error parsing JSON from API response", error=str(e), content=content)
                     
-                    # Try to extract questions using regex as a fallback
-                    questions = []
-                    question_matches = re.finditer(r'"text":\s*"([^"]*)".*?"reference_answer":\s*"([^"]*)"', content, re.DOTALL)
+                        # Try to extract questions using regex as a fallback
+                        questions = []
+                        question_matches = re.finditer(r'"text":\s*"([^"]*)".*?"reference_answer":\s*"([^"]*)"', content, re.DOTALL)
                     
-                    for i, match in enumerate(question_matches):
-                        if i >= question_count:
-                            break
+                        for i, match in enumerate(question_matches):
+                            if i >= question_count:
+                                break
                         
-                        question_text = match.group(1)
-                        reference_answer = match.group(2)
-                        question_id = str(uuid.uuid4())
+                            question_text = match.group(1)
+                            reference_answer = match.group(2)
+                            question_id = str(uuid.uuid4())
                         
-                        questions.append({
-                            "id": question_id,
-                            "text": question_text,
-                            "reference_answer": reference_answer
-                        })
+                            questions.append({
+                                "id": question_id,
+                                "text": question_text,
+                                "reference_answer": reference_answer
+                            })
                     
-                    if questions:
-                        print(f"Extracted {len(questions)} questions using regex")
-                        return questions
+                        if questions:
+                            logger.debug("Extracted questions using regex", count=len(questions))
+                            return questions
                     
-                    # If all else fails, generate some generic questions
-                    return self._generate_generic_questions(jd_text, question_count)
+                        # If all else fails, generate some generic questions
+                        return self._generate_generic_questions(jd_text, question_count)
             
-            print("Invalid response format from API")
+            logger.warning("Invalid response format from API")
             return self._generate_generic_questions(jd_text, question_count)
         except Exception as e:
-            print(f"Error in generate_questions: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Error in generate_questions", exc_info=True, error=str(e))
             return self._generate_generic_questions(jd_text, question_count)
     
+    @traced("fallback.generic_questions")
     def _generate_generic_questions(self, jd_text: str, question_count: int) -> List[Dict[str, str]]:
         """Generate generic questions as a fallback"""
-        print("Generating generic questions as fallback")
-        
-        # Extract some keywords from the JD
-        jd_lower = jd_text.lower()
-        keywords = []
-        
-        # Check for common technologies and skills
-        tech_keywords = {
-            "python": "Python programming",
-            "javascript": "JavaScript",
-            "react": "React.js",
-            "node": "Node.js",
-            "api": "API development",
-            "database": "database design",
-            "cloud": "cloud services",
-            "agile": "Agile methodologies",
-            "test": "testing strategies",
-            "frontend": "frontend development",
-            "backend": "backend development"
-        }
+        logger.debug("Generating generic questions as fallback")
+        
+        if hasattr(self, 'metrics_service'):
+            self.metrics_service.record_fallback("generic_questions")
         
-        # Find matching keywords in the JD
-        for key, value in tech_keywords.items():
-            if key in jd_lower:
-                keywords.append(value)
+        # Find the skills and technologies the JD mentions, in one scan
+        keywords = SKILL_LEXICON.labels(jd_text)
         
         # If no keywords were found, use some defaults
         if not keywords:
@@ -703,16 +647,18 @@ class OpenAIService:
             }
         ]
         
-        # Generate questions based on the templates and keywords
+        # Generate questions based on the templates and keywords, each pair at most once;
+        # JDService drops near-duplicates of them with the rest of the batch
         questions = []
-        for i in range(question_count):
-            keyword = keywords[i % len(keywords)]
-            template = templates[i % len(templates)]
+        for keyword, template in cycle_pairs(keywords, templates):
+            if len(questions) >= question_count:
+                break
+            text = template["text"].format(keyword=keyword)
             question_id = str(uuid.uuid4())
             
             questions.append({
                 "id": question_id,
-                "text": template["text"].format(keyword=keyword),
+                "text": text,
                 "reference_answer": template["reference_answer"].format(keyword=keyword)
             })
         
@@ -722,91 +668,60 @@ class OpenAIService:
         """
         Evaluate a user's answer to an interview question
         Returns: (score, feedback, improvement_suggestions)
+        Raises when the API call fails or the response has no score, so the caller can fall back
         """
-        prompt = f"""
-        Evaluate this answer to an interview question.
-        
-        Question: {question_text}
-        
-        User's Answer: {user_answer}
-        
-        Reference Answer (what a good answer should cover): {reference_answer}
-        
-        Score the answer on a scale of 0-100 based on:
-        1. Relevance to the question
-        2. Completeness compared to the reference answer
-        3. Clarity and structure
-        4. Specific examples or details provided
-        
-        Return your evaluation in the following JSON format:
-        {{
-            "score": 0-100,
-            "feedback": "Brief feedback on the answer's strengths and weaknesses",
-            "improvement_suggestions": "Specific suggestions for improving the answer"
-        }}
-        
-        Be fair but thorough in your evaluation.
-        """
-        
-        messages = [
-            {"role": "system", "content": "You are an AI assistant that evaluates interview answers."},
-            {"role": "user", "content": prompt}
-        ]
-        
-        try:
-            print(f"Evaluating answer for question: {question_text[:50]}...")
-            
-            # Call the OpenAI API
-            response = await self._call_api(messages)
-            
-            if "choices" in response and len(response["choices"]) > 0:
-                content = response["choices"][0]["message"]["content"]
-                print(f"Raw content from API: {content[:200]}...")
-                
-                # Try to parse the JSON response
-                try:
-                    # Find JSON in the response (in case the model adds extra text)
-                    import re
-                    json_match = re.search(r'({.*})', content, re.DOTALL)
-                    if json_match:
-                        json_str = json_match.group(1)
-                        result = json.loads(json_str)
-                    else:
-                        # If no JSON pattern found, try parsing the whole content
-                        result = json.loads(content)
-                    
-                    # Extract the values
-                    score = float(result.get("score", 60.0))
-                    feedback = result.get("feedback", "")
-                    suggestions = result.get("improvement_suggestions", "")
-                    
-                    # Ensure score is between 0 and 100
-                    score = max(0, min(100, score))
-                    
-                    print(f"Evaluation result: Score={score}, Feedback={feedback[:50]}...")
-                    return (score, feedback, suggestions)
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing JSON from API response: {e}")
-                    print(f"Content that failed to parse: {content}")
-                    
-                    # Try to extract values using regex as a fallback
-                    score_match = re.search(r'"score":\s*(\d+(?:\.\d+)?)', content)
-                    score = float(score_match.group(1)) if score_match else 60.0
-                    
-                    feedback_match = re.search(r'"feedback":\s*"([^"]*)"', content)
-                    feedback = feedback_match.group(1) if feedback_match else "Your answer covers some key points."
-                    
-                    suggestions_match = re.search(r'"improvement_suggestions":\s*"([^"]*)"', content)
-                    suggestions = suggestions_match.group(1) if suggestions_match else "Consider adding more specific examples."
-                    
-                    print(f"Extracted using regex: Score={score}, Feedback={feedback[:50]}...")
-                    return (score, feedback, suggestions)
-            
-            print("Invalid response format from API")
-            return (60.0, "Your answer covers some key points.", "Consider adding more specific examples.")
-        except Exception as e:
-            print(f"Error in evaluate_answer: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return (60.0, "We encountered an issue while evaluating your answer, but it appears to cover some key points.", 
-                    "Consider adding more specific examples and technical details to strengthen your answer.") 
\ No newline at end of file
+        messages, max_tokens = self._budgeted_prompt("evaluate_answer", question_text=question_text, user_answer=user_answer,
+                                                   reference_answer=reference_answer)
+        
+        logger.debug("Evaluating answer", question=question_text)
+        
+        # Call the OpenAI API
+        response = await self._call_api(messages, max_tokens=max_tokens)
+        
+        if not response.get("choices"):
+            raise ValueError("Invalid response format from API")
+        
+        content = response["choices"][0]["message"]["content"] or ""
+        logger.debug("Raw content from API", content=content)
+        
+        with timed("parse"):
+            # Try to parse the JSON response
+            try:
+                # Find JSON in the response (in case the model adds extra text)
+                json_match = re.search(r'({.*})', content, re.DOTALL)
+                if json_match:
+                    json_str = json_match.group(1)
+                    result = json.loads(json_str)
+                else:
+                    # If no JSON pattern found, try parsing the whole content
+                    result = json.loads(content)
+            
+                # Extract the values
+                if "score" not in result:
+                    raise ValueError("No score in the evaluation response")
+                score = float(result["score"])
+                feedback = result.get("feedback", "")
+                suggestions = result.get("improvement_suggestions", "")
+            
+                # Ensure score is between 0 and 100
+                score = max(0, min(100, score))
+            
+                logger.debug("Evaluation result", score=score, feedback=feedback)
+                return (score, feedback, suggestions)
+            except json.JSONDecodeError as e:
+                logger.warning("Error parsing JSON from API response", error=str(e), content=content)
+            
+                # Try to extract values using regex as a fallback
+                score_match = re.search(r'"score":\s*(\d+(?:\.\d+)?)', content)
+                if not score_match:
+                    raise ValueError("No score in the evaluation response")
+                score = float(score_match.group(1))
+            
+                feedback_match = re.search(r'"feedback":\s*"([^"]*)"', content)
+                feedback = feedback_match.group(1) if feedback_match else "Your answer covers some key points."
+            
+                suggestions_match = re.search(r'"improvement_suggestions":\s*"([^"]*)"', content)
+                suggestions = suggestions_match.group(1) if suggestions_match else "Consider adding more specific examples."
+            
+                logger.debug("Extracted using regex", score=score, feedback=feedback)
+                return (score, feedback, suggestions)
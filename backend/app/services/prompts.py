@@ -0,0 +1,395 @@
+import math
+import os
+import re
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+# Characters per token of English prose for the usual BPE tokenizers
+CHARS_PER_TOKEN = 4
+# Tokens per English word for the same tokenizers
+TOKENS_PER_WORD = 1.4
+# Answer length when the client gives no word limit
+DEFAULT_ANSWER_WORD_LIMIT = 100
+# Completion tokens allowed beyond the word limit, so the model can finish its sentence
+ANSWER_TOKEN_MARGIN = 20
+# Largest max_tokens (output token limit) of the known models, matched by the longest model name prefix
+MODEL_COMPLETION_LIMITS = {
+    "deepseek-chat": 8192,
+    "deepseek-reasoner": 32768,
+    "gpt-3.5-turbo": 4096,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 4096,
+    "gpt-4o": 16384,
+    "gpt-4o-mini": 16384,
+    "gpt-4.1": 32768,
+}
+# Output token limit assumed for other models
+DEFAULT_COMPLETION_LIMIT = 4096
+
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text, without a tokenizer"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def model_completion_limit(model: str) -> int:
+    """Largest max_tokens the model accepts"""
+    matches = [name for name in MODEL_COMPLETION_LIMITS if (model or "").startswith(name)]
+    return MODEL_COMPLETION_LIMITS[max(matches, key=len)] if matches else DEFAULT_COMPLETION_LIMIT
+
+def answer_max_tokens(word_limit: int) -> int:
+    """Completion token cap for an answer of at most word_limit words"""
+    return math.ceil(word_limit * TOKENS_PER_WORD) + ANSWER_TOKEN_MARGIN
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """Cut the text at the last sentence or line break within max_chars"""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    boundary = max(cut.rfind(". "), cut.rfind("; "), cut.rfind("\n"))
+    return cut[:boundary + 1].rstrip() if boundary > max_chars // 2 else cut
+
+def compact_prompt(text: str) -> str:
+    """
+    Strip the source-code indentation and trailing spaces that triple-quoted prompts
+    carry on every line, and collapse runs of blank lines to one
+    """
+    lines = [line.strip() for line in text.strip().splitlines()]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines))
+
+def compact_messages(messages: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], int]:
+    """The messages with compacted contents, and the estimated prompt tokens saved"""
+    compacted = [{**m, "content": compact_prompt(m.get("content") or "")} for m in messages]
+    saved = sum(estimate_tokens(m.get("content") or "") for m in messages) - \
+        sum(estimate_tokens(m["content"]) for m in compacted)
+    return compacted, saved
+
+
+class PromptTemplate:
+    """
+    One operation's prompt, laid out for provider-side prefix caching.
+
+    DeepSeek's context caching and OpenAI's prompt caching both reuse the
+    longest prompt prefix they have seen before. The system message and the
+    static instructions therefore come first and are byte-identical on every
+    call (they are compacted once, here); the variable fields (the JD, the
+    question, the answers) follow at the end of the user message.
+
+    trim names the fields that may be shortened when the prompt exceeds its
+    token budget.
+    """
+    def __init__(self, operation: str, system: str, instructions: str, variables: str,
+                 trim: Sequence[str] = ()):
+        self.operation = operation
+        self.system = compact_prompt(system)
+        self.instructions = compact_prompt(instructions)
+        # str.format template of the variable tail
+        self.variables = variables
+        self.trim = tuple(trim)
+
+    def render(self, **fields) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.instructions + "\n\n" + self.variables.format(**fields)}
+        ]
+
+    def estimate_tokens(self, **fields) -> int:
+        """Estimated prompt tokens of the rendered messages"""
+        return sum(estimate_tokens(m["content"]) for m in self.render(**fields))
+
+    def matches(self, messages: List[Dict[str, str]]) -> bool:
+        """Whether the messages were rendered from this template"""
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user = next((m["content"] for m in messages if m["role"] == "user"), "")
+        return system == self.system and user.startswith(self.instructions)
+
+
+class PromptRegistry:
+    """The prompt templates of each prompt family (the provider whose wording they use)"""
+    def __init__(self):
+        self._templates = {}
+
+    def register(self, family: str, template: PromptTemplate):
+        self._templates[(family, template.operation)] = template
+
+    def get(self, family: str, operation: str) -> PromptTemplate:
+        return self._templates[(family, operation)]
+
+    def render(self, family: str, operation: str, **fields) -> List[Dict[str, str]]:
+        return self.get(family, operation).render(**fields)
+
+    def operation_of(self, messages: List[Dict[str, str]]) -> Optional[str]:
+        """The operation of a registered template the messages were rendered from"""
+        for template in self._templates.values():
+            if template.matches(messages):
+                return template.operation
+        return None
+
+    def prefix_tokens(self) -> Dict[str, Dict[str, int]]:
+        """Estimated tokens of each template's static prefix, by family and operation"""
+        sizes = {}
+        for (family, operation), template in self._templates.items():
+            sizes.setdefault(family, {})[operation] = \
+                estimate_tokens(template.system) + estimate_tokens(template.instructions)
+        return sizes
+
+
+PROMPTS = PromptRegistry()
+
+# DeepSeekService (and ReplayService, which replays its recordings)
+PROMPTS.register("deepseek", PromptTemplate(
+    "analyze_jd",
+    system="You are an AI assistant that analyzes job descriptions.",
+    instructions="""
+        Analyze the text at the end of this message and determine if it constitutes a professional job description.
+        Consider factors like presence of job responsibilities, required qualifications, and company information.
+        Return confidence percentage (0-100%) and a concise 3-sentence overview highlighting key aspects if it is a JD.
+
+        Return your response in JSON format with the following structure:
+        {
+            "is_valid_jd": true/false,
+            "confidence": 0-100,
+            "overview": "3-sentence overview if valid"
+        }
+        """,
+    variables="Text to analyze:\n{jd_text}",
+    trim=("jd_text",)))
+
+PROMPTS.register("deepseek", PromptTemplate(
+    "generate_questions",
+    system="You are an AI assistant that helps generate relevant interview questions based on job descriptions.",
+    instructions="""
+        Based on the job description at the end of this message, generate relevant interview questions
+        that would help assess a candidate's fit for this role. For each question, also provide a
+        reference answer that would be considered correct.
+
+        The questions should:
+        1. Be directly related to the specific skills, technologies, and requirements mentioned in the job description
+        2. Cover both technical skills and soft skills required for the role
+        3. Include questions about specific technologies mentioned in the JD
+        4. Include questions about relevant experience for the role
+        5. Be specific and tailored to this exact job, not generic interview questions
+
+        Return your response in JSON format with the following structure:
+        {
+            "questions": [
+                {
+                    "text": "question 1",
+                    "reference_answer": "reference answer 1"
+                },
+                {
+                    "text": "question 2",
+                    "reference_answer": "reference answer 2"
+                },
+                ...
+            ]
+        }
+
+        Important: Make sure each question is directly relevant to the specific job description provided.
+        """,
+    variables="Important: Please generate exactly {question_count} questions, no more and no less.\n\n"
+              "Job Description:\n{jd_text}",
+    trim=("jd_text",)))
+
+PROMPTS.register("deepseek", PromptTemplate(
+    "evaluate_answer",
+    system="You are an AI assistant that evaluates interview answers.",
+    instructions="""
+        Evaluate the user's answer to the interview question at the end of this message. Compare it semantically with
+        the reference answer and provide a score from 0 to 100, feedback, and suggestions for improvement.
+
+        Return your response in JSON format with the following structure:
+        {
+            "score": 0-100,
+            "feedback": "detailed feedback on the answer",
+            "improvement_suggestions": "suggestions for improvement"
+        }
+        """,
+    variables="Question: {question}\nReference Answer: {reference_answer}\nUser Answer: {user_answer}",
+    trim=("user_answer", "reference_answer")))
+
+PROMPTS.register("deepseek", PromptTemplate(
+    "generate_answer",
+    system="You are an AI assistant that helps job candidates prepare for interviews by generating "
+           "high-quality answers to interview questions.",
+    instructions="""
+        Please provide a comprehensive and well-structured answer to the interview question at the end of this message.
+
+        Your answer should:
+        - Stay within the word limit given with the question
+        - Include specific examples where appropriate
+        - Demonstrate technical knowledge and expertise
+        - Be structured in a clear and logical way
+        """,
+    variables="Word limit: {word_limit} words\n\nQuestion: {question_text}",
+    trim=("question_text",)))
+
+# OpenAIService
+PROMPTS.register("openai", PromptTemplate(
+    "analyze_jd",
+    system="You are an AI assistant that analyzes job descriptions.",
+    instructions="""
+        Please analyze if the text at the end of this message is a job description.
+
+        Return your response in the following JSON format:
+        {
+            "is_valid_jd": true/false,
+            "confidence": 0-100,
+            "overview": "Brief overview of the job description if valid"
+        }
+
+        If the text is not a job description or is too short/incomplete, set is_valid_jd to false and provide a low confidence score.
+        """,
+    variables="Text to analyze:\n{jd_text}",
+    trim=("jd_text",)))
+
+PROMPTS.register("openai", PromptTemplate(
+    "generate_questions",
+    system="You are an AI assistant that helps generate relevant interview questions based on job descriptions.",
+    instructions="""
+        Generate interview questions based on the job description at the end of this message.
+
+        For each question, also provide a reference answer that would be considered excellent.
+
+        Return your response in the following JSON format:
+        {
+            "questions": [
+                {
+                    "text": "Question 1",
+                    "reference_answer": "Reference answer for question 1"
+                },
+                ...
+            ]
+        }
+
+        Make sure the questions are:
+        1. Relevant to the job description
+        2. A mix of technical and behavioral questions
+        3. Specific enough to assess the candidate's skills and experience
+        4. Open-ended to encourage detailed responses
+
+        The reference answers should:
+        1. Be comprehensive and detailed
+        2. Include specific examples or approaches
+        3. Highlight key points that would make an answer excellent
+        """,
+    variables="Please generate exactly {question_count} questions.\n\nJob Description:\n{jd_text}",
+    trim=("jd_text",)))
+
+PROMPTS.register("openai", PromptTemplate(
+    "evaluate_answer",
+    system="You are an AI assistant that evaluates interview answers.",
+    instructions="""
+        Evaluate the answer to an interview question at the end of this message.
+
+        Score the answer on a scale of 0-100 based on:
+        1. Relevance to the question
+        2. Completeness compared to the reference answer
+        3. Clarity and structure
+        4. Specific examples or details provided
+
+        Return your evaluation in the following JSON format:
+        {
+            "score": 0-100,
+            "feedback": "Brief feedback on the answer's strengths and weaknesses",
+            "improvement_suggestions": "Specific suggestions for improving the answer"
+        }
+
+        Be fair but thorough in your evaluation.
+        """,
+    variables="Question: {question_text}\n\nUser's Answer: {user_answer}\n\n"
+              "Reference Answer (what a good answer should cover): {reference_answer}",
+    trim=("user_answer", "reference_answer")))
+
+PROMPTS.register("openai", PromptTemplate(
+    "generate_answer",
+    system="You are an AI assistant helping prepare for job interviews.",
+    instructions="""
+        Please provide a comprehensive and well-structured answer to the interview question at the end of this message.
+
+        Your answer should:
+        1. Stay within the word limit given with the question
+        2. Include specific examples or approaches
+        3. Demonstrate expertise in the subject
+        4. Be structured in a clear and logical way
+        """,
+    variables="Word limit: {word_limit} words\n\nQuestion: {question_text}",
+    trim=("question_text",)))
+
+
+class TokenBudget:
+    """
+    Per-operation token budgets for provider calls.
+
+    Completions are capped with max_tokens, so a runaway completion ends early
+    instead of running into the request timeout: a fixed cap for analyze_jd and
+    evaluate_answer, a base plus an allowance per question for
+    generate_questions, and the word limit for generate_answer, each at most the
+    model's output limit (see LLMProvider.completion_limit). Prompts are held
+    to prompt_tokens: a template's trimmable fields are cut at a sentence
+    boundary until the estimated prompt fits, but never below min_field_tokens,
+    so a budget smaller than the template itself does not empty the inputs.
+    """
+    def __init__(self):
+        self.prompt_tokens = int(os.getenv("PROMPT_TOKEN_BUDGET", "4000"))
+        self.min_field_tokens = int(os.getenv("PROMPT_MIN_FIELD_TOKENS", "250"))
+        self.completion_tokens = {
+            "analyze_jd": int(os.getenv("MAX_TOKENS_ANALYZE_JD", "400")),
+            "evaluate_answer": int(os.getenv("MAX_TOKENS_EVALUATE_ANSWER", "600")),
+            # Base of generate_questions, plus tokens_per_question per question
+            "generate_questions": int(os.getenv("MAX_TOKENS_GENERATE_QUESTIONS", "200")),
+        }
+        self.tokens_per_question = int(os.getenv("MAX_TOKENS_PER_QUESTION", "250"))
+
+    def max_tokens(self, operation: str, fields: Dict[str, Any],
+                   limit: int = DEFAULT_COMPLETION_LIMIT) -> Optional[int]:
+        """
+        Completion token cap of a call, at most the model's limit; None when the
+        operation has no budget
+        """
+        if operation == "generate_answer":
+            tokens = answer_max_tokens(fields.get("word_limit") or DEFAULT_ANSWER_WORD_LIMIT)
+        elif operation == "generate_questions":
+            tokens = self.completion_tokens[operation] + self.tokens_per_question * fields["question_count"]
+        else:
+            tokens = self.completion_tokens.get(operation)
+        return min(tokens, limit) if tokens else None
+
+    def questions_per_call(self, limit: int = DEFAULT_COMPLETION_LIMIT) -> int:
+        """How many questions one generate_questions completion of at most limit tokens holds"""
+        return max(1, (limit - self.completion_tokens["generate_questions"]) // self.tokens_per_question)
+
+    def fit(self, template: PromptTemplate, fields: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        """The fields with the trimmable ones cut so the prompt fits the budget, and the tokens trimmed"""
+        over = template.estimate_tokens(**fields) - self.prompt_tokens
+        if over <= 0:
+            return fields, 0
+
+        # Cap the trimmable fields at a common length, so the longest are cut first
+        # and a long reference answer does not wipe out the user's answer
+        sizes = {name: estimate_tokens(fields.get(name) or "") for name in template.trim}
+        keep = max(sum(sizes.values()) - over, 0)
+        cap = 0
+        for count, size in enumerate(sorted(sizes.values())):
+            remaining = len(sizes) - count
+            if size * remaining >= keep:
+                cap = keep // remaining
+                break
+            keep -= size
+        # The prompt may stay over budget rather than lose its inputs
+        cap = max(cap, self.min_field_tokens)
+
+        fields = dict(fields)
+        trimmed = 0
+        for name, size in sizes.items():
+            if size > cap:
+                fields[name] = truncate_text(fields[name], cap * CHARS_PER_TOKEN)
+                trimmed += size - estimate_tokens(fields[name])
+        return fields, trimmed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "min_field_tokens": self.min_field_tokens,
+            "completion_tokens": dict(self.completion_tokens),
+            "tokens_per_question": self.tokens_per_question
+        }
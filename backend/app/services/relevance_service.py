@@ -0,0 +1,206 @@
+import math
+import os
+import re
+import string
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from app.services.skill_lexicon import SKILL_LEXICON
+
+# Common English and job-posting words that say nothing about the role's subject matter
+STOP_WORDS = frozenset([
+    "the", "and", "that", "have", "for", "not", "with", "you", "this", "but",
+    "his", "from", "they", "she", "will", "would", "there", "their", "what",
+    "about", "which", "when", "make", "like", "time", "just", "know", "take",
+    "person", "into", "year", "your", "good", "some", "could", "them", "see",
+    "other", "than", "then", "now", "look", "only", "come", "its", "over",
+    "think", "also", "back", "after", "use", "two", "how", "our", "work",
+    "first", "well", "way", "even", "new", "want", "because", "any", "these",
+    "give", "day", "most", "can", "are", "is", "be", "has", "was", "were",
+    "had", "do", "does", "did", "doing", "done", "should", "must", "may",
+    "might", "shall", "experience", "role", "job", "candidate", "skill", "ability",
+    "team", "project", "develop", "create", "build", "implement", "design",
+    "manage", "lead", "communicate", "collaborate", "solve", "problem",
+    "solution", "requirement", "responsibility", "qualification",
+    "a", "an", "as", "at", "by", "if", "in", "it", "of", "on", "or", "so", "to", "up", "we",
+    "all", "who", "why", "one", "more", "each", "such", "own", "been", "being", "very",
+    "handle", "ensure", "support", "provide", "strong", "excellent", "include", "including",
+    "improve", "help", "plus", "preferred", "required", "knowledge", "understanding", "using", "working"
+])
+
+# Okapi BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Words ending in "s" that are not plurals
+SINGULAR_WORDS = frozenset([
+    "kubernetes", "jenkins", "pandas", "postgres", "windows", "devops", "analytics", "statistics",
+    "economics", "graphics", "physics", "sales", "news", "series", "redis", "ios", "js"
+])
+
+# Words start with a letter and may contain digits, '+' and '#' (e.g. "c++", "c#", "s3")
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9+#]*")
+
+# ASCII punctuation other than '+' and '#' separates words
+_SEPARATORS = str.maketrans({c: " " for c in string.punctuation if c not in "+#"})
+
+# Whitespace-separated chunk -> its normalized terms, shared by all engines. Splitting on
+# whitespace and running the pattern once per distinct chunk is several times faster than
+# running it over the whole text.
+_NORMALIZED = {}
+_NORMALIZED_MAX_SIZE = 50_000
+
+def _normalize(chunk: str) -> Tuple[str, ...]:
+    terms = []
+    for token in TOKEN_PATTERN.findall(chunk):
+        if len(token) > 3 and token[-1] == "s" and token not in SINGULAR_WORDS:
+            if token.endswith("ies"):
+                token = token[:-3] + "y"
+            elif token.endswith("sses"):
+                token = token[:-2]
+            elif not token.endswith(("ss", "us", "sis")):
+                token = token[:-1]
+        if token not in STOP_WORDS:
+            terms.append(token)
+    return tuple(terms)
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens without stop words, with plurals folded ("apis" -> "api",
+    "libraries" -> "library").
+    Only whole words match, so "api" never matches "rapid".
+    """
+    if len(_NORMALIZED) > _NORMALIZED_MAX_SIZE:
+        _NORMALIZED.clear()
+    normalized = _NORMALIZED
+    terms = []
+    for chunk in text.lower().translate(_SEPARATORS).split():
+        chunk_terms = normalized.get(chunk)
+        if chunk_terms is None:
+            chunk_terms = normalized[chunk] = _normalize(chunk)
+        terms.extend(chunk_terms)
+    return terms
+
+def term_counts(text: str) -> Dict[str, int]:
+    """Term frequencies of tokenize(text); repeated chunks are counted before they are normalized"""
+    if len(_NORMALIZED) > _NORMALIZED_MAX_SIZE:
+        _NORMALIZED.clear()
+    normalized = _NORMALIZED
+    counts = {}
+    for chunk, occurrences in Counter(text.lower().translate(_SEPARATORS).split()).items():
+        chunk_terms = normalized.get(chunk)
+        if chunk_terms is None:
+            chunk_terms = normalized[chunk] = _normalize(chunk)
+        for term in chunk_terms:
+            counts[term] = counts.get(term, 0) + occurrences
+    return counts
+
+
+class RelevanceEngine:
+    """
+    Scores generated questions against one job description.
+
+    The JD is tokenized once into its term vocabulary. A batch of questions is
+    scored together: each question (text and reference answer) becomes a sparse
+    term-count vector, terms are weighted by sublinear TF-IDF with document
+    frequencies taken over the JD and the batch (so phrasing every question
+    shares counts for little), and the score is the share of the question's
+    weight on JD terms. Unlike a cosine with the JD vector, the score does not
+    shrink as the JD gets longer. Questions scoring at least `threshold` are
+    relevant. The names and topics of the lexicon skills the JD mentions count
+    as JD terms too, so template and mock questions about "SQL" or "database"
+    match a JD that only names PostgreSQL.
+
+    rank_questions orders the relevant questions by Okapi BM25, with the JD
+    terms as the query, for keeping the best N of an over-generated batch.
+    """
+    def __init__(self, jd_text: str, threshold: Optional[float] = None):
+        self.threshold = threshold if threshold is not None else float(os.getenv("RELEVANCE_THRESHOLD", "0.08"))
+        self.jd_counts = term_counts(jd_text)
+        # Skill names and topics the JD doesn't spell out (e.g. "sql", "database" for PostgreSQL)
+        self.topic_terms = frozenset(tokenize(" ".join(SKILL_LEXICON.topic_terms(jd_text)))) - self.jd_counts.keys()
+
+    @property
+    def key_terms(self) -> set:
+        """The JD vocabulary"""
+        return set(self.jd_counts)
+
+    def score_questions(self, questions: List[Dict[str, str]]) -> List[float]:
+        """Relevance score (0 to 1) of each question, in question order"""
+        return self._relevance_scores(self._documents(questions))
+
+    def bm25_scores(self, questions: List[Dict[str, str]]) -> List[float]:
+        """BM25 score of each question for the JD as the query, in question order"""
+        return self._bm25_scores(self._documents(questions))
+
+    def rank_questions(self, questions: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """The relevant questions, best BM25 match with the JD first"""
+        documents = self._documents(questions)
+        relevance_scores = self._relevance_scores(documents)
+        bm25_scores = self._bm25_scores(documents)
+        ranked = sorted(range(len(questions)), key=lambda i: bm25_scores[i], reverse=True)
+        return [questions[i] for i in ranked if relevance_scores[i] >= self.threshold]
+
+    def _documents(self, questions: List[Dict[str, str]]) -> List[Dict[str, int]]:
+        return [term_counts(f"{q.get('text', '')} {q.get('reference_answer', '')}") for q in questions]
+
+    def _relevance_scores(self, documents: List[Dict[str, int]]) -> List[float]:
+        # Document frequencies over the JD and the whole batch
+        document_frequency = Counter(self.jd_counts.keys())
+        for counts in documents:
+            document_frequency.update(counts.keys())
+        total = len(documents) + 1
+        idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+        jd_terms = self.jd_counts
+        topic_terms = self.topic_terms
+        scores = []
+        for counts in documents:
+            total_weight = 0.0
+            jd_weight = 0.0
+            for term, count in counts.items():
+                weight = (1 + math.log(count) if count > 1 else 1.0) * idf[term]
+                total_weight += weight
+                if term in jd_terms or term in topic_terms:
+                    jd_weight += weight
+            scores.append(jd_weight / total_weight if total_weight else 0.0)
+        return scores
+
+    def _bm25_scores(self, documents: List[Dict[str, int]], k1: float = BM25_K1, b: float = BM25_B) -> List[float]:
+        # Okapi BM25 over the batch, with the JD terms as the query (repeated JD terms weigh more)
+        if not documents:
+            return []
+        lengths = [sum(counts.values()) for counts in documents]
+        average_length = sum(lengths) / len(documents) or 1.0
+        document_frequency = Counter()
+        for counts in documents:
+            document_frequency.update(term for term in counts if term in self.jd_counts)
+        total = len(documents)
+        query_weight = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5)) * (1 + math.log(self.jd_counts[term]))
+            for term, df in document_frequency.items()
+        }
+
+        scores = []
+        for counts, length in zip(documents, lengths):
+            norm = k1 * (1 - b + b * length / average_length)
+            score = 0.0
+            for term, count in counts.items():
+                weight = query_weight.get(term)
+                if weight is not None:
+                    score += weight * count * (k1 + 1) / (count + norm)
+            scores.append(score)
+        return scores
+
+    def filter_questions(self, questions: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """The questions scoring at or above the threshold, in order"""
+        scores = self.score_questions(questions)
+        return [q for q, score in zip(questions, scores) if score >= self.threshold]
+
+    def matched_terms(self, question: Dict[str, str]) -> set:
+        """JD terms (and skill names and topics) that appear in the question or its reference answer"""
+        counts = term_counts(f"{question.get('text', '')} {question.get('reference_answer', '')}")
+        return {term for term in counts if term in self.jd_counts or term in self.topic_terms}
+
+    def top_terms(self, limit: int = 20) -> List[str]:
+        """The most frequent JD terms"""
+        return sorted(self.jd_counts, key=self.jd_counts.get, reverse=True)[:limit]
@@ -0,0 +1,147 @@
+import asyncio
+import glob
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional
+
+from app.services.deepseek_service import DeepSeekService, DeepSeekAPIError
+from app.services.prompts import TokenBudget, model_completion_limit
+from app.services.response_cache import fingerprint_messages
+from app.services.structured_logger import get_logger
+from app.services.timing_service import timed
+from app.services.tracing_service import traced, set_span_attributes
+
+logger = get_logger("replay_service")
+
+class RecordedCall:
+    """One recorded provider call from the JSON logs"""
+    def __init__(self, entry: Dict[str, Any]):
+        self.messages = entry["request"]["messages"]
+        self.operation = entry.get("operation", "unknown")
+        self.response = entry.get("response")
+        self.error = entry.get("error")
+        self.duration_ms = entry.get("duration_ms") or 0.0
+        self.timestamp = entry.get("timestamp")
+
+
+class ReplayService(DeepSeekService):
+    """
+    LLM provider that serves recorded responses from the provider JSON logs.
+
+    Requests are matched by message fingerprint. Requests whose prompt changed
+    since the recording get the next recorded response for the same operation,
+    in recording order, so replays stay deterministic. Recorded latencies are
+    replayed scaled by time_scale (1.0 original, 0.1 ten times faster, 0 none),
+    and recorded failures are raised again so fallback paths are exercised.
+
+    Response parsing is inherited from DeepSeekService, whose response format
+    both providers' logs share.
+    """
+    provider = "replay"
+
+    def __init__(self, source: Optional[str] = None, log_dir: Optional[str] = None,
+                 dates: Optional[List[str]] = None, time_scale: Optional[float] = None):
+        # No DeepSeekService.__init__: replays need neither an API key nor the API URL
+        self.api_key = None
+        self.use_mock = False
+        self.model = "replay"
+        self.operation_models = {}
+        self.source = source or os.getenv("REPLAY_SOURCE", "deepseek")
+        self.log_dir = log_dir or os.getenv("REPLAY_LOG_DIR", os.path.join(os.getcwd(), "logs", "json"))
+        if dates is None:
+            dates = [d.strip() for d in os.getenv("REPLAY_DATES", "").split(",") if d.strip()]
+        self.dates = [d.replace("-", "") for d in dates]
+        self.time_scale = time_scale if time_scale is not None else float(os.getenv("REPLAY_TIME_SCALE", "1.0"))
+        self.token_budget = TokenBudget()
+        # Batch question generations as the recorded provider's default model did
+        self.max_completion_tokens = model_completion_limit(
+            os.getenv(f"{self.source.upper()}_MODEL", "gpt-4o" if self.source == "openai" else "deepseek-chat"))
+
+        # All recordings in order, by fingerprint, and by operation for requests that don't match
+        self.recordings = []
+        self.by_fingerprint = {}
+        self.by_operation = {}
+        self._fingerprint_cursor = {}
+        self._operation_cursor = {}
+        self.stats = {"exact": 0, "operation": 0, "miss": 0}
+        self.load()
+
+    def load(self) -> int:
+        """Load the recorded calls; entries without request messages (or mock calls) are skipped"""
+        pattern = os.path.join(self.log_dir, f"{self.source}_api_*.json")
+        paths = sorted(glob.glob(pattern))
+        if self.dates:
+            paths = [p for p in paths if any(p.endswith(f"_{date}.json") for date in self.dates)]
+
+        entries = []
+        for path in paths:
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if not (entry.get("request") or {}).get("messages") or entry.get("is_mock"):
+                        continue
+                    if not entry.get("response") and not entry.get("error"):
+                        continue
+                    entries.append(RecordedCall(entry))
+
+        entries.sort(key=lambda call: str(call.timestamp))
+        for call in entries:
+            self.recordings.append(call)
+            self.by_fingerprint.setdefault(fingerprint_messages(call.messages), []).append(call)
+            self.by_operation.setdefault(call.operation, []).append(call)
+
+        logger.info("Loaded recorded LLM calls", source=self.source, files=len(paths), calls=len(entries),
+                    fingerprints=len(self.by_fingerprint))
+        return len(entries)
+
+    def lookup(self, messages: List[Dict[str, str]]) -> Optional[RecordedCall]:
+        """Find the recording for a request: exact fingerprint first, then by operation"""
+        key = fingerprint_messages(messages)
+        recordings = self.by_fingerprint.get(key)
+        if recordings:
+            self.stats["exact"] += 1
+            return self._next(recordings, self._fingerprint_cursor, key)
+
+        operation = self._determine_operation(messages)
+        recordings = self.by_operation.get(operation)
+        if recordings:
+            self.stats["operation"] += 1
+            return self._next(recordings, self._operation_cursor, operation)
+
+        self.stats["miss"] += 1
+        return None
+
+    def _next(self, recordings: List[RecordedCall], cursors: Dict[str, int], key: str) -> RecordedCall:
+        """Serve recordings of the same key in recording order, cycling when they run out"""
+        index = cursors.get(key, 0)
+        cursors[key] = index + 1
+        return recordings[index % len(recordings)]
+
+    @traced("replay.chat_completion", kind="CLIENT")
+    async def _call_api(self, messages: List[Dict[str, str]], temperature: float = 0.7,
+                        max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        messages = self._compact_messages(messages)
+        recorded = self.lookup(messages)
+        start_time = time.perf_counter()
+
+        if recorded is None:
+            error = "No recorded response for this request"
+            self._log_llm_call(messages, temperature, error=error, duration_ms=0.0)
+            raise DeepSeekAPIError(error)
+
+        set_span_attributes(**{"replay.recorded_duration_ms": recorded.duration_ms})
+        with timed("llm"):
+            if self.time_scale > 0 and recorded.duration_ms:
+                await asyncio.sleep(recorded.duration_ms * self.time_scale / 1000)
+        duration_ms = (time.perf_counter() - start_time) * 1000
+
+        if recorded.error or not recorded.response:
+            self._log_llm_call(messages, temperature, error=recorded.error, duration_ms=duration_ms)
+            raise DeepSeekAPIError(f"Replayed error: {recorded.error}")
+
+        self._log_llm_call(messages, temperature, response_data=recorded.response, duration_ms=duration_ms)
+        return recorded.response
@@ -0,0 +1,161 @@
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from app.services.logging_service import extract_finish_reason
+from app.services.prompts import compact_prompt
+
+# Operations whose responses are cached by default. generate_questions and generate_answer
+# are sampled at higher temperatures, so asking again should give a new response
+DEFAULT_CACHED_OPERATIONS = ("analyze_jd", "evaluate_answer")
+
+def fingerprint_messages(messages: List[Dict[str, str]]) -> str:
+    """
+    Stable fingerprint of a chat request (roles and compacted contents), equal for
+    prompts logged before and after compaction
+    """
+    canonical = json.dumps([[m.get("role", ""), compact_prompt(m.get("content") or "")] for m in messages])
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    In-memory LRU cache of successful LLM responses, keyed by model and prompt.
+
+    Only the operations in `operations` are cached, and responses cut off by
+    max_tokens never are. Entries expire after ttl_hours. The temperature is not
+    part of the key, which is why sampled operations are left out. The cache is
+    only touched from the event loop, so it takes no lock.
+    """
+    def __init__(self, max_entries: int = 1000, ttl_hours: float = 24.0,
+                 operations: Optional[Iterable[str]] = None):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_hours * 3600
+        self.operations = frozenset(operations if operations is not None else DEFAULT_CACHED_OPERATIONS)
+        # key -> (response, stored_at epoch seconds), least recently used first
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _key(self, model: str, messages: List[Dict[str, str]]) -> str:
+        return f"{model}:{fingerprint_messages(messages)}"
+
+    def cacheable(self, operation: str, response: Optional[Dict[str, Any]] = None) -> bool:
+        """Whether the operation's responses (and this response, if given) are cached"""
+        if operation not in self.operations:
+            return False
+        return response is None or extract_finish_reason(response) != "length"
+
+    def get(self, operation: str, model: str, messages: List[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+        if not self.cacheable(operation):
+            return None
+        key = self._key(model, messages)
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry[1] > self.ttl_s:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, operation: str, model: str, messages: List[Dict[str, str]], response: Dict[str, Any],
+            stored_at: Optional[float] = None, replace: bool = True):
+        """Store a cacheable response; with replace=False an existing (e.g. live) entry is kept"""
+        if not self.cacheable(operation, response):
+            return
+        key = self._key(model, messages)
+        if key in self._entries and not replace:
+            return
+        self._entries[key] = (response, stored_at or time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "operations": sorted(self.operations),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+def read_cacheable_calls(log_dir: str, provider: str, max_entries: int, max_age_hours: float,
+                         operations: Iterable[str] = DEFAULT_CACHED_OPERATIONS
+                         ) -> Tuple[List[Tuple[str, str, List[Dict[str, str]], Dict[str, Any], float]], int]:
+    """
+    Read the newest successful calls from the provider's JSON logs ({provider}_api_YYYYMMDD.json).
+
+    Mock calls, errors, cache hits, other operations than `operations`, completions
+    cut off by max_tokens and entries older than max_age_hours are skipped.
+    Returns up to max_entries (operation, model, messages, response, timestamp)
+    tuples, oldest first, and the number of log lines scanned. Does blocking file I/O.
+    """
+    operations = frozenset(operations)
+    cutoff = datetime.now() - timedelta(hours=max_age_hours)
+    # Daily segments are named by date, so older segments are skipped without opening them
+    paths = [
+        path for path in sorted(glob.glob(os.path.join(log_dir, f"{provider}_api_*.json")), reverse=True)
+        if os.path.basename(path)[len(provider) + 5:-5] >= cutoff.strftime("%Y%m%d")
+    ]
+
+    calls = []
+    scanned = 0
+    for path in paths:
+        with open(path, "r") as f:
+            lines = f.readlines()
+        # Newest entries are at the end of each segment
+        for line in reversed(lines):
+            scanned += 1
+            try:
+                entry = json.loads(line)
+                timestamp = datetime.fromisoformat(entry["timestamp"])
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                continue
+            if timestamp < cutoff:
+                continue
+            if entry.get("error") or entry.get("is_mock") or entry.get("cache_hit"):
+                continue
+            if entry.get("operation") not in operations:
+                continue
+            messages = (entry.get("request") or {}).get("messages")
+            response = entry.get("response")
+            if not messages or not response or not entry.get("model"):
+                continue
+            if extract_finish_reason(response) == "length":
+                continue
+            calls.append((entry["operation"], entry["model"], messages, response, timestamp.timestamp()))
+            if len(calls) >= max_entries:
+                return calls[::-1], scanned
+    return calls[::-1], scanned
+
+async def warm_cache(cache: LLMResponseCache, log_dir: str, provider: str, max_entries: int,
+                     max_age_hours: float) -> Dict[str, Any]:
+    """Fill the cache from the provider's recent JSON logs without replacing live entries"""
+    start_time = time.perf_counter()
+    # The logs are read in a worker thread; the cache itself is only filled on the event loop
+    calls, scanned = await asyncio.to_thread(
+        read_cacheable_calls, log_dir, provider, min(max_entries, cache.max_entries), max_age_hours, cache.operations)
+    for operation, model, messages, response, stored_at in calls:
+        cache.put(operation, model, messages, response, stored_at=stored_at, replace=False)
+    return {
+        "provider": provider,
+        "scanned": scanned,
+        "loaded": len(calls),
+        "entries": len(cache),
+        "duration_ms": (time.perf_counter() - start_time) * 1000
+    }
@@ -0,0 +1,133 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Skill -> (label used in template questions, broad topic, aliases matched in the text).
+# Aliases are lowercase and match as whole words, with an optional plural "s".
+SKILLS = {
+    "python": ("Python programming", "Python", ("python",)),
+    "javascript": ("JavaScript", "JavaScript", ("javascript", "js", "ecmascript")),
+    "typescript": ("TypeScript", "JavaScript", ("typescript",)),
+    "react": ("React.js", "React", ("react", "react.js", "reactjs")),
+    "node": ("Node.js", "Node.js", ("node", "node.js", "nodejs")),
+    "api": ("API development", "API", ("api",)),
+    "rest": ("RESTful services", "API", ("rest", "restful")),
+    "graphql": ("GraphQL", "API", ("graphql",)),
+    "database": ("database design", "database", ("database",)),
+    "sql": ("SQL", "database", ("sql", "mysql", "postgresql", "postgres", "sqlite")),
+    "nosql": ("NoSQL databases", "database", ("nosql",)),
+    "mongodb": ("MongoDB", "database", ("mongodb", "mongo")),
+    "aws": ("AWS", "cloud", ("aws", "amazon web services")),
+    "azure": ("Azure", "cloud", ("azure",)),
+    "gcp": ("Google Cloud", "cloud", ("gcp", "google cloud")),
+    "cloud": ("cloud services", "cloud", ("cloud",)),
+    "docker": ("Docker", "Docker", ("docker", "container", "containerized", "containerization")),
+    "kubernetes": ("Kubernetes", "Docker", ("kubernetes", "k8s")),
+    "microservice": ("microservices architecture", None, ("microservice", "micro-service")),
+    "agile": ("Agile methodologies", "Agile", ("agile",)),
+    "scrum": ("Scrum", "Agile", ("scrum", "kanban")),
+    "test": ("testing strategies", "testing", ("test", "testing", "tested", "tdd")),
+    "qa": ("quality assurance", "testing", ("qa", "quality assurance")),
+    "ci/cd": ("CI/CD pipelines", None, ("ci/cd", "cicd", "continuous integration", "continuous delivery",
+                                        "continuous deployment")),
+    "git": ("Git", None, ("git", "github", "gitlab")),
+    "frontend": ("frontend development", None, ("frontend", "front-end", "front end")),
+    "backend": ("backend development", None, ("backend", "back-end", "back end")),
+    "fullstack": ("full-stack development", None, ("fullstack", "full-stack", "full stack")),
+    "mobile": ("mobile development", None, ("mobile", "ios", "android")),
+    "security": ("security practices", None, ("security", "cybersecurity")),
+    "performance": ("performance optimization", None, ("performance",)),
+}
+
+# Texts whose scans are kept
+SCAN_CACHE_SIZE = 256
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Regex alternation of the words, factored into a trie ("node(?:\\.js|js)?") so
+    the engine tests each shared prefix once per text position
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) > 1:
+            body = "(?:" + "|".join(branches) + ")"
+        else:
+            body = branches[0]
+        if "" not in node:
+            return body
+        # Longer aliases are tried first; the word ending here is the fallback
+        return (body if len(body) == 1 else "(?:" + body + ")") + "?"
+
+    return build(trie)
+
+
+class SkillLexicon:
+    """
+    Finds the skills of a lexicon in a text with one precompiled regex.
+
+    All aliases are compiled into a single trie-shaped alternation, so a JD is
+    scanned once however many skills the lexicon has. Matches are whole words
+    ("api" never matches "rapid"), the longest alias wins ("node.js" over "node"),
+    and an optional plural "s" is allowed. Matching is case-insensitive.
+    """
+    def __init__(self, skills: Dict[str, Tuple[str, Optional[str], Tuple[str, ...]]] = SKILLS):
+        self.skills = skills
+        self._alias_skill = {alias: name for name, (_, _, aliases) in skills.items() for alias in aliases}
+        self.pattern = re.compile(
+            r"(?<![a-z0-9])(%s)s?(?![a-z0-9])" % _trie_pattern(list(self._alias_skill)))
+        # Text -> its scan; the same JD is scanned by several generators and across requests
+        self._scans = {}
+
+    def scan(self, text: str) -> Dict[str, Tuple[int, ...]]:
+        """Matched skill -> start offsets of its mentions, in order of first mention"""
+        positions = self._scans.get(text)
+        if positions is None:
+            if len(self._scans) >= SCAN_CACHE_SIZE:
+                self._scans.clear()
+            alias_skill = self._alias_skill
+            found = {}
+            for match in self.pattern.finditer(text.lower()):
+                found.setdefault(alias_skill[match.group(1)], []).append(match.start())
+            positions = self._scans[text] = {name: tuple(starts) for name, starts in found.items()}
+        return dict(positions)
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Matched skill -> number of mentions, in order of first mention"""
+        return {name: len(starts) for name, starts in self.scan(text).items()}
+
+    def labels(self, text: str) -> List[str]:
+        """Labels of the matched skills, in lexicon order"""
+        matched = self.scan(text)
+        return [label for name, (label, _, _) in self.skills.items() if name in matched]
+
+    def topics(self, text: str) -> List[str]:
+        """Distinct topics of the matched skills, in lexicon order"""
+        matched = self.scan(text)
+        topics = []
+        for name, (_, topic, _) in self.skills.items():
+            if topic and name in matched and topic not in topics:
+                topics.append(topic)
+        return topics
+
+    def topic_terms(self, text: str) -> List[str]:
+        """Names and topics of the matched skills: the words template questions use for them"""
+        matched = self.scan(text)
+        terms = []
+        for name, (_, topic, _) in self.skills.items():
+            if name in matched:
+                terms.append(name)
+                if topic and topic not in terms:
+                    terms.append(topic)
+        return terms
+
+
+# Shared by the template question generators and the mock LLM responses
+SKILL_LEXICON = SkillLexicon()
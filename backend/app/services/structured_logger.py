@@ -0,0 +1,77 @@
+import logging
+import os
+import random
+from typing import Any, Optional
+from dotenv import load_dotenv
+
+# Loggers are created at import time, before main.py loads the .env file
+load_dotenv()
+
+# "development" logs debug detail; "production" only logs warnings and errors, and
+# disabled levels return before any message or field formatting happens
+LOG_MODE = os.getenv("LOG_MODE", "development").lower()
+
+# Maximum characters kept per logged field value
+MAX_FIELD_LENGTH = int(os.getenv("LOG_MAX_FIELD_LENGTH", "200"))
+
+def default_level() -> int:
+    """Level for LOG_MODE, unless LOG_LEVEL (e.g. INFO) overrides it"""
+    level_name = os.getenv("LOG_LEVEL")
+    if level_name:
+        return logging.getLevelName(level_name.upper())
+    return logging.WARNING if LOG_MODE == "production" else logging.DEBUG
+
+class StructuredLogger:
+    """
+    Leveled, structured logger for hot paths.
+
+    Messages are an event name plus key=value fields. Field values are truncated
+    to MAX_FIELD_LENGTH, callables are only evaluated when the message is emitted,
+    and `sample` logs only that fraction of calls (e.g. sample=0.01).
+    """
+    def __init__(self, name: str, level: Optional[int] = None):
+        self._logger = logging.getLogger(f"interview-prep.{name}")
+        self._logger.setLevel(level if level is not None else default_level())
+
+    def is_enabled_for(self, level: int) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def debug(self, event: str, sample: Optional[float] = None, **fields):
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._log(logging.DEBUG, event, sample, fields)
+
+    def info(self, event: str, sample: Optional[float] = None, **fields):
+        if self._logger.isEnabledFor(logging.INFO):
+            self._log(logging.INFO, event, sample, fields)
+
+    def warning(self, event: str, sample: Optional[float] = None, **fields):
+        if self._logger.isEnabledFor(logging.WARNING):
+            self._log(logging.WARNING, event, sample, fields)
+
+    def error(self, event: str, exc_info: bool = False, **fields):
+        if self._logger.isEnabledFor(logging.ERROR):
+            self._log(logging.ERROR, event, None, fields, exc_info=exc_info)
+
+    def _log(self, level: int, event: str, sample: Optional[float], fields: dict, exc_info: bool = False):
+        if sample is not None and random.random() >= sample:
+            return
+
+        parts = [event]
+        for key, value in fields.items():
+            parts.append(f"{key}={_format_field(value)}")
+        self._logger.log(level, " ".join(parts), exc_info=exc_info,
+                         extra={"event": event, "fields": fields})
+
+def get_logger(name: str) -> StructuredLogger:
+    """Get the structured logger for a module (e.g. get_logger("jd_service"))"""
+    return StructuredLogger(name)
+
+def _format_field(value: Any) -> str:
+    if callable(value):
+        value = value()
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) > MAX_FIELD_LENGTH:
+        text = f"{text[:MAX_FIELD_LENGTH]}...(+{len(text) - MAX_FIELD_LENGTH} chars)"
+    if " " in text or '"' in text or not text:
+        text = '"' + text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+    return text
@@ -0,0 +1,63 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Timings of the request currently being handled (set by the request middleware)
+_current_timings = contextvars.ContextVar("request_timings", default=None)
+
+class RequestTimings:
+    """
+    Per-request phase durations, reported in the Server-Timing header.
+
+    Durations of the same phase are accumulated, so a request that calls the
+    LLM twice reports the total time spent waiting on the provider.
+    """
+    def __init__(self):
+        self.phases = {}
+        self.counts = {}
+
+    def add(self, phase: str, duration_ms: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + duration_ms
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    def as_dict(self, total_ms: Optional[float] = None) -> Dict[str, float]:
+        timings = {phase: round(duration, 3) for phase, duration in self.phases.items()}
+        if total_ms is not None:
+            timings["total"] = round(total_ms, 3)
+        return timings
+
+    def header_value(self, total_ms: Optional[float] = None) -> str:
+        """Format the phases as a Server-Timing header value"""
+        entries = []
+        for phase, duration in self.phases.items():
+            count = self.counts[phase]
+            description = f';desc="{count} calls"' if count > 1 else ""
+            entries.append(f"{phase};dur={duration:.2f}{description}")
+        if total_ms is not None:
+            entries.append(f"total;dur={total_ms:.2f}")
+        return ", ".join(entries)
+
+def start_request_timings() -> RequestTimings:
+    """Start collecting timings for the current request"""
+    timings = RequestTimings()
+    _current_timings.set(timings)
+    return timings
+
+def current_timings() -> Optional[RequestTimings]:
+    """Get the timings of the current request, if one is being timed"""
+    return _current_timings.get()
+
+@contextmanager
+def timed(phase: str):
+    """Measure a block with time.perf_counter and add it to the current request's timings"""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, (time.perf_counter() - start) * 1000)
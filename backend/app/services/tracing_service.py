@@ -0,0 +1,246 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+from app.services.logging_service import JsonLinesWriter
+
+# Span currently active in this context (None when the request isn't traced)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+# OpenTelemetry span kinds and status codes used in the exported OTLP JSON
+SPAN_KIND = {
+    "INTERNAL": 1,
+    "SERVER": 2,
+    "CLIENT": 3
+}
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+class Span:
+    """A single timed operation, following the OpenTelemetry span data model"""
+    def __init__(self, trace: "Trace", name: str, parent: Optional["Span"] = None,
+                 kind: str = "INTERNAL", attributes: Optional[Dict[str, Any]] = None):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent else None
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.events = []
+        self.status_code = None
+        self.status_message = ""
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes):
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def set_error(self, error: BaseException):
+        self.status_code = STATUS_ERROR
+        self.status_message = str(error)
+        self.add_event("exception", **{"exception.type": type(error).__name__, "exception.message": str(error)})
+
+    def end(self):
+        self.end_time_ns = time.time_ns()
+        if self.status_code is None:
+            self.status_code = STATUS_OK
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Convert the span to the OTLP JSON representation"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns or time.time_ns()),
+            "attributes": _otlp_attributes(self.attributes),
+            "events": [
+                {
+                    "name": event["name"],
+                    "timeUnixNano": str(event["time_ns"]),
+                    "attributes": _otlp_attributes(event["attributes"])
+                }
+                for event in self.events
+            ],
+            "status": {"code": self.status_code or STATUS_OK, "message": self.status_message}
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+class Trace:
+    """All spans of one request; exported together once the root span ends"""
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans = []
+
+
+class TracingService:
+    """
+    Lightweight in-process tracer.
+
+    The trace of each request is propagated through contextvars, sampled at the
+    root (head sampling) and written as one OTLP JSON line per trace to a local
+    JSONL file, which an OpenTelemetry collector's otlpjsonfile receiver can read.
+    The lines are appended from a background thread (JsonLinesWriter).
+    """
+    def __init__(self, export_dir: Optional[str] = None, sample_rate: Optional[float] = None,
+                 service_name: str = "jd-analyzer-api"):
+        self.export_dir = export_dir or os.getenv("TRACE_EXPORT_DIR", os.path.join(os.getcwd(), "logs", "traces"))
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+        self.service_name = service_name
+        os.makedirs(self.export_dir, exist_ok=True)
+        self._writer = JsonLinesWriter()
+
+    def close(self):
+        """Stop the export thread after writing the queued traces"""
+        self._writer.close()
+
+    @contextmanager
+    def start_trace(self, name: str, traceparent: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None):
+        """
+        Start the root span of a request.
+
+        An incoming W3C traceparent header keeps the caller's trace ID and sampling decision.
+        """
+        trace_id, parent_span_id, sampled = _parse_traceparent(traceparent)
+        if trace_id is None:
+            trace_id = os.urandom(16).hex()
+            sampled = random.random() < self.sample_rate
+
+        trace = Trace(trace_id, sampled)
+        span = Span(trace, name, kind="SERVER", attributes=attributes)
+        span.parent_span_id = parent_span_id
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            span.end()
+            _current_span.reset(token)
+            if sampled:
+                trace.spans.append(span)
+                self.export(trace)
+
+    def export(self, trace: Trace):
+        """Queue a finished trace to be appended to today's JSONL file"""
+        record = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "app.services.tracing_service"},
+                    "spans": [span.to_otlp() for span in trace.spans]
+                }]
+            }]
+        }
+        filepath = os.path.join(self.export_dir, f"traces_{datetime.now().strftime('%Y%m%d')}.jsonl")
+        self._writer.write(filepath, json.dumps(record))
+
+
+@contextmanager
+def start_span(name: str, kind: str = "INTERNAL", **attributes):
+    """
+    Start a child span of the current span.
+
+    Does nothing (and yields None) when the request isn't being traced or wasn't sampled.
+    """
+    parent = _current_span.get()
+    if parent is None or not parent.trace.sampled:
+        yield None
+        return
+
+    span = Span(parent.trace, name, parent=parent, kind=kind, attributes=attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.set_error(e)
+        raise
+    finally:
+        span.end()
+        _current_span.reset(token)
+        parent.trace.spans.append(span)
+
+def traced(name: str, kind: str = "INTERNAL"):
+    """Decorator that runs a function (sync or async) inside a child span"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(name, kind=kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(name, kind=kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def current_span() -> Optional[Span]:
+    """Get the active span, if the current request is being traced"""
+    return _current_span.get()
+
+def add_span_event(name: str, **attributes):
+    """Add an event to the active span of a sampled trace"""
+    span = _current_span.get()
+    if span is not None and span.trace.sampled:
+        span.add_event(name, **attributes)
+
+def set_span_attributes(**attributes):
+    """Set attributes on the active span of a sampled trace"""
+    span = _current_span.get()
+    if span is not None and span.trace.sampled:
+        span.attributes.update(attributes)
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def _parse_traceparent(traceparent: Optional[str]):
+    """Parse a W3C traceparent header into (trace_id, parent_span_id, sampled)"""
+    if not traceparent:
+        return None, None, False
+    parts = traceparent.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None, None, False
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None, None, False
+    return parts[1], parts[2], sampled
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Convert a plain dictionary to OTLP key/value attributes"""
+    converted = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        converted.append({"key": key, "value": typed})
+    return converted
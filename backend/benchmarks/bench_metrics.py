@@ -0,0 +1,53 @@
+"""
+Benchmark the metrics hot path and the /metrics scrape cost.
+
+Run from the backend directory:
+    python -m benchmarks.bench_metrics
+"""
+import argparse
+import random
+import time
+
+from app.services.metrics_service import MetricsService
+
+ROUTES = ["/api/analyze-jd", "/api/generate-questions", "/api/evaluate-answer",
+          "/api/generate-answer", "/api/generate-answer-stream", "/api/logs/{log_type}"]
+STATUSES = [200, 400, 401, 500]
+OPERATIONS = ["analyze_jd", "generate_questions", "evaluate_answer", "generate_answer"]
+
+def bench_observe(metrics: MetricsService, iterations: int) -> float:
+    """Return the mean cost of one request + LLM observation in microseconds"""
+    samples = [(random.choice(ROUTES), random.choice(STATUSES), random.random() * 3) for _ in range(1000)]
+    start = time.perf_counter()
+    for i in range(iterations):
+        route, status, duration = samples[i % 1000]
+        metrics.observe_request("POST", route, status, duration)
+        metrics.observe_llm_call("deepseek", OPERATIONS[i % 4], duration)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def bench_scrape(metrics: MetricsService, scrapes: int) -> float:
+    """Return the mean cost of rendering /metrics in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(scrapes):
+        body = metrics.render()
+    elapsed = (time.perf_counter() - start) / scrapes * 1000
+    print(f"  scrape body: {len(body.splitlines())} lines, {len(body)} bytes")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the metrics service")
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--scrapes", type=int, default=200)
+    args = parser.parse_args()
+
+    metrics = MetricsService()
+    metrics.gauge_callback("question_store_size", "Questions held in the in-memory store", lambda: 1234)
+
+    observe_us = bench_observe(metrics, args.iterations)
+    print(f"observe (request + llm call): {observe_us:.2f} us/op")
+
+    scrape_ms = bench_scrape(metrics, args.scrapes)
+    print(f"scrape: {scrape_ms:.3f} ms/scrape")
+
+if __name__ == "__main__":
+    main()
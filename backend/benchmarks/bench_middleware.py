@@ -0,0 +1,105 @@
+"""
+Compare requests per second of the pure ASGI request middleware against the
+previous @app.middleware("http") (BaseHTTPMiddleware) implementation, in mock mode.
+
+Run from the backend directory:
+    python -m benchmarks.bench_middleware
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+# Mock responses and no tracing, so the numbers measure the request path itself
+os.environ.setdefault("LOG_MODE", "production")
+os.environ["TRACE_SAMPLE_RATE"] = "0"
+
+import httpx
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.main import app
+from app.middleware import RequestLoggingMiddleware, route_label, start_request_trace, logger
+from app.services.timing_service import start_request_timings
+
+JD = ("We are hiring a Senior Python Developer to build REST APIs with FastAPI on AWS. "
+      "Responsibilities include designing PostgreSQL schemas, Docker and Kubernetes deployments, "
+      "CI/CD pipelines and mentoring engineers. Requirements: 5+ years of Python experience, "
+      "strong SQL skills and excellent communication skills. ") * 2
+
+async def legacy_log_requests(request, call_next):
+    """The request middleware as it was before moving to pure ASGI"""
+    start_time = time.perf_counter()
+    timings = start_request_timings()
+    state = request.app.state
+
+    with start_request_trace(state, request) as root_span:
+        response = await call_next(request)
+        if root_span is not None:
+            response.headers["X-Trace-Id"] = root_span.trace_id
+
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        state.metrics_service.observe_request(
+            request.method, route_label(request), response.status_code, duration_ms / 1000)
+        logger.info("Request completed", method=request.method, path=request.url.path,
+                    status=response.status_code, duration_ms=round(duration_ms, 2))
+        response.headers["Server-Timing"] = timings.header_value(duration_ms)
+        return response
+
+def use_middleware(middleware: Middleware):
+    """Swap the outermost request middleware and force the stack to be rebuilt"""
+    app.user_middleware = [middleware] + [
+        m for m in app.user_middleware
+        if m.cls not in (RequestLoggingMiddleware, BaseHTTPMiddleware)
+    ]
+    app.middleware_stack = None
+
+async def run(client: httpx.AsyncClient, path: str, payload: dict, requests: int, concurrency: int) -> float:
+    """Send `requests` requests with `concurrency` in flight and return requests per second"""
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            response = await client.post(path, json=payload)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the request middleware")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    variants = {
+        "BaseHTTPMiddleware": Middleware(BaseHTTPMiddleware, dispatch=legacy_log_requests),
+        "pure ASGI": Middleware(RequestLoggingMiddleware),
+    }
+    endpoints = [
+        ("/api/analyze-jd", {"jd_text": JD}),
+        ("/api/evaluate-answer", {"question_id": "bench", "user_answer": "I have built FastAPI services for five years.",
+                                  "reference_answer": ""}),
+    ]
+
+    # The client logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    async with app.router.lifespan_context(app):
+        app.state.jd_service.llm_service.use_mock = True
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path, payload in endpoints:
+                print(f"{path} ({args.requests} requests, concurrency {args.concurrency})")
+                for name, middleware in variants.items():
+                    use_middleware(middleware)
+                    await run(client, path, payload, 200, args.concurrency)  # warm-up
+                    best = max([await run(client, path, payload, args.requests, args.concurrency)
+                                for _ in range(args.rounds)])
+                    print(f"  {name:<20} {best:8.0f} req/s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+"""
+Measure how much of each prompt is a static prefix the providers can serve
+from their prefix caches: prompts for two different JDs (or questions) are
+rendered from the template registry (app/services/prompts.py) and compacted
+as they are sent, and their common prefix is compared with the prompt size.
+Token counts are estimates.
+
+DeepSeek caches prefixes in 64-token units; OpenAI caches prompts of 1024
+tokens or more, so a prefix shorter than that only pays off on DeepSeek.
+
+Run from the backend directory:
+    python -m benchmarks.bench_prompt_prefix
+"""
+import os
+from typing import Dict, List
+
+from app.services.prompts import PROMPTS, compact_messages, estimate_tokens
+from benchmarks.bench_relevance import REALISTIC_JD
+from benchmarks.microbench import make_jd
+
+# Two calls per operation whose variable fields differ
+CALLS = {
+    "analyze_jd": [{"jd_text": REALISTIC_JD}, {"jd_text": make_jd(4000)}],
+    "generate_questions": [{"jd_text": REALISTIC_JD, "question_count": 10},
+                           {"jd_text": make_jd(4000), "question_count": 5}],
+    "evaluate_answer": [
+        {"question_text": "How do you design a REST API?", "reference_answer": "Resources, verbs, status codes.",
+         "user_answer": "I start from the resources and use the HTTP verbs."},
+        {"question_text": "How do you test async code?", "reference_answer": "pytest-asyncio and fakes.",
+         "user_answer": "With pytest and mocked clients."}],
+    "generate_answer": [{"question_text": "How do you design a REST API?"},
+                        {"question_text": "How do you test async code?"}],
+}
+
+def serialize(messages: List[Dict[str, str]]) -> str:
+    """The messages in the order the provider sees them"""
+    return "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+
+def main():
+    print(f"{'family':<10}{'operation':<20}{'prompt':>8}{'prefix':>8}{'share':>8}")
+    for family in ("deepseek", "openai"):
+        for operation, calls in CALLS.items():
+            prompts = []
+            for fields in calls:
+                # DeepSeek's evaluate_answer template names the question "question"
+                fields = {**fields, "question": fields.get("question_text")}
+                messages = PROMPTS.render(family, operation, **fields)
+                prompts.append(serialize(compact_messages(messages)[0]))
+            prefix = estimate_tokens(os.path.commonprefix(prompts))
+            total = estimate_tokens(prompts[0])
+            print(f"{family:<10}{operation:<20}{total:>8}{prefix:>8}{prefix / total:>8.0%}")
+
+if __name__ == "__main__":
+    main()
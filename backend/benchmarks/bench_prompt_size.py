@@ -0,0 +1,92 @@
+"""
+Measure how many prompt tokens JD preprocessing and prompt compaction save on
+the analyze_jd and generate_questions prompts, for JDs with and without
+boilerplate. Token counts are estimates (app/services/prompts.py).
+
+Run from the backend directory:
+    python -m benchmarks.bench_prompt_size
+"""
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+os.environ.setdefault("LOG_MODE", "production")
+os.environ.pop("DEEPSEEK_API_KEY", None)
+
+from app.services.deepseek_service import DeepSeekService
+from app.services.jd_service import JDService
+from app.services.prompts import compact_messages, estimate_tokens
+from benchmarks.bench_relevance import REALISTIC_JD
+from benchmarks.microbench import make_jd
+
+# Company story, benefits, EEO and application notices, as pasted from job boards
+BOILERPLATE = """
+
+Our story:
+Founded in 2009 in a garage in Berlin, we grew from three people to over 900 employees across 12 offices.
+Our mission is to make payments invisible for merchants everywhere, and our values guide every decision.
+
+Perks and benefits:
+- Competitive salary, equity and an annual bonus
+- 30 days of paid vacation plus public holidays
+- Gym membership, wellness budget and mental health support
+- Home office budget and a yearly company offsite
+
+Equal Opportunity Employer:
+We are an equal opportunity employer and value diversity at our company. We do not discriminate on the
+basis of race, religion, color, national origin, gender, sexual orientation, age, marital status, veteran
+status, or disability status. All qualified applicants will receive consideration for employment without
+regard to race, color, religion, sex, sexual orientation, gender identity, national origin, disability or
+protected veteran status. If you need a reasonable accommodation during the application process, contact us.
+
+How to apply:
+Send your CV and a short cover letter through our careers page. Recruitment agencies: please do not send
+unsolicited CVs.
+"""
+
+
+class CapturingDeepSeekService(DeepSeekService):
+    """Mock provider that keeps the messages it was called with, before compaction"""
+    def __init__(self):
+        super().__init__()
+        self.captured = []
+
+    async def _call_api(self, messages: List[Dict[str, str]], temperature: float = 0.7, max_tokens: Optional[int] = None):
+        self.captured.append(messages)
+        return await super()._call_api(messages, temperature, max_tokens)
+
+
+def prompt_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(estimate_tokens(m["content"]) for m in messages)
+
+async def measure(jd_text: str, preprocessing: bool) -> Dict[str, Dict[str, int]]:
+    """Prompt tokens per operation, as built and after compaction"""
+    service = CapturingDeepSeekService()
+    jd_service = JDService(service)
+    jd_service.jd_preprocessing = preprocessing
+    await service.analyze_jd(jd_service.prompt_jd(jd_text, "analyze_jd"))
+    await service.generate_questions(jd_service.prompt_jd(jd_text, "generate_questions"), 10)
+
+    results = {}
+    for operation, messages in zip(("analyze_jd", "generate_questions"), service.captured):
+        results[operation] = {"built": prompt_tokens(messages), "compacted": prompt_tokens(compact_messages(messages)[0])}
+    return results
+
+async def main():
+    jds = [
+        ("realistic", REALISTIC_JD),
+        ("realistic + boilerplate", REALISTIC_JD + BOILERPLATE),
+        ("synthetic 10KB", make_jd(10_000)),
+    ]
+    print(f"{'JD':<26}{'operation':<20}{'raw':>8}{'preprocessed':>14}{'+ compacted':>13}{'saved':>8}")
+    for name, jd in jds:
+        raw = await measure(jd, preprocessing=False)
+        prepared = await measure(jd, preprocessing=True)
+        for operation in raw:
+            before = raw[operation]["built"]
+            after = prepared[operation]["compacted"]
+            print(f"{name:<26}{operation:<20}{before:>8}{prepared[operation]['built']:>14}{after:>13}"
+                  f"{(before - after) / before:>8.0%}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
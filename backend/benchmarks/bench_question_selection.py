@@ -0,0 +1,82 @@
+"""
+Compare the question selection modes (QUESTION_SELECTION) against an LLM that
+returns a given share of off-topic questions: how often each mode has to pad
+with template questions, and how many extra questions it asks the LLM for.
+
+The LLM is simulated (no provider calls); its on-topic questions come from
+benchmarks.microbench.make_questions and its off-topic ones from
+benchmarks.bench_relevance.OFF_TOPIC_QUESTIONS.
+
+Run from the backend directory:
+    python -m benchmarks.bench_question_selection
+    python -m benchmarks.bench_question_selection --question-count 10 --surplus-ratio 1.3
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+from typing import Dict, List
+
+os.environ.setdefault("LOG_MODE", "production")
+
+# Padding warnings are part of what is measured, not output
+logging.getLogger().addHandler(logging.NullHandler())
+
+from app.services.jd_service import JDService
+from app.services.metrics_service import MetricsService
+from benchmarks.bench_relevance import REALISTIC_JD, OFF_TOPIC_QUESTIONS
+from benchmarks.microbench import make_questions
+
+class SimulatedLLM:
+    """Returns the requested number of questions, each off-topic with probability off_topic_rate"""
+    def __init__(self, off_topic_rate: float, seed: int):
+        self.off_topic_rate = off_topic_rate
+        self.rng = random.Random(seed)
+        self.on_topic = make_questions(200, seed=seed)
+        self.questions_generated = 0
+
+    async def generate_questions(self, jd_text: str, question_count: int) -> List[Dict[str, str]]:
+        self.questions_generated += question_count
+        return [
+            dict(self.rng.choice(OFF_TOPIC_QUESTIONS if self.rng.random() < self.off_topic_rate else self.on_topic))
+            for _ in range(question_count)
+        ]
+
+async def run_mode(mode: str, off_topic_rate: float, args) -> Dict[str, float]:
+    llm = SimulatedLLM(off_topic_rate, args.seed)
+    service = JDService(llm)
+    service.question_selection = mode
+    service.question_surplus_ratio = args.surplus_ratio
+    service.metrics_service = MetricsService()
+
+    for _ in range(args.runs):
+        await service.generate_questions(REALISTIC_JD, args.question_count)
+
+    outcomes = {outcome: count for (_, outcome), count in service.metrics_service.question_selections.collect().items()}
+    return {
+        "padded": outcomes.get("padded", 0) / args.runs,
+        "short": outcomes.get("short", 0) / args.runs,
+        "generated_per_question": llm.questions_generated / (args.runs * args.question_count)
+    }
+
+async def main_async(args):
+    print(f"{args.runs} generations of {args.question_count} questions, rank surplus ratio {args.surplus_ratio}\n")
+    print(f"{'off-topic':>10}{'mode':>8}{'padded':>10}{'short':>10}{'LLM questions/question':>25}")
+    for off_topic_rate in args.off_topic_rates:
+        for mode in ("filter", "rank"):
+            result = await run_mode(mode, off_topic_rate, args)
+            print(f"{off_topic_rate:>10.0%}{mode:>8}{result['padded']:>10.0%}{result['short']:>10.0%}"
+                  f"{result['generated_per_question']:>25.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare question selection modes against a simulated LLM")
+    parser.add_argument("--question-count", type=int, default=10)
+    parser.add_argument("--surplus-ratio", type=float, default=1.5)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--off-topic-rates", type=float, nargs="+", default=[0.1, 0.2, 0.3, 0.4])
+    parser.add_argument("--seed", type=int, default=3)
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Compare the TF-IDF relevance engine (app/services/relevance_service.py) with
+the previous substring key-term filter: time per batch and which questions
+each one keeps.
+
+Run from the backend directory:
+    python -m benchmarks.bench_relevance
+    python -m benchmarks.bench_relevance --jd realistic --questions 100
+"""
+import argparse
+import re
+import time
+from typing import Dict, List, Callable, Any
+
+from app.services.relevance_service import RelevanceEngine, STOP_WORDS
+from benchmarks.microbench import make_jd, make_questions
+
+# A job description with a realistic vocabulary (make_jd repeats a handful of sentences)
+REALISTIC_JD = """
+Senior Backend Engineer, Payments Platform
+
+About us: We run the payments infrastructure behind thousands of online merchants, processing
+card, wallet and bank transfers in over 40 countries with strict latency and availability targets.
+
+What you will do:
+- Design, build and operate high-throughput Python and Go services for authorization, capture,
+  refunds, disputes and settlement reconciliation.
+- Own PostgreSQL data models, partitioning and query tuning; run Redis for idempotency keys and
+  rate limiting; publish domain events to Kafka and consume them with exactly-once semantics.
+- Expose REST and gRPC APIs, document them with OpenAPI, and version them without breaking clients.
+- Deploy with Docker, Kubernetes and Terraform on AWS (EKS, RDS, SQS, Lambda, CloudWatch).
+- Improve observability with OpenTelemetry tracing, Prometheus metrics and Grafana dashboards;
+  join the on-call rotation and lead incident reviews.
+- Partner with risk, compliance and finance teams on PCI DSS controls, fraud signals and audits.
+- Review code, mentor mid-level engineers and write design documents for cross-team initiatives.
+
+What we are looking for:
+- 6+ years building distributed backend systems in production, ideally in fintech or e-commerce.
+- Deep knowledge of concurrency, transactions, isolation levels, retries and backpressure.
+- Experience with asynchronous frameworks such as FastAPI, asyncio or Celery, and with pytest,
+  property-based testing and contract tests in CI/CD pipelines (GitHub Actions, Argo CD).
+- Familiarity with ISO 8583, 3-D Secure, tokenization and card network rules is a plus.
+- Clear written communication in English; comfortable working across time zones.
+
+Benefits: equity, remote-first culture, learning budget, parental leave and a yearly offsite.
+"""
+
+# Questions that share only substrings or generic words with a software JD
+OFF_TOPIC_QUESTIONS = [
+    {"text": "How do you plan a rapid garden renovation?",
+     "reference_answer": "Choose plants, soil and a schedule; a rapid plan still needs drainage."},
+    {"text": "What is your favourite recipe for sourdough bread?",
+     "reference_answer": "Discuss fermentation, hydration and baking temperature."},
+    {"text": "Describe how you handle a difficult customer in retail.",
+     "reference_answer": "A good answer shows patience, listening and resolving the complaint."},
+    {"text": "Which sports have you played competitively?",
+     "reference_answer": "Mention the sport, level reached and what it taught about discipline."},
+]
+
+def legacy_extract_key_terms(jd_text: str) -> set:
+    """Key terms as JDService._extract_key_terms extracted them before the relevance engine"""
+    words = re.findall(r'\b[a-zA-Z]{3,}\b', jd_text.lower())
+    return {word for word in words if word not in STOP_WORDS}
+
+def legacy_is_question_relevant(question: Dict[str, str], key_terms: set) -> bool:
+    """Substring scan of every key term, as JDService._is_question_relevant did"""
+    question_text = question.get('text', '').lower()
+    reference_answer = question.get('reference_answer', '').lower()
+    term_matches = sum(1 for term in key_terms if term in question_text or term in reference_answer)
+    return term_matches >= 2
+
+def legacy_filter(jd_text: str, questions: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    key_terms = legacy_extract_key_terms(jd_text)
+    return [q for q in questions if legacy_is_question_relevant(q, key_terms)]
+
+def engine_filter(jd_text: str, questions: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    return RelevanceEngine(jd_text).filter_questions(questions)
+
+def time_per_call(func: Callable[[], Any], min_time: float = 0.5) -> float:
+    """Median-free quick timing: loops until min_time has passed, returns microseconds per call"""
+    func()
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        func()
+        calls += 1
+    return (time.perf_counter() - start) / calls * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the relevance engine with the legacy key-term filter")
+    parser.add_argument("--jd", choices=["synthetic", "realistic"], default="synthetic",
+                        help="make_jd's repeated sentences or a real-world JD with a varied vocabulary")
+    parser.add_argument("--jd-bytes", type=int, default=10_000, help="Size of the synthetic JD")
+    parser.add_argument("--questions", type=int, default=50)
+    args = parser.parse_args()
+
+    jd = make_jd(args.jd_bytes) if args.jd == "synthetic" else REALISTIC_JD
+    on_topic = make_questions(args.questions)
+    questions = on_topic + OFF_TOPIC_QUESTIONS
+
+    print(f"JD {len(jd)} bytes, {len(on_topic)} on-topic and {len(OFF_TOPIC_QUESTIONS)} off-topic questions\n")
+    print(f"{'filter':<12}{'time/batch':>14}{'on-topic kept':>16}{'off-topic kept':>16}")
+    for name, func in (("legacy", legacy_filter), ("tf-idf", engine_filter)):
+        elapsed_us = time_per_call(lambda: func(jd, questions))
+        kept = func(jd, questions)
+        kept_on_topic = sum(1 for q in kept if q in on_topic)
+        kept_off_topic = sum(1 for q in kept if q in OFF_TOPIC_QUESTIONS)
+        print(f"{name:<12}{elapsed_us:>12.1f}us{kept_on_topic:>10}/{len(on_topic):<5}"
+              f"{kept_off_topic:>10}/{len(OFF_TOPIC_QUESTIONS):<5}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare the shared skill lexicon (app/services/skill_lexicon.py) with the
+per-generator keyword tables it replaced: time to find the skills of a large
+JD for all three template/mock generators, and which skills each one finds.
+
+Run from the backend directory:
+    python -m benchmarks.bench_skill_lexicon
+    python -m benchmarks.bench_skill_lexicon --sizes 10000 1000000
+"""
+import argparse
+from typing import List
+
+from app.services.skill_lexicon import SKILL_LEXICON
+from benchmarks.bench_relevance import REALISTIC_JD, time_per_call
+from benchmarks.microbench import make_jd
+
+# The keyword tables of JDService.generate_test_questions and OpenAIService._generate_generic_questions
+LEGACY_TEST_QUESTION_KEYWORDS = {
+    "python": "Python programming", "javascript": "JavaScript", "react": "React.js", "node": "Node.js",
+    "api": "API development", "rest": "RESTful services", "database": "database design", "sql": "SQL",
+    "nosql": "NoSQL databases", "mongodb": "MongoDB", "aws": "AWS", "azure": "Azure", "cloud": "cloud services",
+    "docker": "Docker", "kubernetes": "Kubernetes", "microservice": "microservices architecture",
+    "agile": "Agile methodologies", "scrum": "Scrum", "test": "testing strategies", "ci/cd": "CI/CD pipelines",
+    "git": "Git", "frontend": "frontend development", "backend": "backend development",
+    "fullstack": "full-stack development", "mobile": "mobile development", "security": "security practices",
+    "performance": "performance optimization"
+}
+LEGACY_GENERIC_QUESTION_KEYS = ["python", "javascript", "react", "node", "api", "database", "cloud", "agile",
+                                "test", "frontend", "backend"]
+
+# The DeepSeek mock generator's if-chain
+LEGACY_MOCK_TOPICS = [
+    ("Python", ("python",)), ("JavaScript", ("javascript", "js")), ("React", ("react",)), ("Node.js", ("node",)),
+    ("API", ("api", "rest")), ("database", ("database", "sql")), ("cloud", ("cloud", "aws", "azure")),
+    ("Docker", ("docker", "container")), ("Agile", ("agile", "scrum")), ("testing", ("test", "qa"))
+]
+
+def legacy_scan(jd_text: str) -> List[List[str]]:
+    """Keywords of the three generators, found as they were: one substring loop per table"""
+    jd_lower = jd_text.lower()
+    test_keywords = [value for key, value in LEGACY_TEST_QUESTION_KEYWORDS.items() if key in jd_lower]
+    generic_keywords = [LEGACY_TEST_QUESTION_KEYWORDS[key] for key in LEGACY_GENERIC_QUESTION_KEYS if key in jd_lower]
+    mock_topics = [topic for topic, keys in LEGACY_MOCK_TOPICS if any(key in jd_lower for key in keys)]
+    return [test_keywords, generic_keywords, mock_topics]
+
+def lexicon_scan(jd_text: str, cached: bool = False) -> List[List[str]]:
+    """Keywords of the three generators from one lexicon scan (a cache hit when cached)"""
+    if not cached:
+        SKILL_LEXICON._scans.clear()
+    matched = SKILL_LEXICON.scan(jd_text)
+    labels = [label for name, (label, _, _) in SKILL_LEXICON.skills.items() if name in matched]
+    topics = []
+    for name, (_, topic, _) in SKILL_LEXICON.skills.items():
+        if topic and name in matched and topic not in topics:
+            topics.append(topic)
+    return [labels, labels, topics]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the skill lexicon with the legacy keyword tables")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Synthetic JD sizes in bytes")
+    args = parser.parse_args()
+
+    jds = [("realistic", REALISTIC_JD)] + [(f"synthetic {size // 1000}KB", make_jd(size)) for size in args.sizes]
+    print(f"{'JD':<20}{'legacy':>12}{'lexicon':>12}{'cached':>12}   skills found (legacy -> lexicon)")
+    for name, jd in jds:
+        legacy_us = time_per_call(lambda: legacy_scan(jd))
+        lexicon_us = time_per_call(lambda: lexicon_scan(jd))
+        cached_us = time_per_call(lambda: lexicon_scan(jd, cached=True))
+        print(f"{name:<20}{legacy_us:>10.1f}us{lexicon_us:>10.1f}us{cached_us:>10.1f}us   "
+              f"{len(legacy_scan(jd)[0])} -> {len(lexicon_scan(jd)[0])}")
+
+    # Substring matching finds skills a JD never mentions
+    sample = "We need rapid delivery, a latest-generation interest in JSON, and a nodejs-free contest entry."
+    print(f"\nOn {sample!r}:")
+    print(f"  legacy:  {legacy_scan(sample)[0]}")
+    print(f"  lexicon: {lexicon_scan(sample)[0]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+End-to-end load test that replays interview sessions against the API.
+
+Each virtual user runs a session: analyze the JD, generate questions, then
+evaluate an answer and stream a generated answer for some of the questions.
+Latency percentiles, throughput, stream time to first byte and error rates are
+reported per endpoint and can be saved as JSON for comparison between commits.
+
+Run from the backend directory, either in-process through the ASGI transport
+(LLM calls use mock mode unless DEEPSEEK_BASE_URL/OPENAI_BASE_URL point at
+benchmarks/mock_llm_server.py):
+    python -m benchmarks.load_test --users 20 --sessions 100 --output results/head.json
+
+or against a running server:
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000 --users 20 --sessions 100
+
+httpx's ASGI transport buffers whole responses, so stream time to first byte
+is only reported against a running server.
+
+Compare two runs:
+    python -m benchmarks.load_test --compare results/base.json results/head.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import httpx
+
+JDS = [
+    ("We are hiring a Senior Python Developer to build REST APIs with FastAPI on AWS. "
+     "Responsibilities include designing PostgreSQL schemas, Docker and Kubernetes deployments, "
+     "CI/CD pipelines and mentoring engineers. Requirements: 5+ years of Python experience, "
+     "strong SQL skills, agile/scrum experience and excellent communication skills. "),
+    ("Frontend Engineer (React). You will build accessible, responsive user interfaces with React, "
+     "TypeScript, HTML and CSS, work closely with designers and backend engineers on REST and GraphQL "
+     "APIs, write unit and end-to-end tests, and improve web performance. Requirements: 3+ years of "
+     "JavaScript and React experience, Git, and strong problem-solving and teamwork skills. "),
+    ("Data Scientist to join our analytics team. You will build machine learning models in Python with "
+     "pandas, scikit-learn and TensorFlow, analyze large datasets with SQL and Spark, design A/B tests "
+     "and present insights to stakeholders. Requirements: degree in statistics or computer science, "
+     "experience with data visualization and strong communication skills. "),
+]
+
+ANSWERS = [
+    "I have used this extensively in my previous role, where I designed and maintained production services.",
+    "In my last project I led the migration, wrote the tests and mentored two junior engineers through it.",
+    "I would start by clarifying the requirements, then prototype, measure and iterate with the team.",
+]
+
+ENDPOINTS = ["analyze-jd", "generate-questions", "evaluate-answer", "generate-answer-stream"]
+
+class Recorder:
+    """Collects per-endpoint latencies, stream time to first byte and errors"""
+    def __init__(self, measure_ttfb: bool = True):
+        self.measure_ttfb = measure_ttfb
+        self.latencies = {name: [] for name in ENDPOINTS}
+        self.ttfb = {name: [] for name in ENDPOINTS}
+        self.errors = {name: 0 for name in ENDPOINTS}
+        self.error_samples = {name: [] for name in ENDPOINTS}
+
+    def record(self, name: str, latency_s: float, ttfb_s: Optional[float] = None, error: Optional[str] = None):
+        self.latencies[name].append(latency_s)
+        if ttfb_s is not None:
+            self.ttfb[name].append(ttfb_s)
+        if error:
+            self.errors[name] += 1
+            if len(self.error_samples[name]) < 5:
+                self.error_samples[name].append(error)
+
+    def summary(self, elapsed_s: float) -> Dict[str, Any]:
+        endpoints = {}
+        for name in ENDPOINTS:
+            latencies = self.latencies[name]
+            if not latencies:
+                continue
+            endpoints[name] = {
+                "requests": len(latencies),
+                "errors": self.errors[name],
+                "error_rate": round(self.errors[name] / len(latencies), 4),
+                "throughput_rps": round(len(latencies) / elapsed_s, 2),
+                "latency_ms": percentiles(latencies),
+                "error_samples": self.error_samples[name]
+            }
+            if self.ttfb[name]:
+                endpoints[name]["ttfb_ms"] = percentiles(self.ttfb[name])
+
+        total = sum(len(v) for v in self.latencies.values())
+        return {
+            "elapsed_s": round(elapsed_s, 3),
+            "requests": total,
+            "throughput_rps": round(total / elapsed_s, 2) if elapsed_s else 0.0,
+            "error_rate": round(sum(self.errors.values()) / total, 4) if total else 0.0,
+            "endpoints": endpoints
+        }
+
+
+def percentiles(samples_s: List[float]) -> Dict[str, float]:
+    """Nearest-rank p50/p95/p99 (and mean/max) in milliseconds"""
+    ordered = sorted(samples_s)
+
+    def rank(p: float) -> float:
+        index = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+        return round(ordered[index] * 1000, 2)
+
+    return {
+        "p50": rank(50),
+        "p95": rank(95),
+        "p99": rank(99),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2)
+    }
+
+async def timed_post(client: httpx.AsyncClient, recorder: Recorder, name: str, payload: dict) -> Optional[dict]:
+    """POST a JSON request, record its latency and return the decoded body (None on error)"""
+    start = time.perf_counter()
+    try:
+        response = await client.post(f"/api/{name}", json=payload)
+        latency = time.perf_counter() - start
+        if response.status_code >= 400:
+            recorder.record(name, latency, error=f"HTTP {response.status_code}")
+            return None
+        body = response.json()
+        recorder.record(name, latency)
+        return body
+    except Exception as e:
+        recorder.record(name, time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+        return None
+
+async def timed_stream(client: httpx.AsyncClient, recorder: Recorder, name: str, payload: dict):
+    """POST a streaming request and record time to first byte and time to the end of the stream"""
+    start = time.perf_counter()
+    ttfb = None
+    try:
+        async with client.stream("POST", f"/api/{name}", json=payload) as response:
+            async for chunk in response.aiter_bytes():
+                if ttfb is None and chunk:
+                    ttfb = time.perf_counter() - start
+            error = f"HTTP {response.status_code}" if response.status_code >= 400 else None
+        if not recorder.measure_ttfb:
+            ttfb = None
+        recorder.record(name, time.perf_counter() - start, ttfb_s=ttfb, error=error)
+    except Exception as e:
+        recorder.record(name, time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+
+async def run_session(client: httpx.AsyncClient, recorder: Recorder, args, rng: random.Random):
+    """One interview session: analyze, generate questions, then answer a few of them"""
+    jd_text = rng.choice(JDS) * 2
+    await timed_post(client, recorder, "analyze-jd", {"jd_text": jd_text})
+
+    body = await timed_post(client, recorder, "generate-questions",
+                            {"jd_text": jd_text, "question_count": args.questions})
+    questions = (body or {}).get("questions", [])
+
+    for question in questions[:args.answers]:
+        await timed_post(client, recorder, "evaluate-answer", {
+            "question_id": question["id"],
+            "question_text": question["text"],
+            "user_answer": rng.choice(ANSWERS),
+            "reference_answer": question.get("reference_answer", "")
+        })
+        if rng.random() < args.stream_ratio:
+            await timed_stream(client, recorder, "generate-answer-stream",
+                               {"question_text": question["text"], "word_limit": 60})
+
+async def run_load(client: httpx.AsyncClient, args) -> Dict[str, Any]:
+    recorder = Recorder(measure_ttfb=bool(args.base_url))
+    sessions = iter(range(args.sessions))
+
+    async def user(user_id: int):
+        rng = random.Random(args.seed + user_id)
+        for _ in sessions:
+            await run_session(client, recorder, args, rng)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(args.users)))
+    return recorder.summary(time.perf_counter() - start)
+
+async def run(args) -> Dict[str, Any]:
+    timeout = httpx.Timeout(args.timeout)
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout) as client:
+            return await run_load(client, args)
+
+    # In-process: run the app's startup/shutdown and call it through the ASGI transport
+    from app.main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+            return await run_load(client, args)
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_summary(results: Dict[str, Any]):
+    summary = results["summary"]
+    print(f"{summary['requests']} requests in {summary['elapsed_s']}s: "
+          f"{summary['throughput_rps']} req/s, error rate {summary['error_rate']:.2%}")
+    print(f"{'endpoint':<24}{'reqs':>6}{'err%':>7}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'ttfb p50':>10}{'ttfb p95':>10}")
+    for name, stats in summary["endpoints"].items():
+        latency = stats["latency_ms"]
+        ttfb = stats.get("ttfb_ms", {})
+        print(f"{name:<24}{stats['requests']:>6}{stats['error_rate']:>7.1%}{stats['throughput_rps']:>8}"
+              f"{latency['p50']:>9}{latency['p95']:>9}{latency['p99']:>9}"
+              f"{ttfb.get('p50', ''):>10}{ttfb.get('p95', ''):>10}")
+
+def compare(base_path: str, head_path: str, threshold: float) -> int:
+    """Print per-endpoint changes between two result files; returns 1 if p95 regressed past the threshold"""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(head_path) as f:
+        head = json.load(f)
+
+    print(f"base: {base.get('commit')} ({base.get('timestamp')})  head: {head.get('commit')} ({head.get('timestamp')})")
+    regressed = False
+    for name, head_stats in head["summary"]["endpoints"].items():
+        base_stats = base["summary"]["endpoints"].get(name)
+        if not base_stats:
+            print(f"{name:<24} (no baseline)")
+            continue
+        for metric in ("p50", "p95", "p99"):
+            before = base_stats["latency_ms"][metric]
+            after = head_stats["latency_ms"][metric]
+            change = (after - before) / before if before else 0.0
+            flag = ""
+            if metric == "p95" and change > threshold:
+                flag = "  REGRESSION"
+                regressed = True
+            print(f"{name:<24}{metric:>5} {before:>10.2f} -> {after:>10.2f} ms ({change:+.1%}){flag}")
+        print(f"{name:<24}{'err%':>5} {base_stats['error_rate']:>10.2%} -> {head_stats['error_rate']:>10.2%}")
+    return 1 if regressed else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the interview API")
+    parser.add_argument("--base-url", help="Test a running server instead of the in-process app")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--sessions", type=int, default=50, help="Total interview sessions")
+    parser.add_argument("--questions", type=int, default=5, help="Questions generated per session")
+    parser.add_argument("--answers", type=int, default=2, help="Questions answered per session")
+    parser.add_argument("--stream-ratio", type=float, default=0.5,
+                        help="Fraction of answered questions that also stream a generated answer")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Save the results as JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="Compare two saved result files")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed p95 increase when comparing (default 10%%)")
+    args = parser.parse_args()
+
+    if args.compare:
+        raise SystemExit(compare(*args.compare, args.threshold))
+
+    # Keep the per-request client logging out of the measurements
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    summary = asyncio.run(run(args))
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "target": args.base_url or "in-process",
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "threshold")},
+        "summary": summary
+    }
+    print_summary(results)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
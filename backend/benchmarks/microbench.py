@@ -0,0 +1,295 @@
+"""
+Microbenchmarks for the pure-Python code that runs on every request, with
+stored baselines and a regression gate.
+
+Run from the backend directory:
+    python -m benchmarks.microbench                    # run and print
+    python -m benchmarks.microbench -k key_terms       # only matching cases
+    python -m benchmarks.microbench --save             # store as the new baseline
+    python -m benchmarks.microbench --check            # exit 1 on regressions
+
+Each case is calibrated to run for about --min-time seconds per round; the
+median of --rounds rounds is compared to benchmarks/baselines/microbench.json.
+Baselines are machine-specific, so save them on the machine that checks them.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, Any, List
+
+os.environ.setdefault("LOG_MODE", "production")
+
+# Warnings from the fallback paths are still created (they are part of the cost) but not written
+logging.getLogger().addHandler(logging.NullHandler())
+
+from app.services.answer_scorer import AnswerScorer
+from app.services.dedup_service import remove_near_duplicates
+from app.services.deepseek_service import DeepSeekService
+from app.services.jd_classifier import JDClassifier
+from app.services.jd_service import JDService
+from app.services.logging_service import LoggingService
+from app.services.openai_service import OpenAIService
+from app.services.relevance_service import RelevanceEngine
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baselines", "microbench.json")
+
+# Registered cases: name -> setup function returning the callable to time
+CASES = {}
+
+def bench(name: str):
+    """Register a benchmark case; the decorated setup function returns the callable to time"""
+    def decorator(setup: Callable[[], Callable[[], Any]]):
+        CASES[name] = setup
+        return setup
+    return decorator
+
+
+# Realistic inputs
+
+SKILL_SENTENCES = [
+    "Design and build REST APIs in Python with FastAPI and Django, deployed on AWS with Docker and Kubernetes.",
+    "Own PostgreSQL and MongoDB schemas, write efficient SQL and tune slow queries.",
+    "Build React and TypeScript front ends with HTML, CSS and accessible UI components.",
+    "Set up CI/CD pipelines, Git workflows and automated testing for every service.",
+    "Work in an agile/scrum team, mentor engineers and communicate clearly with stakeholders.",
+    "Train machine learning models with TensorFlow and PyTorch and analyze data with pandas.",
+    "Monitor production systems, handle incidents and improve reliability and performance.",
+    "Collaborate with product managers on requirements, planning and leadership of initiatives.",
+]
+
+def make_jd(size_bytes: int = 10_000, seed: int = 7) -> str:
+    """A job description of about size_bytes built from realistic requirement sentences"""
+    rng = random.Random(seed)
+    parts = ["Senior Software Engineer\n\nAbout the role:\n"]
+    length = len(parts[0])
+    while length < size_bytes:
+        sentence = "- " + rng.choice(SKILL_SENTENCES) + "\n"
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)[:size_bytes]
+
+def make_questions(count: int = 50, seed: int = 11) -> List[Dict[str, str]]:
+    rng = random.Random(seed)
+    topics = ["Python", "FastAPI", "AWS", "Docker", "Kubernetes", "SQL", "React", "CI/CD", "leadership", "testing"]
+    return [
+        {
+            "text": f"Describe how you have used {rng.choice(topics)} and {rng.choice(topics)} to deliver a project #{i}?",
+            "reference_answer": f"A strong answer covers concrete experience with {rng.choice(topics)}, trade-offs and results."
+        }
+        for i in range(count)
+    ]
+
+def make_malformed_questions_json(count: int = 50) -> str:
+    """A 50-question LLM response whose JSON is cut off, so parsing falls back to regex"""
+    body = json.dumps({"questions": make_questions(count)}, indent=2)
+    return "Here are your questions:\n" + body[:-3]
+
+def make_numbered_questions(count: int = 50) -> str:
+    """A plain-text response that only the numbered-question fallback pattern can parse"""
+    lines = []
+    for i, question in enumerate(make_questions(count), 1):
+        lines.append(f"{i}. {question['text']}")
+        lines.append(f"Answer: {question['reference_answer']}")
+    return "\n".join(lines)
+
+def make_log_payload() -> Dict[str, Any]:
+    """A request/response payload like the ones sanitized for every logged LLM call"""
+    jd = make_jd(10_000)
+    return {
+        "messages": [
+            {"role": "system", "content": "You are an expert interviewer."},
+            {"role": "user", "content": f"Generate 50 questions.\n\nJob Description:\n{jd}"}
+        ],
+        "temperature": 0.7,
+        "api_key": "sk-secret",
+        "response": {"questions": make_questions(50), "usage": {"prompt_tokens": 2600, "completion_tokens": 4100}}
+    }
+
+def run_async(coroutine_factory: Callable[[], Any]) -> Callable[[], Any]:
+    loop = asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(coroutine_factory())
+
+def offline_jd_service() -> JDService:
+    """A JD service over the mock LLM service (these cases never call the provider)"""
+    llm_service = DeepSeekService()
+    llm_service.use_mock = True
+    return JDService(llm_service)
+
+def malformed_openai_service(content: str) -> OpenAIService:
+    """An OpenAI service whose provider call returns the given (malformed) content"""
+    service = OpenAIService()
+    # A model whose output limit holds 50 questions in one call, whatever OPENAI_MODEL is
+    service.model = "gpt-4o"
+
+    async def call_api(messages, temperature=None, max_tokens=None):
+        return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+    service._call_api = call_api
+    return service
+
+
+# Cases
+
+@bench("relevance.engine_init[10KB JD]")
+def bench_relevance_engine_init():
+    jd = make_jd()
+    return lambda: RelevanceEngine(jd)
+
+@bench("relevance.score_questions[10KB JD, 50 questions]")
+def bench_relevance_score_questions():
+    engine = RelevanceEngine(make_jd())
+    questions = make_questions(50)
+    return lambda: engine.score_questions(questions)
+
+@bench("dedup.remove_near_duplicates[50 questions]")
+def bench_remove_near_duplicates():
+    questions = make_questions(50)
+    return lambda: remove_near_duplicates(questions)
+
+@bench("jd_classifier.probability[10KB JD]")
+def bench_jd_classifier_probability():
+    classifier = JDClassifier.load()
+    jd = make_jd()
+    return lambda: classifier.probability(jd)
+
+@bench("answer_scorer.score[4-sentence reference, 70-word answer]")
+def bench_answer_scorer():
+    scorer = AnswerScorer()
+    question = make_questions(1)[0]
+    reference = " ".join(SKILL_SENTENCES[:4])
+    answer = " ".join(SKILL_SENTENCES[2:8])
+    return lambda: scorer.score(question["text"], answer, reference)
+
+@bench("jd_service.generate_test_questions[10KB JD, 50]")
+def bench_generate_test_questions():
+    service = offline_jd_service()
+    jd = make_jd()
+    return lambda: service.generate_test_questions(jd, 50)
+
+@bench("deepseek.extract_questions_fallback[malformed JSON, 50]")
+def bench_deepseek_fallback_json():
+    service = DeepSeekService()
+    content = make_malformed_questions_json()
+    return lambda: service._extract_questions_fallback(content)
+
+@bench("deepseek.extract_questions_fallback[numbered text, 50]")
+def bench_deepseek_fallback_numbered():
+    service = DeepSeekService()
+    content = make_numbered_questions()
+    return lambda: service._extract_questions_fallback(content)
+
+@bench("openai.generate_questions[malformed JSON, 50]")
+def bench_openai_questions_fallback():
+    service = malformed_openai_service(make_malformed_questions_json())
+    jd = make_jd()
+    return run_async(lambda: service.generate_questions(jd, 50))
+
+@bench("openai.evaluate_answer[malformed JSON]")
+def bench_openai_evaluation_fallback():
+    content = '{"score": 72, "feedback": "Good structure but lacks metrics", "improvement_suggestions": "Add numbers'
+    service = malformed_openai_service(content)
+    return run_async(lambda: service.evaluate_answer("Tell me about FastAPI?", "I built services.", ""))
+
+@bench("logging_service.sanitize_data[10KB JD payload]")
+def bench_sanitize_data():
+    # No __init__: the case needs neither log files nor handlers
+    service = LoggingService.__new__(LoggingService)
+    payload = make_log_payload()
+    return lambda: service._sanitize_data(payload)
+
+
+# Runner
+
+def measure(func: Callable[[], Any], rounds: int, min_time: float) -> Dict[str, float]:
+    """Calibrate the loop count to min_time, then return per-call timings over the rounds"""
+    func()  # warm-up
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 4:
+            break
+        loops *= 2
+    loops = max(1, int(loops * min_time / max(elapsed, 1e-9)))
+
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops * 1e6)
+
+    return {
+        "median_us": round(statistics.median(samples), 3),
+        "min_us": round(min(samples), 3),
+        "stdev_us": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        "loops": loops
+    }
+
+def load_baseline() -> Dict[str, Any]:
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE) as f:
+        return json.load(f).get("cases", {})
+
+def save_baseline(results: Dict[str, Dict[str, float]]):
+    os.makedirs(os.path.dirname(BASELINE_FILE), exist_ok=True)
+    cases = load_baseline()
+    cases.update(results)
+    with open(BASELINE_FILE, "w") as f:
+        json.dump({"python": sys.version.split()[0], "cases": dict(sorted(cases.items()))}, f, indent=2)
+        f.write("\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the hot-path microbenchmarks")
+    parser.add_argument("-k", dest="keyword", help="Only run cases whose name contains this")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per round")
+    parser.add_argument("--save", action="store_true", help="Store the results as the baseline")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a case regressed past the threshold")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown of the median vs the baseline (default 25%%)")
+    args = parser.parse_args()
+
+    baseline = load_baseline()
+    results = {}
+    regressions = []
+
+    print(f"{'case':<58}{'median':>12}{'min':>12}{'baseline':>12}{'change':>9}")
+    for name, setup in CASES.items():
+        if args.keyword and args.keyword not in name:
+            continue
+        result = measure(setup(), args.rounds, args.min_time)
+        results[name] = result
+
+        base = baseline.get(name, {}).get("median_us")
+        change = ""
+        if base:
+            ratio = result["median_us"] / base - 1
+            change = f"{ratio:+.1%}"
+            if ratio > args.threshold:
+                regressions.append(name)
+                change += " !"
+        print(f"{name:<58}{result['median_us']:>10.1f}us{result['min_us']:>10.1f}us"
+              f"{(f'{base:.1f}us' if base else '-'):>12}{change:>9}")
+
+    if args.save:
+        save_baseline(results)
+        print(f"Baseline saved to {BASELINE_FILE}")
+
+    if args.check and regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}:")
+        for name in regressions:
+            print(f"  {name}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
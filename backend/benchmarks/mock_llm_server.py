@@ -0,0 +1,212 @@
+"""
+Standalone OpenAI/DeepSeek-compatible mock LLM server for capacity testing.
+
+Unlike the in-process use_mock paths, requests go through httpx (or the OpenAI
+SDK), the network stack, JSON decoding and client timeouts. Response content is
+built by the same generator as DeepSeekService's mock mode, so the app can parse it.
+
+Run from the backend directory:
+    python -m benchmarks.mock_llm_server --port 9000 --latency lognormal:800:0.4 \\
+        --tokens-per-second 60 --rate-429 0.02 --rate-5xx 0.01 --malformed-rate 0.01
+
+Then point the providers at it (any non-empty API key works):
+    DEEPSEEK_BASE_URL=http://127.0.0.1:9000/v1 DEEPSEEK_API_KEY=mock
+    OPENAI_BASE_URL=http://127.0.0.1:9000/v1 OPENAI_API_KEY=mock
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Dict, Any, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from app.services.deepseek_service import DeepSeekService
+
+class LatencyDistribution:
+    """
+    Latency in milliseconds, parsed from a spec such as:
+        fixed:200, uniform:100:500, normal:400:100, lognormal:800:0.4 (median, sigma)
+    """
+    def __init__(self, spec: str):
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if kind not in expected or len(self.params) != expected[kind]:
+            raise ValueError(f"Invalid latency distribution: {spec}")
+        self.spec = spec
+
+    def sample_ms(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return random.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, random.gauss(*self.params))
+        median, sigma = self.params
+        return random.lognormvariate(0, sigma) * median
+
+
+class MockLLMConfig:
+    """Behavior of the mock server, shared by all requests"""
+    def __init__(self, latency: str = "fixed:0", tokens_per_second: float = 0.0,
+                 rate_429: float = 0.0, rate_5xx: float = 0.0, malformed_rate: float = 0.0):
+        self.latency = LatencyDistribution(latency)
+        self.tokens_per_second = tokens_per_second
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.malformed_rate = malformed_rate
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "latency": self.latency.spec,
+            "tokens_per_second": self.tokens_per_second,
+            "rate_429": self.rate_429,
+            "rate_5xx": self.rate_5xx,
+            "malformed_rate": self.malformed_rate
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token)"""
+    return max(1, len(text) // 4)
+
+def create_app(config: MockLLMConfig) -> FastAPI:
+    app = FastAPI(title="Mock LLM API")
+    # Only used for its mock content generator; it never calls the real API
+    generator = DeepSeekService()
+    stats = {"requests": 0, "streamed": 0, "429": 0, "5xx": 0, "malformed": 0}
+
+    @app.get("/mock/stats")
+    async def get_stats():
+        return {"config": config.as_dict(), "stats": stats}
+
+    @app.post("/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        model = body.get("model", "mock-model")
+        stats["requests"] += 1
+
+        # Provider latency before the first token (or the error response)
+        await asyncio.sleep(config.latency.sample_ms() / 1000)
+
+        roll = random.random()
+        if roll < config.rate_429:
+            stats["429"] += 1
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                headers={"Retry-After": "1"}
+            )
+        if roll < config.rate_429 + config.rate_5xx:
+            stats["5xx"] += 1
+            status_code = random.choice([500, 502, 503])
+            return JSONResponse(
+                status_code=status_code,
+                content={"error": {"message": "Upstream error", "type": "server_error"}}
+            )
+
+        content = generator._get_mock_response(messages)["choices"][0]["message"]["content"]
+        prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+        completion_tokens = estimate_tokens(content)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+
+        if body.get("stream"):
+            stats["streamed"] += 1
+            return StreamingResponse(
+                stream_completion(config, completion_id, model, content),
+                media_type="text/event-stream"
+            )
+
+        # Generation time at the configured token rate
+        if config.tokens_per_second > 0:
+            await asyncio.sleep(completion_tokens / config.tokens_per_second)
+
+        if random.random() < config.malformed_rate:
+            stats["malformed"] += 1
+            return Response(content=b'{"id": "' + completion_id.encode() + b'", "choices": [{"mess',
+                            media_type="application/json")
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    return app
+
+async def stream_completion(config: MockLLMConfig, completion_id: str, model: str, content: str):
+    """Yield the completion as server-sent event chunks, paced at the configured token rate"""
+    pieces = split_into_tokens(content)
+    delay = 1 / config.tokens_per_second if config.tokens_per_second > 0 else 0
+    malformed_at = random.randrange(len(pieces)) if random.random() < config.malformed_rate else None
+
+    for i, piece in enumerate(pieces):
+        if i == malformed_at:
+            yield 'data: {"id": "' + completion_id + '", "choices": [{"delta": {"cont\n\n'
+            return
+
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+        if delay:
+            await asyncio.sleep(delay)
+
+    final = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+    }
+    yield f"data: {json.dumps(final)}\n\n"
+    yield "data: [DONE]\n\n"
+
+def split_into_tokens(text: str) -> List[str]:
+    """Split text into roughly token-sized pieces (about 4 characters each)"""
+    return [text[i:i + 4] for i in range(0, len(text), 4)] or [""]
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI/DeepSeek-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", default="lognormal:800:0.4",
+                        help="fixed:MS, uniform:MIN:MAX, normal:MEAN:STD or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0,
+                        help="Completion token rate (0 returns the whole completion at once)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="Fraction of requests answered with 500/502/503")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="Fraction of responses (or streams) cut off mid-JSON")
+    args = parser.parse_args()
+
+    config = MockLLMConfig(args.latency, args.tokens_per_second, args.rate_429, args.rate_5xx, args.malformed_rate)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Replay a day of recorded LLM traffic against the current code, offline.
+
+The endpoint requests are rebuilt from the recorded prompts, sent to the
+in-process app in recording order, and answered by the replay provider
+(app/services/replay_service.py) with the recorded responses, latencies and
+failures. The report compares recorded LLM latency and error rates with the
+replayed endpoint latency, fallback counts and prompt fingerprint matches.
+Streamed and regular answers share a prompt, so both replay as /api/generate-answer;
+calls made by fallback paths are not replayed as requests of their own.
+
+Run from the backend directory:
+    python -m benchmarks.replay_traffic --date 20250327
+    python -m benchmarks.replay_traffic --date 20250327 --time-scale 0.1 --output results/replay.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+os.environ.setdefault("LOG_MODE", "production")
+
+import httpx
+
+from app.main import app
+from app.services.replay_service import ReplayService, RecordedCall
+from benchmarks.load_test import percentiles
+
+# Variable fields of the recorded prompts: the template layout has them last, older logs mid-prompt
+PROMPT_PATTERNS = {
+    "analyze_jd": re.compile(r"Text to analyze:\s*(?P<jd_text>.*?)\s*(?:Return your response in JSON|$)", re.DOTALL),
+    "generate_questions": re.compile(
+        r"generate exactly (?P<question_count>\d+).*?Job Description:\s*(?P<jd_text>.*?)\s*"
+        r"(?:Return your response in JSON|$)", re.DOTALL),
+    "evaluate_answer": re.compile(
+        r"Question:\s*(?P<question_text>.*?)\n\s*Reference Answer:\s*(?P<reference_answer>.*?)\n"
+        r"\s*User Answer:\s*(?P<user_answer>.*?)\s*(?:Return your response in JSON|$)", re.DOTALL),
+    "generate_answer": re.compile(r"Question:\s*(?P<question_text>.*?)\s*(?:\n\s*Your answer should|$)", re.DOTALL),
+}
+
+def rebuild_request(call: RecordedCall) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Rebuild the endpoint request that produced a recorded LLM call"""
+    user_message = next((m["content"] for m in call.messages if m["role"] == "user"), "")
+    pattern = PROMPT_PATTERNS.get(call.operation)
+    match = pattern.search(user_message) if pattern else None
+    if not match:
+        return None
+    fields = match.groupdict()
+
+    if call.operation == "analyze_jd":
+        return "/api/analyze-jd", {"jd_text": fields["jd_text"]}
+    if call.operation == "generate_questions":
+        return "/api/generate-questions", {"jd_text": fields["jd_text"],
+                                           "question_count": int(fields["question_count"])}
+    if call.operation == "evaluate_answer":
+        return "/api/evaluate-answer", {"question_id": str(uuid.uuid4()), **fields}
+    return "/api/generate-answer", {"question_text": fields["question_text"]}
+
+def summarize_recorded(recordings: List[RecordedCall]) -> Dict[str, Any]:
+    """Recorded LLM latency and error rate per operation"""
+    by_operation = {}
+    for call in recordings:
+        by_operation.setdefault(call.operation, []).append(call)
+    return {
+        operation: {
+            "calls": len(calls),
+            "error_rate": round(sum(1 for c in calls if c.error) / len(calls), 4),
+            "llm_latency_ms": percentiles([c.duration_ms / 1000 for c in calls])
+        }
+        for operation, calls in by_operation.items()
+    }
+
+async def replay(args) -> Dict[str, Any]:
+    async with app.router.lifespan_context(app):
+        # Swap in the replay provider, wired like the configured one
+        replay_service = ReplayService(source=args.source, log_dir=args.log_dir,
+                                       dates=args.date, time_scale=args.time_scale)
+        replay_service.logging_service = app.state.logging_service
+        replay_service.metrics_service = app.state.metrics_service
+        app.state.jd_service.llm_service = replay_service
+
+        requests = []
+        skipped = 0
+        for call in replay_service.recordings:
+            rebuilt = rebuild_request(call)
+            if rebuilt is None:
+                skipped += 1
+                continue
+            requests.append((call, *rebuilt))
+        if not requests:
+            raise SystemExit("No replayable calls found (entries need the request messages)")
+
+        latencies = {}
+        errors = {}
+        origin = datetime.fromisoformat(str(requests[0][0].timestamp)).timestamp() if args.preserve_gaps else 0.0
+        start = time.perf_counter()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://replay", timeout=120.0) as client:
+
+            async def send(call: RecordedCall, path: str, payload: Dict[str, Any]):
+                if args.preserve_gaps:
+                    offset = (datetime.fromisoformat(str(call.timestamp)).timestamp() - origin) * args.time_scale
+                    await asyncio.sleep(max(0.0, offset - (time.perf_counter() - start)))
+                request_start = time.perf_counter()
+                response = await client.post(path, json=payload)
+                latencies.setdefault(path, []).append(time.perf_counter() - request_start)
+                if response.status_code >= 400:
+                    errors[path] = errors.get(path, 0) + 1
+
+            if args.preserve_gaps:
+                await asyncio.gather(*(send(*request) for request in requests))
+            else:
+                for request in requests:
+                    await send(*request)
+
+        elapsed = time.perf_counter() - start
+        metrics = app.state.metrics_service
+        fallbacks = {labels[0]: int(value) for labels, value in metrics.fallbacks.collect().items()}
+        llm_calls = {"/".join(labels): int(value) for labels, value in metrics.llm_calls.collect().items()
+                     if labels[0] == ReplayService.provider}
+
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "source": args.source,
+            "dates": args.date,
+            "time_scale": args.time_scale,
+            "preserve_gaps": args.preserve_gaps,
+            "elapsed_s": round(elapsed, 3),
+            "replayed_requests": len(requests),
+            "skipped_recordings": skipped,
+            "matching": dict(replay_service.stats),
+            "recorded": summarize_recorded(replay_service.recordings),
+            "replayed": {
+                path: {
+                    "requests": len(samples),
+                    "error_rate": round(errors.get(path, 0) / len(samples), 4),
+                    "latency_ms": percentiles(samples)
+                }
+                for path, samples in latencies.items()
+            },
+            "llm_calls": llm_calls,
+            "fallbacks": fallbacks
+        }
+
+def print_report(results: Dict[str, Any]):
+    matching = results["matching"]
+    print(f"Replayed {results['replayed_requests']} requests in {results['elapsed_s']}s "
+          f"(time scale {results['time_scale']}, {results['skipped_recordings']} recordings skipped)")
+    print(f"Prompt matches: {matching['exact']} exact, {matching['operation']} by operation, {matching['miss']} missed")
+    print("\nRecorded LLM calls:")
+    for operation, stats in results["recorded"].items():
+        latency = stats["llm_latency_ms"]
+        print(f"  {operation:<22}{stats['calls']:>6} calls  err {stats['error_rate']:>6.1%}  "
+              f"p50 {latency['p50']:>9.1f}ms  p95 {latency['p95']:>9.1f}ms")
+    print("\nReplayed endpoints:")
+    for path, stats in results["replayed"].items():
+        latency = stats["latency_ms"]
+        print(f"  {path:<22}{stats['requests']:>6} reqs   err {stats['error_rate']:>6.1%}  "
+              f"p50 {latency['p50']:>9.1f}ms  p95 {latency['p95']:>9.1f}ms")
+    print(f"\nFallbacks: {results['fallbacks'] or 'none'}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded LLM traffic against the current code")
+    parser.add_argument("--date", action="append", default=[], help="Day to replay (YYYYMMDD); repeatable")
+    parser.add_argument("--source", default="deepseek", help="Provider whose logs are replayed")
+    parser.add_argument("--log-dir", default=os.path.join(os.getcwd(), "logs", "json"))
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="Latency and gap multiplier (1.0 original, 0.1 ten times faster, 0 no delay)")
+    parser.add_argument("--sequential", dest="preserve_gaps", action="store_false",
+                        help="Send requests one at a time instead of at their recorded (scaled) offsets")
+    parser.add_argument("--output", help="Save the report as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    results = asyncio.run(replay(args))
+    print_report(results)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Report saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
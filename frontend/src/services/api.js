@@ -18,9 +18,15 @@ api.interceptors.response.use(
   }
 );
 
+// JD text -> jd_id returned by the backend, so the text is uploaded only once
+const jdIds = new Map();
+
 export const analyzeJD = async (jdText) => {
   try {
     const response = await api.post('/analyze-jd', { jd_text: jdText });
+    if (response.data.jd_id) {
+      jdIds.set(jdText, response.data.jd_id);
+    }
     return response.data;
   } catch (error) {
     console.error('Error analyzing JD:', error);
@@ -35,10 +41,27 @@ export const generateQuestions = async (jdText, questionCount) => {
       jdTextPreview: jdText.substring(0, 50) + "..." 
     });
     
-    const response = await api.post('/generate-questions', { 
-      jd_text: jdText, 
-      question_count: questionCount 
-    });
+    // Send the jd_id instead of the full text when the backend already has the JD
+    const jdId = jdIds.get(jdText);
+    let response;
+    try {
+      response = await api.post('/generate-questions', jdId
+        ? { jd_id: jdId, question_count: questionCount }
+        : { jd_text: jdText, question_count: questionCount });
+    } catch (error) {
+      // The backend evicted or never had the JD (e.g. after a restart): send the text
+      if (!jdId || error.response?.status !== 404) {
+        throw error;
+      }
+      jdIds.delete(jdText);
+      response = await api.post('/generate-questions', {
+        jd_text: jdText,
+        question_count: questionCount
+      });
+    }
+    if (response.data.jd_id) {
+      jdIds.set(jdText, response.data.jd_id);
+    }
     
     console.log(`Received ${response.data.questions?.length || 0} questions from API (requested ${questionCount})`);
     return response.data;